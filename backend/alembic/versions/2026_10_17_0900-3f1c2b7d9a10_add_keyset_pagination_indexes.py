@@ -0,0 +1,48 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 3f1c2b7d9a10
+Revises: ad988f584e07
+Create Date: 2026-10-17 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision: str = '3f1c2b7d9a10'
+down_revision: Union[str, None] = 'ad988f584e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add composite indexes backing (created_at, id) keyset pagination.
+    """
+    op.create_index(
+        'ix_records_collection_keyset',
+        'records',
+        ['collection_id', 'is_deleted', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_collections_user_keyset',
+        'collections',
+        ['user_id', 'is_deleted', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_activity_logs_user_keyset',
+        'activity_logs',
+        ['user_id', 'created_at', 'id']
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop keyset pagination indexes.
+    """
+    op.drop_index('ix_activity_logs_user_keyset', table_name='activity_logs')
+    op.drop_index('ix_collections_user_keyset', table_name='collections')
+    op.drop_index('ix_records_collection_keyset', table_name='records')
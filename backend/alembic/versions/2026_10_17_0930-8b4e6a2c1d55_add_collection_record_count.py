@@ -0,0 +1,52 @@
+"""add_collection_record_count
+
+Revision ID: 8b4e6a2c1d55
+Revises: 3f1c2b7d9a10
+Create Date: 2026-10-17 09:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision: str = '8b4e6a2c1d55'
+down_revision: Union[str, None] = '3f1c2b7d9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add denormalized collections.record_count and backfill it with one
+    grouped UPDATE.
+    """
+    with op.batch_alter_table('collections', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('record_count', sa.Integer(), server_default=sa.text('0'), nullable=False)
+        )
+    
+    collections = sa.table('collections', sa.column('id'), sa.column('record_count'))
+    records = sa.table(
+        'records',
+        sa.column('collection_id'),
+        sa.column('is_deleted', sa.Boolean())
+    )
+    live_count = (
+        sa.select(sa.func.count())
+        .select_from(records)
+        .where(records.c.collection_id == collections.c.id)
+        .where(records.c.is_deleted == sa.false())
+        .scalar_subquery()
+    )
+    op.execute(collections.update().values(record_count=live_count))
+
+
+def downgrade() -> None:
+    """
+    Drop collections.record_count.
+    """
+    with op.batch_alter_table('collections', schema=None) as batch_op:
+        batch_op.drop_column('record_count')
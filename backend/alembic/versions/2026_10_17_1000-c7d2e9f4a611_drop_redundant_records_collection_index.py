@@ -0,0 +1,34 @@
+"""drop_redundant_records_collection_index
+
+Revision ID: c7d2e9f4a611
+Revises: 8b4e6a2c1d55
+Create Date: 2026-10-17 10:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision: str = 'c7d2e9f4a611'
+down_revision: Union[str, None] = '8b4e6a2c1d55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Drop ix_records_collection_id. ix_records_collection_keyset leads with
+    collection_id and serves the same lookups, so the extra index only adds
+    write cost to bulk imports.
+    """
+    op.drop_index('ix_records_collection_id', table_name='records')
+
+
+def downgrade() -> None:
+    """
+    Restore ix_records_collection_id.
+    """
+    op.create_index('ix_records_collection_id', 'records', ['collection_id'])
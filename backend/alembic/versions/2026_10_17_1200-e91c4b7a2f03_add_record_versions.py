@@ -0,0 +1,43 @@
+"""add_record_versions
+
+Revision ID: e91c4b7a2f03
+Revises: d41a7e3b9c28
+Create Date: 2026-10-17 12:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision: str = 'e91c4b7a2f03'
+down_revision: Union[str, None] = 'd41a7e3b9c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add records.version (existing records start at version 1) and an
+    activity_logs index for per-entity history lookups.
+    """
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False)
+        )
+    op.create_index(
+        'ix_activity_logs_entity',
+        'activity_logs',
+        ['entity_type', 'entity_id']
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop the history index and records.version.
+    """
+    op.drop_index('ix_activity_logs_entity', table_name='activity_logs')
+    with op.batch_alter_table('records', schema=None) as batch_op:
+        batch_op.drop_column('version')
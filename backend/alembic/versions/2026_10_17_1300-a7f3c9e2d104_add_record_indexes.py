@@ -0,0 +1,59 @@
+"""add_record_indexes
+
+Revision ID: a7f3c9e2d104
+Revises: e91c4b7a2f03
+Create Date: 2026-10-17 13:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision: str = 'a7f3c9e2d104'
+down_revision: Union[str, None] = 'e91c4b7a2f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create record_indexes table tracking indexed data fields and their build state.
+    The expression indexes themselves are created by the background builder.
+    """
+    op.create_table(
+        'record_indexes',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('collection_id', sa.String(), nullable=True),
+        sa.Column('field', sa.String(), nullable=False),
+        sa.Column('field_type', sa.String(), nullable=False),
+        sa.Column('index_name', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text("(datetime('now'))"), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text("(datetime('now'))"), nullable=False),
+        sa.ForeignKeyConstraint(['collection_id'], ['collections.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('index_name')
+    )
+    op.create_index(
+        'ix_record_indexes_collection_field',
+        'record_indexes',
+        ['collection_id', 'field'],
+        unique=True
+    )
+    op.create_index('ix_record_indexes_status', 'record_indexes', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """
+    Drop the expression indexes built on records, then record_indexes table.
+    """
+    index_names = op.get_bind().execute(sa.text("SELECT index_name FROM record_indexes")).scalars().all()
+    for index_name in index_names:
+        op.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+    op.drop_index('ix_record_indexes_status', table_name='record_indexes')
+    op.drop_index('ix_record_indexes_collection_field', table_name='record_indexes')
+    op.drop_table('record_indexes')
@@ -0,0 +1,98 @@
+"""add_record_search
+
+Revision ID: b2d8e4f61c37
+Revises: a7f3c9e2d104
+Create Date: 2026-10-17 14:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision: str = 'b2d8e4f61c37'
+down_revision: Union[str, None] = 'a7f3c9e2d104'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The schema as of this revision, frozen here: app.models.record_search
+# describes the latest one and later revisions change it
+
+
+def _search_body_sql(row: str) -> str:
+    """Searchable text of a records row: its text fields, joined."""
+    return f"""coalesce((
+        SELECT group_concat(item.value, ' ') FROM json_each({row}.data) AS item
+        WHERE item.type = 'text' AND (
+            NOT EXISTS (
+                SELECT 1 FROM collections AS c, json_each(c.schema, '$.fields') AS f
+                WHERE c.id = {row}.collection_id
+            )
+            OR item.key IN (
+                SELECT json_extract(f.value, '$.name')
+                FROM collections AS c, json_each(c.schema, '$.fields') AS f
+                WHERE c.id = {row}.collection_id
+                  AND coalesce(json_extract(f.value, '$.type'), 'text') NOT IN ('number', 'date')
+            )
+        )
+    ), '')"""
+
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5("
+    "collection_id, body, tokenize = 'unicode61 remove_diacritics 2')",
+    f"""CREATE TRIGGER IF NOT EXISTS records_fts_insert AFTER INSERT ON records BEGIN
+        INSERT INTO records_fts (rowid, collection_id, body)
+        VALUES (new.rowid, new.collection_id, {_search_body_sql("new")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS records_fts_update AFTER UPDATE OF data, collection_id ON records BEGIN
+        DELETE FROM records_fts WHERE rowid = old.rowid;
+        INSERT INTO records_fts (rowid, collection_id, body)
+        VALUES (new.rowid, new.collection_id, {_search_body_sql("new")});
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS records_fts_delete AFTER DELETE ON records BEGIN
+        DELETE FROM records_fts WHERE rowid = old.rowid;
+    END""",
+]
+
+POSTGRESQL_DDL = [
+    "ALTER TABLE records ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (jsonb_to_tsvector('simple', data::jsonb, '[\"string\"]')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_records_search_vector ON records USING gin (search_vector)",
+]
+
+
+def upgrade() -> None:
+    """
+    Create the full-text index over record data.
+    SQLite: FTS5 table and sync triggers, then index the existing records.
+    PostgreSQL: generated tsvector column with a GIN index.
+    """
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        op.execute(
+            "INSERT INTO records_fts (rowid, collection_id, body) "
+            f"SELECT records.rowid, records.collection_id, {_search_body_sql('records')} FROM records"
+        )
+    elif dialect == 'postgresql':
+        for statement in POSTGRESQL_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """
+    Drop the full-text index.
+    """
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS records_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS records_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS records_fts_insert")
+        op.execute("DROP TABLE IF EXISTS records_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_records_search_vector")
+        op.execute("ALTER TABLE records DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,121 @@
+"""add_global_search
+
+Revision ID: c5a9f0d3e218
+Revises: b2d8e4f61c37
+Create Date: 2026-10-17 15:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision: str = 'c5a9f0d3e218'
+down_revision: Union[str, None] = 'b2d8e4f61c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The schema as of this revision, frozen here: app.models.record_search
+# describes the latest one and later revisions may change it
+
+
+def _fts_id_sql(expression: str) -> str:
+    """An id as stored in the FTS tables: without hyphens."""
+    return f"replace({expression}, '-', '')"
+
+
+def _owner_sql(row: str) -> str:
+    """Owner of a records row, as an FTS id."""
+    return _fts_id_sql(f"(SELECT user_id FROM collections WHERE id = {row}.collection_id)")
+
+
+def _search_body_sql(row: str) -> str:
+    """Searchable text of a records row: its text fields, joined."""
+    return f"""coalesce((
+        SELECT group_concat(item.value, ' ') FROM json_each({row}.data) AS item
+        WHERE item.type = 'text' AND (
+            NOT EXISTS (
+                SELECT 1 FROM collections AS c, json_each(c.schema, '$.fields') AS f
+                WHERE c.id = {row}.collection_id
+            )
+            OR item.key IN (
+                SELECT json_extract(f.value, '$.name')
+                FROM collections AS c, json_each(c.schema, '$.fields') AS f
+                WHERE c.id = {row}.collection_id
+                  AND coalesce(json_extract(f.value, '$.type'), 'text') NOT IN ('number', 'date')
+            )
+        )
+    ), '')"""
+
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5("
+    "user_id, collection_id, body, tokenize = 'unicode61 remove_diacritics 2')",
+    f"""CREATE TRIGGER IF NOT EXISTS records_fts_insert AFTER INSERT ON records BEGIN
+        INSERT INTO records_fts (rowid, user_id, collection_id, body)
+        VALUES (new.rowid, {_owner_sql("new")}, {_fts_id_sql("new.collection_id")}, {_search_body_sql("new")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS records_fts_update AFTER UPDATE OF data, collection_id ON records BEGIN
+        DELETE FROM records_fts WHERE rowid = old.rowid;
+        INSERT INTO records_fts (rowid, user_id, collection_id, body)
+        VALUES (new.rowid, {_owner_sql("new")}, {_fts_id_sql("new.collection_id")}, {_search_body_sql("new")});
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS records_fts_delete AFTER DELETE ON records BEGIN
+        DELETE FROM records_fts WHERE rowid = old.rowid;
+    END""",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS collections_fts USING fts5("
+    "user_id, name, description, tokenize = 'unicode61 remove_diacritics 2')",
+    f"""CREATE TRIGGER IF NOT EXISTS collections_fts_insert AFTER INSERT ON collections BEGIN
+        INSERT INTO collections_fts (rowid, user_id, name, description)
+        VALUES (new.rowid, {_fts_id_sql("new.user_id")}, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS collections_fts_update AFTER UPDATE OF user_id, name, description ON collections BEGIN
+        DELETE FROM collections_fts WHERE rowid = old.rowid;
+        INSERT INTO collections_fts (rowid, user_id, name, description)
+        VALUES (new.rowid, {_fts_id_sql("new.user_id")}, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS collections_fts_delete AFTER DELETE ON collections BEGIN
+        DELETE FROM collections_fts WHERE rowid = old.rowid;
+    END""",
+]
+
+
+def upgrade() -> None:
+    """
+    SQLite: rebuild records_fts with the owning user_id column (ids stored
+    without hyphens) and add collections_fts, then index existing records
+    and collections.
+    PostgreSQL needs no change (collections are matched without an index).
+    """
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('records_fts_insert', 'records_fts_update', 'records_fts_delete'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS records_fts")
+    for statement in SQLITE_DDL:
+        op.execute(statement)
+    op.execute(
+        "INSERT INTO records_fts (rowid, user_id, collection_id, body) "
+        f"SELECT records.rowid, {_owner_sql('records')}, {_fts_id_sql('records.collection_id')}, "
+        f"{_search_body_sql('records')} "
+        "FROM records"
+    )
+    op.execute("DELETE FROM collections_fts")
+    op.execute(
+        "INSERT INTO collections_fts (rowid, user_id, name, description) "
+        f"SELECT rowid, {_fts_id_sql('user_id')}, name, description FROM collections"
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop collections_fts. records_fts keeps its user_id column; per-collection
+    search works the same with it.
+    """
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('collections_fts_insert', 'collections_fts_update', 'collections_fts_delete'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS collections_fts")
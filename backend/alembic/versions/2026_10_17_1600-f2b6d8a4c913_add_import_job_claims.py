@@ -0,0 +1,37 @@
+"""add_import_job_claims
+
+Revision ID: f2b6d8a4c913
+Revises: c5a9f0d3e218
+Create Date: 2026-10-17 16:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision: str = 'f2b6d8a4c913'
+down_revision: Union[str, None] = 'c5a9f0d3e218'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add the owning process and heartbeat of running import jobs. Jobs left
+    running by an older version have no heartbeat and count as stale.
+    """
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claimed_by', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """
+    Drop the import job claim columns.
+    """
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('claimed_by')
@@ -0,0 +1,37 @@
+"""add_record_index_claims
+
+Revision ID: a3c7e1f5b820
+Revises: f2b6d8a4c913
+Create Date: 2026-10-17 17:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision: str = 'a3c7e1f5b820'
+down_revision: Union[str, None] = 'f2b6d8a4c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add the building process and heartbeat of record index builds. Builds
+    left running by an older version have no heartbeat and count as stale.
+    """
+    with op.batch_alter_table('record_indexes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claimed_by', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """
+    Drop the record index claim columns.
+    """
+    with op.batch_alter_table('record_indexes', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('claimed_by')
@@ -0,0 +1,36 @@
+"""add_record_index_retry
+
+Revision ID: b8d2f4a6c195
+Revises: a3c7e1f5b820
+Create Date: 2026-10-17 18:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision: str = 'b8d2f4a6c195'
+down_revision: Union[str, None] = 'a3c7e1f5b820'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add the attempt count and next retry time of failed index drops.
+    """
+    with op.batch_alter_table('record_indexes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False))
+        batch_op.add_column(sa.Column('retry_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """
+    Drop the index drop retry columns.
+    """
+    with op.batch_alter_table('record_indexes', schema=None) as batch_op:
+        batch_op.drop_column('retry_at')
+        batch_op.drop_column('attempts')
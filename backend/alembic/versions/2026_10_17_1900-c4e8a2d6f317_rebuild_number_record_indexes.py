@@ -0,0 +1,44 @@
+"""rebuild_number_record_indexes
+
+Revision ID: c4e8a2d6f317
+Revises: b8d2f4a6c195
+Create Date: 2026-10-17 19:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision: str = 'c4e8a2d6f317'
+down_revision: Union[str, None] = 'b8d2f4a6c195'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Number field indexes are built over the expression the filters compare.
+# That expression changed (non-numeric text is now NULL instead of 0.0 on
+# SQLite, and both databases accept JSON number syntax), so existing indexes
+# no longer match it. The background builder drops and recreates every
+# index queued here, with whichever expression the running code uses.
+REBUILD_NUMBER_INDEXES = (
+    "UPDATE record_indexes "
+    "SET status = 'pending', error = NULL, attempts = 0, retry_at = NULL, "
+    "claimed_by = NULL, heartbeat_at = NULL "
+    "WHERE field_type = 'number' AND status <> 'dropping'"
+)
+
+
+def upgrade() -> None:
+    """
+    Queue number field indexes for a rebuild with the guarded expression.
+    """
+    op.execute(REBUILD_NUMBER_INDEXES)
+
+
+def downgrade() -> None:
+    """
+    Queue them again, to be rebuilt with the previous expression.
+    """
+    op.execute(REBUILD_NUMBER_INDEXES)
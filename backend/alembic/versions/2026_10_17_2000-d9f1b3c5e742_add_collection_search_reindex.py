@@ -0,0 +1,34 @@
+"""add_collection_search_reindex
+
+Revision ID: d9f1b3c5e742
+Revises: c4e8a2d6f317
+Create Date: 2026-10-17 20:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision: str = 'd9f1b3c5e742'
+down_revision: Union[str, None] = 'c4e8a2d6f317'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add the progress of background search index rebuilds to collections.
+    """
+    with op.batch_alter_table('collections', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_reindex_rowid', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """
+    Drop the search reindex progress column.
+    """
+    with op.batch_alter_table('collections', schema=None) as batch_op:
+        batch_op.drop_column('search_reindex_rowid')
@@ -1,6 +1,6 @@
 """API v1 router initialization."""
 from fastapi import APIRouter
-from app.api.v1 import auth, collections, records, activity, file_import
+from app.api.v1 import auth, collections, records, activity, file_import, search
 
 router = APIRouter(prefix="/v1")
 
@@ -9,3 +9,4 @@ router.include_router(collections.router)
 router.include_router(records.router)
 router.include_router(activity.router)
 router.include_router(file_import.router)
+router.include_router(search.router)
@@ -2,34 +2,57 @@
 Activity logs API endpoints.
 Provides access to audit trail for the current user.
 """
-from typing import List
+from datetime import datetime, timezone
+from typing import List, Optional, Union
 from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.dependencies import get_current_active_user
-from app.schemas import ActivityLogResponse
-from app.models.user import User
+from app.core.principal_cache import AuthenticatedUser
+from app.core.pagination import apply_keyset, build_cursor_page, decode_cursor
+from app.schemas import ActivityLogResponse, ActivityLogPage
 from app.models.activity_log import ActivityLog
+from app.services.activity_archive import activity_archive
 
 
 router = APIRouter(prefix="/activity", tags=["Activity Logs"])
 
 
-@router.get("", response_model=List[ActivityLogResponse])
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, the form timestamps are stored in."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@router.get("", response_model=Union[List[ActivityLogResponse], ActivityLogPage])
 async def list_activity_logs(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination cursor. Pass an empty value for the first page, "
+                    "then the previous page's next_cursor. Ignores skip."
+    ),
     entity_type: str = Query(None, description="Filter by entity type (collection, record, user)"),
     action: str = Query(None, description="Filter by action (created, updated, deleted)"),
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    since: Optional[datetime] = Query(None, description="Only entries created at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Only entries created before this time (UTC)"),
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get activity logs for the current user.
     Provides audit trail of all actions.
+    Returns a plain list in offset mode, or an ActivityLogPage when a cursor is given.
+    Entries moved out of the database by the retention job are read from the
+    archive once a page runs past the rows still in the database.
     """
+    since, until = _as_naive_utc(since), _as_naive_utc(until)
+    
     # Build query
     query = select(ActivityLog).where(ActivityLog.user_id == current_user.id)
     
@@ -39,9 +62,55 @@ async def list_activity_logs(
     if action:
         query = query.where(ActivityLog.action == action)
     
-    query = query.offset(skip).limit(limit).order_by(ActivityLog.created_at.desc())
+    if since:
+        query = query.where(ActivityLog.created_at >= since)
+    
+    if until:
+        query = query.where(ActivityLog.created_at < until)
+    
+    archive_filters = dict(since=since, until=until, entity_type=entity_type, action=action)
+    
+    if cursor is not None:
+        result = await db.execute(apply_keyset(query, ActivityLog, cursor, limit))
+        rows = [ActivityLogResponse.from_orm(log) for log in result.scalars().all()]
+        
+        # Continue into the archive where the database rows run out
+        if len(rows) <= limit and activity_archive.has_user(current_user.id):
+            if rows:
+                before = (rows[-1].created_at, rows[-1].id)
+            else:
+                before = decode_cursor(cursor) if cursor else None
+            archived = await run_in_threadpool(
+                activity_archive.read,
+                current_user.id,
+                limit - len(rows) + 1,
+                before=before,
+                **archive_filters
+            )
+            rows.extend(ActivityLogResponse(**row) for row in archived)
+        
+        logs, next_cursor = build_cursor_page(rows, limit)
+        
+        return ActivityLogPage(items=logs, next_cursor=next_cursor)
+    
+    result = await db.execute(
+        query.offset(skip).limit(limit).order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
+    )
+    logs = [ActivityLogResponse.from_orm(log) for log in result.scalars().all()]
     
-    result = await db.execute(query)
-    logs = result.scalars().all()
+    if len(logs) < limit and activity_archive.has_user(current_user.id):
+        # Rows skipped in the archive are the offset past all database rows
+        archive_offset = 0
+        if not logs and skip:
+            count = await db.execute(query.with_only_columns(func.count()).order_by(None))
+            archive_offset = max(skip - count.scalar_one(), 0)
+        archived = await run_in_threadpool(
+            activity_archive.read,
+            current_user.id,
+            limit - len(logs),
+            offset=archive_offset,
+            **archive_filters
+        )
+        logs.extend(ActivityLogResponse(**row) for row in archived)
     
-    return [ActivityLogResponse.from_orm(log) for log in logs]
+    return logs
@@ -8,8 +8,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_read_db, get_read_db
 from app.core.dependencies import get_current_user
+from app.core.principal_cache import AuthenticatedUser
+from app.core.write_queue import write_queue
 from app.schemas import (
     UserCreate,
     UserResponse,
@@ -27,9 +29,11 @@ from app.services.auth_service import (
     authenticate_user,
     create_otp,
     verify_otp_code,
+    add_user_session,
     create_user_session,
     refresh_access_token,
-    logout_user
+    logout_user,
+    deactivate_user
 )
 from app.services.oauth_service import GoogleOAuthService
 from app.services.email_service import send_welcome_email
@@ -73,36 +77,38 @@ async def register_with_otp(
     request: OTPVerifyWithPassword,
     response: Response,
     req: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_primary_read_db)
 ):
     """
     Complete registration with OTP verification.
     Step 2: User provides OTP, password, and name to complete registration.
+    The password is hashed without holding a write transaction; the user and
+    session rows are written through the write queue.
     """
-    # Verify OTP
+    # Verify OTP (commits, so the writer is free again before hashing)
     await verify_otp_code(db, request.email, request.code, "registration")
     
-    # Register user
+    # Register user with the email verified
     user = await register_user(
-        db,
+        read_db,
         email=request.email,
         password=request.password,
-        full_name=request.full_name
+        full_name=request.full_name,
+        email_verified=True
     )
     
-    # Mark email as verified
-    user.email_verified = True
-    await db.commit()
-    
     # Send welcome email
     await send_welcome_email(user.email, user.full_name)
     
     # Create session
     device_info = req.headers.get("user-agent")
     ip_address = req.client.host if req.client else None
-    access_token, refresh_token = await create_user_session(
-        db, user, device_info, ip_address
-    )
+    
+    async def start_session(session: AsyncSession):
+        return await add_user_session(session, user, device_info, ip_address)
+    
+    access_token, refresh_token = await write_queue.submit(start_session)
     
     # Set refresh token in HTTP-only cookie
     response.set_cookie(
@@ -128,10 +134,12 @@ async def login(
     request: LoginRequest,
     response: Response,
     req: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """
     Login with email and password.
+    The password is verified without holding a write transaction; the login
+    outcome and the session row are written through the write queue.
     """
     # Authenticate user
     user = await authenticate_user(db, request.email, request.password)
@@ -151,9 +159,11 @@ async def login(
     # Create session
     device_info = req.headers.get("user-agent")
     ip_address = req.client.host if req.client else None
-    access_token, refresh_token = await create_user_session(
-        db, user, device_info, ip_address
-    )
+    
+    async def start_session(session: AsyncSession):
+        return await add_user_session(session, user, device_info, ip_address)
+    
+    access_token, refresh_token = await write_queue.submit(start_session)
     
     # Set refresh token in cookie
     response.set_cookie(
@@ -389,9 +399,38 @@ async def logout(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get current authenticated user information.
     """
-    return UserResponse.from_orm(current_user)
+    # The auth dependency only carries a snapshot; load the full profile
+    result = await db.execute(select(User).where(User.id == current_user.id))
+    user = result.scalar_one_or_none()
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return UserResponse.from_orm(user)
+
+
+@router.delete("/me", response_model=MessageResponse)
+async def deactivate_current_user(
+    response: Response,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Deactivate the current account. All of its sessions are revoked and its
+    access tokens are refused from now on, including by cached principals.
+    """
+    await deactivate_user(db, current_user.id)
+    
+    # Clear cookie
+    response.delete_cookie(key="refresh_token")
+    
+    return MessageResponse(message="Account deactivated")
@@ -2,79 +2,140 @@
 Collections API endpoints.
 Handles CRUD operations for user collections with ownership enforcement.
 """
-from typing import List, Optional
+from typing import List, Literal, Optional, Tuple, Union
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.dependencies import get_current_active_user
+from app.core.principal_cache import AuthenticatedUser
+from app.core.pagination import apply_keyset, build_cursor_page
+from app.core.activity_writer import activity_writer
+from app.core.write_queue import write_queue
 from app.schemas import (
     CollectionCreate,
     CollectionUpdate,
     CollectionResponse,
+    CollectionPage,
+    RecordIndexResponse,
     MessageResponse
 )
-from app.models.user import User
 from app.models.collection import Collection
-from app.models.record import Record
-from app.models.activity_log import ActivityLog
+from app.services.record_indexes import (
+    drop_collection_indexes,
+    indexed_fields,
+    list_record_indexes,
+    record_index_builder,
+    sync_record_indexes
+)
+from app.services.record_export import (
+    EXPORT_FORMATS,
+    XLSX_MAX_ROWS,
+    count_live_records,
+    export_columns,
+    export_filename,
+    export_stream,
+    require_parquet_support
+)
+from app.services.record_search import mark_search_stale, search_reindexer, search_text_fields
 
 
 router = APIRouter(prefix="/collections", tags=["Collections"])
 
 
+async def get_owned_collection(
+    db: AsyncSession,
+    collection_id: str,
+    current_user: AuthenticatedUser
+) -> Collection:
+    """
+    Load a collection owned by the current user, deleted or not.
+    
+    Raises:
+        HTTPException: 404 if it does not exist or belongs to someone else
+    """
+    result = await db.execute(
+        select(Collection).where(
+            and_(
+                Collection.id == collection_id,
+                Collection.user_id == current_user.id
+            )
+        )
+    )
+    collection = result.scalar_one_or_none()
+    
+    if not collection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Collection not found"
+        )
+    
+    return collection
+
+
 @router.post("", response_model=CollectionResponse, status_code=status.HTTP_201_CREATED)
 async def create_collection(
     collection_data: CollectionCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Create a new collection.
+    The collection and its activity log entry commit together; server-generated
+    timestamps come back from the INSERT (eager_defaults). Schema fields marked
+    "indexed" are queued for the background index builder.
     """
-    # Create collection - database will set timestamps
-    collection = Collection(
-        user_id=current_user.id,
-        name=collection_data.name,
-        description=collection_data.description,
-        schema=collection_data.schema or {}
-        # NO created_at or updated_at - database handles it
-    )
-    
-    db.add(collection)
-    await db.commit()
-    await db.refresh(collection)
-    
-    # Log activity
-    activity = ActivityLog(
-        user_id=current_user.id,
-        action="created",
-        entity_type="collection",
-        entity_id=collection.id,
-        changes={"name": collection.name}
-    )
-    db.add(activity)
-    await db.commit()
+    async def create(db: AsyncSession) -> Tuple[Collection, bool]:
+        # Create collection - database will set timestamps
+        collection = Collection(
+            user_id=current_user.id,
+            name=collection_data.name,
+            description=collection_data.description,
+            schema=collection_data.schema or {}
+            # NO created_at or updated_at - database handles it
+        )
+        
+        db.add(collection)
+        await db.flush()
+        
+        # Log activity
+        activity_writer.record(
+            db,
+            user_id=current_user.id,
+            action="created",
+            entity_type="collection",
+            entity_id=collection.id,
+            changes={"name": collection.name}
+        )
+        # A new collection has no index rows to reconcile unless fields are marked
+        indexes_changed = bool(indexed_fields(collection.schema)) and await sync_record_indexes(db, collection)
+        return collection, indexes_changed
     
-    # Add record count
-    response = CollectionResponse.from_orm(collection)
-    response.record_count = 0
+    collection, indexes_changed = await write_queue.submit(create)
+    if indexes_changed:
+        record_index_builder.notify()
     
-    return response
+    return CollectionResponse.from_orm(collection)
 
 
-@router.get("", response_model=List[CollectionResponse])
+@router.get("", response_model=Union[List[CollectionResponse], CollectionPage])
 async def list_collections(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination cursor. Pass an empty value for the first page, "
+                    "then the previous page's next_cursor. Ignores skip."
+    ),
     include_deleted: bool = Query(False),
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List all collections for the current user.
+    Returns a plain list in offset mode, or a CollectionPage when a cursor is given.
     """
     # Build query with ownership filter
     query = select(Collection).where(Collection.user_id == current_user.id)
@@ -82,27 +143,21 @@ async def list_collections(
     if not include_deleted:
         query = query.where(Collection.is_deleted == False)
     
-    query = query.offset(skip).limit(limit).order_by(Collection.created_at.desc())
+    next_cursor = None
+    if cursor is not None:
+        query = apply_keyset(query, Collection, cursor, limit)
+        result = await db.execute(query)
+        collections, next_cursor = build_cursor_page(result.scalars().all(), limit)
+    else:
+        query = query.offset(skip).limit(limit).order_by(Collection.created_at.desc(), Collection.id.desc())
+        result = await db.execute(query)
+        collections = result.scalars().all()
     
-    result = await db.execute(query)
-    collections = result.scalars().all()
+    # Record counts come from the denormalized column - no per-collection COUNT
+    response_list = [CollectionResponse.from_orm(collection) for collection in collections]
     
-    # Add record counts
-    response_list = []
-    for collection in collections:
-        # Count records
-        count_query = select(func.count(Record.id)).where(
-            and_(
-                Record.collection_id == collection.id,
-                Record.is_deleted == False
-            )
-        )
-        count_result = await db.execute(count_query)
-        record_count = count_result.scalar()
-        
-        col_response = CollectionResponse.from_orm(collection)
-        col_response.record_count = record_count
-        response_list.append(col_response)
+    if cursor is not None:
+        return CollectionPage(items=response_list, next_cursor=next_cursor)
     
     return response_list
 
@@ -110,170 +165,165 @@ async def list_collections(
 @router.get("/{collection_id}", response_model=CollectionResponse)
 async def get_collection(
     collection_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a specific collection by ID.
     Enforces ownership - users can only access their own collections.
+    Includes the indexed data fields and their build state.
     """
-    result = await db.execute(
-        select(Collection).where(
-            and_(
-                Collection.id == collection_id,
-                Collection.user_id == current_user.id
-            )
-        )
-    )
-    collection = result.scalar_one_or_none()
+    collection = await get_owned_collection(db, collection_id, current_user)
     
-    if not collection:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Collection not found"
-        )
+    response = CollectionResponse.from_orm(collection)
+    response.indexes = [
+        RecordIndexResponse.from_orm(index)
+        for index in await list_record_indexes(db, collection.id)
+    ]
+    return response
+
+
+@router.get("/{collection_id}/export", response_class=StreamingResponse)
+async def export_collection(
+    collection_id: str,
+    format_: Literal["csv", "ndjson", "xlsx", "parquet"] = Query("csv", alias="format"),
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Download a collection's live records as a file.
+    Columns follow the schema field order with field labels as headers, then
+    any other data keys. NDJSON lines are the records' data objects. Records
+    are streamed from a database cursor, so exports of any size use the same
+    memory; Excel files are sent once the workbook is complete.
+    
+    Raises:
+        HTTPException: 400 if an Excel export would exceed the sheet row limit,
+            501 for Parquet when pyarrow is not installed
+    """
+    collection = await get_owned_collection(db, collection_id, current_user)
     
-    # Count records
-    count_query = select(func.count(Record.id)).where(
-        and_(
-            Record.collection_id == collection.id,
-            Record.is_deleted == False
+    # Checks up front so errors are plain HTTP responses
+    if format_ == "parquet":
+        require_parquet_support()
+    if format_ == "xlsx" and await count_live_records(db, collection.id) > XLSX_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Excel files hold at most {XLSX_MAX_ROWS} records; export as CSV or Parquet instead"
         )
-    )
-    count_result = await db.execute(count_query)
-    record_count = count_result.scalar()
     
-    response = CollectionResponse.from_orm(collection)
-    response.record_count = record_count
+    columns = await export_columns(db, collection) if format_ != "ndjson" else []
     
-    return response
+    return StreamingResponse(
+        export_stream(collection, format_, columns),
+        media_type=EXPORT_FORMATS[format_][0],
+        headers={"Content-Disposition": export_filename(collection, format_)}
+    )
 
 
 @router.put("/{collection_id}", response_model=CollectionResponse)
 async def update_collection(
     collection_id: str,
     collection_data: CollectionUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Update a collection.
     Enforces ownership - users can only update their own collections.
+    The change and its activity log entry commit together. Changes to which
+    schema fields are "indexed" are picked up by the background index builder;
+    changes to which fields are text fields re-index the records for search
+    in the background (search_reindexing is true until that is done).
     """
-    result = await db.execute(
-        select(Collection).where(
-            and_(
-                Collection.id == collection_id,
-                Collection.user_id == current_user.id
+    async def update(db: AsyncSession) -> Tuple[Collection, bool, bool]:
+        collection = await get_owned_collection(db, collection_id, current_user)
+        
+        # Track changes for audit log
+        changes = {}
+        
+        # Update fields
+        if collection_data.name is not None:
+            changes["name"] = {"old": collection.name, "new": collection_data.name}
+            collection.name = collection_data.name
+        
+        if collection_data.description is not None:
+            changes["description"] = {"old": collection.description, "new": collection_data.description}
+            collection.description = collection_data.description
+        
+        indexes_changed = search_stale = False
+        if collection_data.schema is not None:
+            changes["schema"] = {"old": collection.schema, "new": collection_data.schema}
+            old_text_fields = search_text_fields(collection.schema)
+            collection.schema = collection_data.schema
+            indexes_changed = await sync_record_indexes(db, collection)
+            if search_text_fields(collection.schema) != old_text_fields:
+                search_stale = mark_search_stale(db, collection)
+        
+        # Explicitly update timestamp
+        collection.updated_at = datetime.utcnow()
+        
+        # Log activity
+        if changes:
+            activity_writer.record(
+                db,
+                user_id=current_user.id,
+                action="updated",
+                entity_type="collection",
+                entity_id=collection.id,
+                changes=changes
             )
-        )
-    )
-    collection = result.scalar_one_or_none()
-    
-    if not collection:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Collection not found"
-        )
-    
-    # Track changes for audit log
-    changes = {}
-    
-    # Update fields
-    if collection_data.name is not None:
-        changes["name"] = {"old": collection.name, "new": collection_data.name}
-        collection.name = collection_data.name
-    
-    if collection_data.description is not None:
-        changes["description"] = {"old": collection.description, "new": collection_data.description}
-        collection.description = collection_data.description
+        await db.flush()
+        return collection, indexes_changed, search_stale
     
-    if collection_data.schema is not None:
-        changes["schema"] = {"old": collection.schema, "new": collection_data.schema}
-        collection.schema = collection_data.schema
+    collection, indexes_changed, search_stale = await write_queue.submit(update)
+    if indexes_changed:
+        record_index_builder.notify()
+    if search_stale:
+        search_reindexer.notify()
     
-    # Explicitly update timestamp
-    collection.updated_at = datetime.utcnow()
-    
-    await db.commit()
-    await db.refresh(collection)
-    
-    # Log activity
-    if changes:
-        activity = ActivityLog(
-            user_id=current_user.id,
-            action="updated",
-            entity_type="collection",
-            entity_id=collection.id,
-            changes=changes
-        )
-        db.add(activity)
-        await db.commit()
-    
-    # Count records
-    count_query = select(func.count(Record.id)).where(
-        and_(
-            Record.collection_id == collection.id,
-            Record.is_deleted == False
-        )
-    )
-    count_result = await db.execute(count_query)
-    record_count = count_result.scalar()
-    
-    response = CollectionResponse.from_orm(collection)
-    response.record_count = record_count
-    
-    return response
+    return CollectionResponse.from_orm(collection)
 
 
 @router.delete("/{collection_id}", response_model=MessageResponse)
 async def delete_collection(
     collection_id: str,
     hard_delete: bool = Query(False, description="Permanently delete instead of soft delete"),
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Delete a collection (soft delete by default).
     Enforces ownership - users can only delete their own collections.
+    The deletion and its activity log entry commit together.
     """
-    result = await db.execute(
-        select(Collection).where(
-            and_(
-                Collection.id == collection_id,
-                Collection.user_id == current_user.id
-            )
-        )
-    )
-    collection = result.scalar_one_or_none()
-    
-    if not collection:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Collection not found"
+    async def delete(db: AsyncSession) -> Tuple[str, bool]:
+        collection = await get_owned_collection(db, collection_id, current_user)
+        
+        indexes_changed = False
+        if hard_delete:
+            # Permanently delete; its record indexes are dropped in the background
+            indexes_changed = await drop_collection_indexes(db, collection.id)
+            await db.delete(collection)
+            message = "Collection permanently deleted"
+        else:
+            # Soft delete
+            collection.is_deleted = True
+            collection.deleted_at = datetime.utcnow()
+            message = "Collection deleted"
+        
+        # Log activity
+        activity_writer.record(
+            db,
+            user_id=current_user.id,
+            action="deleted",
+            entity_type="collection",
+            entity_id=collection.id,
+            changes={"hard_delete": hard_delete}
         )
+        await db.flush()
+        return message, indexes_changed
     
-    if hard_delete:
-        # Permanently delete
-        await db.delete(collection)
-        message = "Collection permanently deleted"
-    else:
-        # Soft delete
-        collection.is_deleted = True
-        collection.deleted_at = datetime.utcnow()
-        message = "Collection deleted"
-    
-    await db.commit()
-    
-    # Log activity
-    activity = ActivityLog(
-        user_id=current_user.id,
-        action="deleted",
-        entity_type="collection",
-        entity_id=collection.id,
-        changes={"hard_delete": hard_delete}
-    )
-    db.add(activity)
-    await db.commit()
+    message, indexes_changed = await write_queue.submit(delete)
+    if indexes_changed:
+        record_index_builder.notify()
     
     return MessageResponse(message=message)
@@ -2,20 +2,35 @@
 File import API endpoints.
 Handles file upload, preview, and batch import of collections and records.
 """
+import asyncio
 import json
-from typing import Dict, Any
+import os
+import uuid
+from typing import Dict, Any, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, AsyncSessionLocal, ReadSessionLocal
 from app.core.dependencies import get_current_active_user
-from app.models.user import User
-from app.models.collection import Collection
-from app.models.record import Record
-from app.models.activity_log import ActivityLog
-from app.services.file_import import process_import_file
+from app.core.principal_cache import AuthenticatedUser
+from app.models.import_job import ImportJob
+from app.services.file_import import (
+    process_import_file,
+    validate_file,
+    validate_upload_size,
+    folder_name_from_filename
+)
+from app.services.import_jobs import (
+    TERMINAL_JOB_STATUSES,
+    import_job_runner,
+    job_snapshot,
+    spool_upload
+)
 
 
 router = APIRouter(prefix="/import", tags=["Import"])
@@ -25,9 +40,14 @@ class ImportPreviewResponse(BaseModel):
     """Response for file preview."""
     folder_name: str
     total_rows: int
+    total_rows_estimated: bool = False
     total_columns: int
     schema: Dict[str, Any]
     preview: list[Dict[str, Any]]
+    # Field types come from the first type_detection_rows rows; when that is
+    # not the whole file, later values that do not fit are imported as text
+    type_detection_rows: int
+    type_detection_partial: bool = False
 
 
 class ImportConfirmRequest(BaseModel):
@@ -46,14 +66,38 @@ class ImportResultResponse(BaseModel):
     message: str
 
 
+class ImportJobResponse(BaseModel):
+    """Background import job status and progress."""
+    id: str
+    status: str
+    filename: str
+    folder_name: str
+    collection_id: Optional[str] = None
+    total_rows_estimate: Optional[int] = None
+    rows_parsed: int
+    rows_inserted: int
+    rows_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+# Interval between server-sent progress events
+JOB_EVENT_INTERVAL_SECONDS = 0.5
+
+
 @router.post("/preview", response_model=ImportPreviewResponse)
 async def preview_file_import(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_active_user)
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Upload and preview a CSV/Excel file.
-    Returns schema and first 5 rows ONLY. Does not return full dataset.
+    Returns schema and first 5 rows ONLY. Only the head of the file is parsed;
+    total_rows may be an estimate (see total_rows_estimated), and field types
+    are detected from the head only (see type_detection_partial).
     """
     # Process file to get preview and stats only
     import_data = await process_import_file(file, preview_only=True)
@@ -61,115 +105,236 @@ async def preview_file_import(
     return ImportPreviewResponse(
         folder_name=import_data['folder_name'],
         total_rows=import_data['total_rows'],
+        total_rows_estimated=import_data['total_rows_estimated'],
         total_columns=import_data['total_columns'],
         schema=import_data['schema'],
-        preview=import_data['preview']
+        preview=import_data['preview'],
+        type_detection_rows=import_data['type_detection_rows'],
+        type_detection_partial=import_data['type_detection_partial']
     )
 
 
 
-@router.post("/upload", response_model=ImportResultResponse)
+@router.post("/upload", response_model=ImportResultResponse, deprecated=True)
 async def upload_and_import_file(
     folder_name: str = Form(...),
     description: str = Form(""),
     schema: str = Form(None),  # Optional: renamed schema from frontend
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    """
+    Deprecated: use POST /import/jobs, which returns at once and reports progress.
+    Imports the file through a background job like POST /import/jobs, one
+    committed chunk at a time, and waits for the job to finish. A request
+    that goes away leaves the job running.
+    """
+    # Closed before waiting; a request-scoped session would keep the writer
+    # connection checked out for the whole import
+    async with AsyncSessionLocal() as db:
+        job = await queue_import_job(db, current_user.id, file, folder_name, description, schema)
+        job_id = job.id
+    
+    job = await wait_for_import_job(job_id)
+    
+    if job.status == "completed":
+        return ImportResultResponse(
+            collection_id=job.collection_id,
+            folder_name=job.folder_name,
+            items_created=job.rows_inserted,
+            message=f"Successfully imported {job.rows_inserted} items into '{job.folder_name}'"
+        )
+    if job.status == "cancelled":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Import job cancelled"
+        )
+    # Unexpected errors are recorded with this prefix; the rest are problems with the file
+    raise HTTPException(
+        status_code=500 if (job.error or "").startswith("Import failed") else 400,
+        detail=job.error or "Import failed"
+    )
+
+
+@router.post("/jobs", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_import_job(
+    folder_name: str = Form(None),
+    description: str = Form(""),
+    schema: str = Form(None),  # Optional: renamed schema from frontend
+    file: UploadFile = File(...),
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Stream and import a CSV/Excel file directly into the database.
-    - Atomic Transaction: Folder + Items created together.
-    - Streaming/Batching: Reads file in chunks (via pandas chunksize if possible, or parsing full df then batch inserting).
-    - Database-generated UTC Timestamps.
-    - Accepts renamed field names from frontend.
+    Spool a CSV/Excel file to disk and import it in the background.
+    Returns the queued job immediately; poll GET /import/jobs/{job_id} or
+    stream GET /import/jobs/{job_id}/events for progress.
+    """
+    job = await queue_import_job(db, current_user.id, file, folder_name, description, schema)
+    return ImportJobResponse(**job_snapshot(job, None))
+
+
+async def queue_import_job(
+    db: AsyncSession,
+    user_id: str,
+    file: UploadFile,
+    folder_name: Optional[str],
+    description: str,
+    schema: Optional[str]
+) -> ImportJob:
     """
-    BATCH_SIZE = 1000
+    Validate an upload, spool it to disk and queue its import job.
+    Raises 400/413 for files that cannot be imported.
+    """
+    validate_file(file)
+    validate_upload_size(file)
+    final_schema = parse_schema_override(schema)
     
-    try:
-        # 1. Parse file
-        import_data = await process_import_file(file, preview_only=False)
-        records = import_data['records']
-        detected_schema = import_data['schema']
-        
-        # 2. Use renamed schema if provided, otherwise use detected schema
-        if schema:
-            try:
-                final_schema = json.loads(schema)
-                # Validate renamed schema
-                validate_schema_fields(final_schema)
-            except json.JSONDecodeError:
-                raise HTTPException(400, "Invalid schema format")
-        else:
-            final_schema = detected_schema
-        
-        # 3. Start Transaction
-        # Create collection - database will set created_at and updated_at
-        collection = Collection(
-            user_id=current_user.id,
-            name=folder_name,
-            description=description,
-            schema=final_schema  # Use renamed or detected schema
-            # NO created_at or updated_at - database handles it
+    job_id = str(uuid.uuid4())
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    file_path = os.path.abspath(os.path.join(settings.IMPORT_SPOOL_DIR, f"{job_id}{file_ext}"))
+    await run_in_threadpool(spool_upload, file.file, file_path)
+    
+    job = ImportJob(
+        id=job_id,
+        user_id=user_id,
+        filename=file.filename,
+        file_path=file_path,
+        folder_name=folder_name or folder_name_from_filename(file.filename),
+        description=description,
+        schema=final_schema
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    
+    import_job_runner.submit(job.id)
+    return job
+
+
+async def wait_for_import_job(job_id: str) -> ImportJob:
+    """Poll an import job (through the reader pool) until it is finished."""
+    while True:
+        async with ReadSessionLocal() as db:
+            job = await db.get(ImportJob, job_id)
+        if job.status in TERMINAL_JOB_STATUSES:
+            return job
+        await asyncio.sleep(JOB_EVENT_INTERVAL_SECONDS)
+
+
+async def get_owned_job(db: AsyncSession, job_id: str, user_id: str) -> ImportJob:
+    """
+    Load an import job owned by the user.
+    Raises 404 if it does not exist or belongs to someone else.
+    """
+    job = await db.get(ImportJob, job_id, populate_existing=True)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
         )
-        
-        db.add(collection)
-        await db.flush()
+    return job
+
 
-        # 4. Batch Insert Items
-        items_created = 0
-        records_to_add = []
+@router.get("/jobs/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(
+    job_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get import job status, rows parsed/inserted, throughput and ETA.
+    """
+    job = await get_owned_job(db, job_id, current_user.id)
+    return ImportJobResponse(**job_snapshot(job, import_job_runner.progress(job.id)))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_import_job_events(
+    job_id: str,
+    request: Request,
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Stream import job progress as server-sent events.
+    Emits a "progress" event whenever the job changes and a final "done"
+    event once it completes, fails or is cancelled.
+    """
+    # Ownership check up front so errors are plain HTTP responses
+    await get_owned_job(db, job_id, current_user.id)
+    
+    async def events():
+        last_payload = None
         
-        for record_data in records:
-            record = Record(
-                collection_id=collection.id,
-                data=record_data
-                # NO created_at or updated_at - database handles it
-            )
-            records_to_add.append(record)
+        while not await request.is_disconnected():
+            # Request-scoped session is closed once streaming starts
+            async with ReadSessionLocal() as session:
+                job = await session.get(ImportJob, job_id)
+                if job is None:
+                    break
+                snapshot = ImportJobResponse(
+                    **job_snapshot(job, import_job_runner.progress(job_id))
+                )
             
-            if len(records_to_add) >= BATCH_SIZE:
-                db.add_all(records_to_add)
-                await db.flush()
-                items_created += len(records_to_add)
-                records_to_add = []
-        
-        if records_to_add:
-            db.add_all(records_to_add)
-            items_created += len(records_to_add)
-
-        # 5. Log Activity - database will set created_at
-        activity = ActivityLog(
-            user_id=current_user.id,
-            action="created",
-            entity_type="collection",
-            entity_id=collection.id,
-            changes={
-                "source": "file_import",
-                "items_imported": items_created,
-                "folder_name": collection.name
-            }
-            # NO created_at - database handles it
-        )
-        db.add(activity)
+            payload = snapshot.model_dump_json()
+            done = snapshot.status in TERMINAL_JOB_STATUSES
+            
+            if done:
+                yield f"event: done\ndata: {payload}\n\n"
+                break
+            if payload != last_payload:
+                yield f"event: progress\ndata: {payload}\n\n"
+                last_payload = payload
+            
+            await asyncio.sleep(JOB_EVENT_INTERVAL_SECONDS)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-        # 6. Commit
-        await db.commit()
-        await db.refresh(collection)
-        
-        return ImportResultResponse(
-            collection_id=collection.id,
-            folder_name=collection.name,
-            items_created=items_created,
-            message=f"Successfully imported {items_created} items into '{collection.name}'"
-        )
 
-    except Exception as e:
-        await db.rollback()
+@router.post("/jobs/{job_id}/cancel", response_model=ImportJobResponse)
+async def cancel_import_job(
+    job_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cancel an import job.
+    Queued jobs are cancelled immediately; a running job is rolled back at its
+    next chunk and reported as cancelled shortly after.
+    """
+    job = await get_owned_job(db, job_id, current_user.id)
+    
+    if job.status in TERMINAL_JOB_STATUSES:
         raise HTTPException(
-            status_code=500,
-            detail=f"Import failed: {str(e)}"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Import job already {job.status}"
         )
+    
+    await import_job_runner.cancel(db, job)
+    
+    return ImportJobResponse(**job_snapshot(job, import_job_runner.progress(job.id)))
+
+
+def parse_schema_override(schema: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Parse and validate the renamed schema sent by the frontend.
+    Returns None when no schema was sent.
+    """
+    if not schema:
+        return None
+    
+    try:
+        final_schema = json.loads(schema)
+    except json.JSONDecodeError:
+        raise HTTPException(400, "Invalid schema format")
+    
+    validate_schema_fields(final_schema)
+    return final_schema
 
 
 def validate_schema_fields(schema: dict) -> None:
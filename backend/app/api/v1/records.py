@@ -2,24 +2,39 @@
 Records API endpoints.
 Handles CRUD operations for records within collections with ownership enforcement.
 """
-from typing import List, Optional
+from dataclasses import asdict
+from typing import List, Optional, Union
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, literal
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.dependencies import get_current_active_user
+from app.core.principal_cache import AuthenticatedUser
+from app.core.pagination import apply_keyset, build_cursor_page
+from app.core.activity_writer import activity_writer
+from app.core.write_queue import write_queue
 from app.schemas import (
     RecordCreate,
     RecordUpdate,
+    RecordPatch,
     RecordResponse,
+    RecordBatchRequest,
+    RecordBatchItemResult,
+    RecordBatchResponse,
+    RecordPage,
+    RecordSearchResult,
+    RecordVersionResponse,
     MessageResponse
 )
-from app.models.user import User
 from app.models.collection import Collection
 from app.models.record import Record
-from app.models.activity_log import ActivityLog
+from app.services.collection_service import adjust_record_count
+from app.services.record_filters import build_record_filter, parse_record_filter
+from app.services.record_search import highlight_record, parse_search_terms, search_records
+from app.services.record_history import HistoryUnavailable, reconstruct_record_version, update_changes
+from app.services.record_service import apply_record_batch, merge_patch_record
 
 
 router = APIRouter(prefix="/collections/{collection_id}/records", tags=["Records"])
@@ -27,7 +42,7 @@ router = APIRouter(prefix="/collections/{collection_id}/records", tags=["Records
 
 async def verify_collection_ownership(
     collection_id: str,
-    current_user: User,
+    current_user: AuthenticatedUser,
     db: AsyncSession
 ) -> Collection:
     """
@@ -53,68 +68,177 @@ async def verify_collection_ownership(
     return collection
 
 
+async def get_collection_record(
+    db: AsyncSession,
+    collection_id: str,
+    record_id: str,
+    for_update: bool = False
+) -> Record:
+    """
+    Load a record of a collection, deleted or not.
+    
+    Args:
+        for_update: Lock the row (SELECT ... FOR UPDATE where supported) so
+                    concurrent updates cannot both build on the same version
+    
+    Raises:
+        HTTPException: 404 if the record does not exist in the collection
+    """
+    query = select(Record).where(
+        and_(
+            Record.id == record_id,
+            Record.collection_id == collection_id
+        )
+    )
+    if for_update:
+        query = query.with_for_update()
+    
+    result = await db.execute(query)
+    record = result.scalar_one_or_none()
+    
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Record not found"
+        )
+    
+    return record
+
+
 @router.post("", response_model=RecordResponse, status_code=status.HTTP_201_CREATED)
 async def create_record(
     collection_id: str,
     record_data: RecordCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Create a new record in a collection.
+    Runs through the write queue, so concurrent creates share one commit.
+    Server-generated timestamps come back from the INSERT (eager_defaults).
     """
-    # Verify collection ownership
-    collection = await verify_collection_ownership(collection_id, current_user, db)
+    async def create(db: AsyncSession) -> Record:
+        # Verify collection ownership
+        collection = await verify_collection_ownership(collection_id, current_user, db)
+        
+        # TODO: Validate data against collection schema if defined
+        
+        # Create record - database will set timestamps
+        record = Record(
+            collection_id=collection.id,
+            data=record_data.data
+            # NO created_at or updated_at - database handles it
+        )
+        
+        db.add(record)
+        await adjust_record_count(db, collection.id, 1)
+        await db.flush()
+        
+        # Log activity
+        activity_writer.record(
+            db,
+            user_id=current_user.id,
+            action="created",
+            entity_type="record",
+            entity_id=record.id,
+            changes={"collection_id": collection_id}
+        )
+        return record
     
-    # TODO: Validate data against collection schema if defined
+    record = await write_queue.submit(create)
     
-    # Create record - database will set timestamps
-    record = Record(
-        collection_id=collection.id,
-        data=record_data.data
-        # NO created_at or updated_at - database handles it
-    )
+    return RecordResponse.from_orm(record)
+
+
+@router.post(":batch", response_model=RecordBatchResponse)
+async def batch_records(
+    collection_id: str,
+    batch: RecordBatchRequest,
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    """
+    Create, update and delete records of a collection in one request.
+    Operations apply in order and commit together; one that fails (e.g. an
+    unknown record id) gets an error result without stopping the others.
+    The batch is logged as a single summary activity entry.
+    """
+    async def apply(db: AsyncSession):
+        collection = await verify_collection_ownership(collection_id, current_user, db)
+        return await apply_record_batch(
+            db,
+            current_user.id,
+            collection.id,
+            [operation.model_dump() for operation in batch.operations]
+        )
     
-    db.add(record)
-    await db.commit()
-    await db.refresh(record)
+    results = await write_queue.submit(apply)
     
-    # Log activity
-    activity = ActivityLog(
-        user_id=current_user.id,
-        action="created",
-        entity_type="record",
-        entity_id=record.id,
-        changes={"collection_id": collection_id}
+    failed = sum(1 for result in results if result.error is not None)
+    return RecordBatchResponse(
+        results=[RecordBatchItemResult(**asdict(result)) for result in results],
+        succeeded=len(results) - failed,
+        failed=failed
     )
-    db.add(activity)
-    await db.commit()
-    
-    return RecordResponse.from_orm(record)
 
 
-@router.get("", response_model=List[RecordResponse])
+@router.get("", response_model=Union[List[RecordResponse], RecordPage])
 async def list_records(
     collection_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination cursor. Pass an empty value for the first page, "
+                    "then the previous page's next_cursor. Ignores skip."
+    ),
     include_deleted: bool = Query(False),
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    filter_: Optional[str] = Query(
+        None,
+        alias="filter",
+        description='JSON object of data field conditions, e.g. {"price": {"gte": 10}, "status": "open"}. '
+                    "Operators: eq, gt, gte, lt, lte, in, contains, is_null."
+    ),
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List all records in a collection.
+    Returns a plain list in offset mode, or a RecordPage when a cursor is given.
+    An optional filter on data fields is validated against the collection
+    schema and applied in the database (see app.services.record_filters).
     """
     # Verify collection ownership
-    await verify_collection_ownership(collection_id, current_user, db)
+    collection = await verify_collection_ownership(collection_id, current_user, db)
     
     # Build query
-    query = select(Record).where(Record.collection_id == collection_id)
+    if filter_:
+        conditions = build_record_filter(
+            parse_record_filter(filter_),
+            collection.schema,
+            db.get_bind().dialect.name
+        )
+        # Collection id inline, so the planner can match the per-collection
+        # partial indexes on data fields (see app.services.record_indexes)
+        query = select(Record).where(
+            Record.collection_id == literal(collection_id, literal_execute=True),
+            *conditions
+        )
+    else:
+        query = select(Record).where(Record.collection_id == collection_id)
     
     if not include_deleted:
         query = query.where(Record.is_deleted == False)
     
-    query = query.offset(skip).limit(limit).order_by(Record.created_at.desc())
+    if cursor is not None:
+        query = apply_keyset(query, Record, cursor, limit)
+        result = await db.execute(query)
+        records, next_cursor = build_cursor_page(result.scalars().all(), limit)
+        
+        return RecordPage(
+            items=[RecordResponse.from_orm(record) for record in records],
+            next_cursor=next_cursor
+        )
+    
+    query = query.offset(skip).limit(limit).order_by(Record.created_at.desc(), Record.id.desc())
     
     result = await db.execute(query)
     records = result.scalars().all()
@@ -122,12 +246,43 @@ async def list_records(
     return [RecordResponse.from_orm(record) for record in records]
 
 
+@router.get("/search", response_model=List[RecordSearchResult])
+async def search_collection_records(
+    collection_id: str,
+    q: str = Query(..., min_length=1, max_length=500, description='Words to match, all required; end a word with * for a prefix match'),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    include_deleted: bool = Query(False),
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Full-text search over a collection's text fields.
+    Hits come best first, each with a relevance score and HTML-escaped
+    snippets of the matching fields, matches wrapped in <mark>.
+    """
+    # Verify collection ownership
+    collection = await verify_collection_ownership(collection_id, current_user, db)
+    
+    terms = parse_search_terms(q)
+    hits = await search_records(db, collection, terms, skip, limit, include_deleted)
+    
+    return [
+        RecordSearchResult(
+            **RecordResponse.from_orm(record).model_dump(),
+            score=score,
+            highlights=highlight_record(record.data, collection.schema, terms)
+        )
+        for record, score in hits
+    ]
+
+
 @router.get("/{record_id}", response_model=RecordResponse)
 async def get_record(
     collection_id: str,
     record_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a specific record by ID.
@@ -135,24 +290,35 @@ async def get_record(
     # Verify collection ownership
     await verify_collection_ownership(collection_id, current_user, db)
     
-    # Get record
-    result = await db.execute(
-        select(Record).where(
-            and_(
-                Record.id == record_id,
-                Record.collection_id == collection_id
-            )
-        )
-    )
-    record = result.scalar_one_or_none()
+    record = await get_collection_record(db, collection_id, record_id)
     
-    if not record:
+    return RecordResponse.from_orm(record)
+
+
+@router.get("/{record_id}/versions/{version}", response_model=RecordVersionResponse)
+async def get_record_version(
+    collection_id: str,
+    record_id: str,
+    version: int,
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get a record's data as of an earlier version, rebuilt from the activity
+    log. Also works for hard-deleted records.
+    """
+    # Verify collection ownership
+    await verify_collection_ownership(collection_id, current_user, db)
+    
+    try:
+        data = await reconstruct_record_version(db, current_user.id, collection_id, record_id, version)
+    except HistoryUnavailable as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Record not found"
+            detail=str(e)
         )
     
-    return RecordResponse.from_orm(record)
+    return RecordVersionResponse(record_id=record_id, version=version, data=data)
 
 
 @router.put("/{record_id}", response_model=RecordResponse)
@@ -160,52 +326,74 @@ async def update_record(
     collection_id: str,
     record_id: str,
     record_data: RecordUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Update a record.
+    The change and its activity log entry commit together.
     """
-    # Verify collection ownership
-    await verify_collection_ownership(collection_id, current_user, db)
-    
-    # Get record
-    result = await db.execute(
-        select(Record).where(
-            and_(
-                Record.id == record_id,
-                Record.collection_id == collection_id
-            )
-        )
-    )
-    record = result.scalar_one_or_none()
-    
-    if not record:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Record not found"
+    async def update(db: AsyncSession) -> Record:
+        # Verify collection ownership
+        await verify_collection_ownership(collection_id, current_user, db)
+        
+        record = await get_collection_record(db, collection_id, record_id, for_update=True)
+        
+        # Track changes
+        old_data = record.data
+        
+        # Update data with explicit timestamp
+        record.data = record_data.data
+        record.version += 1
+        record.updated_at = datetime.utcnow()
+        
+        # Log activity - a diff back to the previous version, not both copies
+        activity_writer.record(
+            db,
+            user_id=current_user.id,
+            action="updated",
+            entity_type="record",
+            entity_id=record.id,
+            changes=update_changes(old_data, record.data, record.version)
         )
+        await db.flush()
+        return record
     
-    # Track changes
-    old_data = record.data.copy()
+    record = await write_queue.submit(update)
     
-    # Update data with explicit timestamp
-    record.data = record_data.data
-    record.updated_at = datetime.utcnow()
-    
-    await db.commit()
-    await db.refresh(record)
+    return RecordResponse.from_orm(record)
+
+
+@router.patch("/{record_id}", response_model=RecordResponse)
+async def patch_record(
+    collection_id: str,
+    record_id: str,
+    record_patch: RecordPatch,
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    """
+    Partially update a record's data with JSON Merge Patch (RFC 7396)
+    semantics: fields set to null are removed, objects are merged and any
+    other value replaces the field. Fields not in the patch are untouched.
+    The merge is applied in the database; the change and its activity log
+    entry (a diff of the patched fields) commit together.
+    """
+    async def patch(db: AsyncSession) -> Record:
+        # Verify collection ownership
+        await verify_collection_ownership(collection_id, current_user, db)
+        
+        record, changes = await merge_patch_record(db, collection_id, record_id, record_patch.data)
+        
+        activity_writer.record(
+            db,
+            user_id=current_user.id,
+            action="updated",
+            entity_type="record",
+            entity_id=record.id,
+            changes=changes
+        )
+        return record
     
-    # Log activity
-    activity = ActivityLog(
-        user_id=current_user.id,
-        action="updated",
-        entity_type="record",
-        entity_id=record.id,
-        changes={"old": old_data, "new": record.data}
-    )
-    db.add(activity)
-    await db.commit()
+    record = await write_queue.submit(patch)
     
     return RecordResponse.from_orm(record)
 
@@ -215,53 +403,94 @@ async def delete_record(
     collection_id: str,
     record_id: str,
     hard_delete: bool = Query(False, description="Permanently delete instead of soft delete"),
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Delete a record (soft delete by default).
+    The deletion and its activity log entry commit together.
     """
-    # Verify collection ownership
-    await verify_collection_ownership(collection_id, current_user, db)
-    
-    # Get record
-    result = await db.execute(
-        select(Record).where(
-            and_(
-                Record.id == record_id,
-                Record.collection_id == collection_id
+    async def delete(db: AsyncSession) -> str:
+        # Verify collection ownership
+        await verify_collection_ownership(collection_id, current_user, db)
+        
+        record = await get_collection_record(db, collection_id, record_id)
+        
+        # Only live records are counted; deleting an already soft-deleted one is a no-op for the count
+        if not record.is_deleted:
+            await adjust_record_count(db, collection_id, -1)
+        
+        if hard_delete:
+            # Permanently delete
+            await db.delete(record)
+            message = "Record permanently deleted"
+        else:
+            # Soft delete
+            record.is_deleted = True
+            record.deleted_at = datetime.utcnow()
+            message = "Record deleted"
+        
+        # Log activity
+        activity_writer.record(
+            db,
+            user_id=current_user.id,
+            action="deleted",
+            entity_type="record",
+            entity_id=record.id,
+            # A hard-deleted record's final data is the base for rebuilding its history
+            changes=(
+                {
+                    "hard_delete": True,
+                    "collection_id": collection_id,
+                    "version": record.version,
+                    "data": record.data
+                }
+                if hard_delete
+                else {"hard_delete": False, "version": record.version}
             )
         )
-    )
-    record = result.scalar_one_or_none()
+        await db.flush()
+        return message
     
-    if not record:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Record not found"
-        )
-    
-    if hard_delete:
-        # Permanently delete
-        await db.delete(record)
-        message = "Record permanently deleted"
-    else:
-        # Soft delete
-        record.is_deleted = True
-        record.deleted_at = datetime.utcnow()
-        message = "Record deleted"
+    message = await write_queue.submit(delete)
     
-    await db.commit()
+    return MessageResponse(message=message)
+
+
+@router.post("/{record_id}/restore", response_model=RecordResponse)
+async def restore_record(
+    collection_id: str,
+    record_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    """
+    Restore a soft-deleted record.
+    The restore and its activity log entry commit together.
+    """
+    async def restore(db: AsyncSession) -> Record:
+        # Verify collection ownership
+        await verify_collection_ownership(collection_id, current_user, db)
+        
+        record = await get_collection_record(db, collection_id, record_id)
+        
+        if not record.is_deleted:
+            return record
+        
+        record.is_deleted = False
+        record.deleted_at = None
+        await adjust_record_count(db, collection_id, 1)
+        
+        # Log activity
+        activity_writer.record(
+            db,
+            user_id=current_user.id,
+            action="restored",
+            entity_type="record",
+            entity_id=record.id,
+            changes={"collection_id": collection_id}
+        )
+        await db.flush()
+        return record
     
-    # Log activity
-    activity = ActivityLog(
-        user_id=current_user.id,
-        action="deleted",
-        entity_type="record",
-        entity_id=record.id,
-        changes={"hard_delete": hard_delete, "data": record.data}
-    )
-    db.add(activity)
-    await db.commit()
+    record = await write_queue.submit(restore)
     
-    return MessageResponse(message=message)
+    return RecordResponse.from_orm(record)
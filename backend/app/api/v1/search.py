@@ -0,0 +1,61 @@
+"""
+Global search API endpoint.
+Searches collection names, descriptions and record text across all of the
+current user's collections.
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_read_db
+from app.core.dependencies import get_current_active_user
+from app.core.principal_cache import AuthenticatedUser
+from app.schemas import (
+    CollectionResponse,
+    GlobalSearchResponse,
+    RecordResponse,
+    RecordSearchResult,
+    SearchGroupResponse
+)
+from app.services.global_search import search_user
+from app.services.record_search import parse_search_terms
+
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("", response_model=GlobalSearchResponse)
+async def global_search(
+    q: str = Query(..., min_length=1, max_length=500, description='Words to match, all required; end a word with * for a prefix match'),
+    limit: int = Query(10, ge=1, le=50, description="Maximum collections returned"),
+    hits_per_collection: int = Query(3, ge=0, le=20, description="Maximum record hits per collection"),
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Search all of the user's collections in one request.
+    Collections whose name or description matched come first, then
+    collections by their best-ranked record hit. Highlights are
+    HTML-escaped snippets with matches wrapped in <mark>.
+    """
+    terms = parse_search_terms(q)
+    groups = await search_user(db, current_user.id, terms, limit, hits_per_collection)
+    
+    return GlobalSearchResponse(
+        query=q,
+        groups=[
+            SearchGroupResponse(
+                collection=CollectionResponse.from_orm(group.collection),
+                score=group.score,
+                highlights=group.highlights,
+                hits=[
+                    RecordSearchResult(
+                        **RecordResponse.from_orm(record).model_dump(),
+                        score=score,
+                        highlights=highlights
+                    )
+                    for record, score, highlights in group.hits
+                ]
+            )
+            for group in groups
+        ]
+    )
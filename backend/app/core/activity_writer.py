@@ -0,0 +1,224 @@
+"""
+Write-behind activity log writer.
+With ACTIVITY_LOG_WRITE_BEHIND enabled, activity log rows are not inserted in
+the request transaction. Once that transaction commits they go onto a bounded
+in-process queue, and a background task inserts them in batches with one
+executemany per flush. Otherwise (and whenever the writer is not running)
+entries are added to the caller's session as before.
+
+Write-behind trades durability for latency: events still queued when the
+process dies are lost.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.activity_log import ActivityLog
+
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding a transaction's not yet published events
+_PENDING_KEY = "pending_activity"
+
+OVERFLOW_POLICIES = ("block", "drop")
+
+
+class ActivityLogWriter:
+    """
+    Buffers committed activity events and inserts them in batches.
+
+    A flush happens when batch_size events are waiting or flush_interval
+    seconds have passed. When the queue is full, the "block" policy makes
+    publishers wait for room, the "drop" policy discards the event and
+    counts it.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        overflow: str = "block",
+        enabled: bool = True
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown activity log overflow policy: {overflow}")
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.enabled = enabled
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start the flush task (no-op when disabled)."""
+        if self.enabled and self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="activity-log-writer")
+
+    async def stop(self) -> None:
+        """Flush everything queued, then stop the flush task."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._batch_ready.set()
+        await self._task
+        self._task = None
+
+    def record(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        action: str,
+        entity_type: str,
+        entity_id: str,
+        changes: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> None:
+        """
+        Record an activity log entry as part of the session's transaction.
+
+        Without write-behind the row is added to the session. With it, the
+        event is held on the session until publish() is called after the
+        commit, so events of rolled-back transactions are never written.
+
+        Args:
+            db: Session of the transaction making the change
+            user_id: Acting user
+            action: 'created', 'updated', 'deleted', etc.
+            entity_type: 'collection', 'record', 'user', etc.
+            entity_id: Id of the changed entity
+            changes: Change details
+            ip_address: Client address, if known
+            user_agent: Client user agent, if known
+        """
+        if not self.running:
+            # Database will set created_at
+            db.add(ActivityLog(
+                user_id=user_id,
+                action=action,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                changes=changes,
+                ip_address=ip_address,
+                user_agent=user_agent
+            ))
+            return
+
+        db.info.setdefault(_PENDING_KEY, []).append({
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "changes": changes,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            # When it happened, not when the batch is flushed
+            "created_at": datetime.utcnow(),
+        })
+
+    def pending_count(self, db: AsyncSession) -> int:
+        """Number of events recorded on the session and not yet published."""
+        return len(db.info.get(_PENDING_KEY, ()))
+
+    def discard_pending(self, db: AsyncSession, keep: int = 0) -> None:
+        """Forget events recorded after the first `keep` (their changes were rolled back)."""
+        del db.info.get(_PENDING_KEY, [])[keep:]
+
+    async def publish(self, db: AsyncSession) -> None:
+        """
+        Queue the events of a committed session for writing.
+        Call right after a successful commit.
+        """
+        events = db.info.pop(_PENDING_KEY, None)
+        for event in events or ():
+            await self._enqueue(event)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters and current queue depth."""
+        return {
+            "write_behind": self.running,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+    async def _enqueue(self, event: Dict[str, Any]) -> None:
+        if self.overflow == "block":
+            await self._queue.put(event)
+        else:
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                if self.dropped % 1000 == 1:
+                    logger.warning(f"Activity log queue full; {self.dropped} events dropped so far")
+                return
+
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+
+    async def _run(self) -> None:
+        while True:
+            if not self._stopping and self._queue.qsize() < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._batch_ready.clear()
+
+            while not self._queue.empty():
+                batch: List[Dict[str, Any]] = []
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                await self._flush(batch)
+
+            if self._stopping:
+                return
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(ActivityLog.__table__), batch)
+                await session.commit()
+        except Exception:
+            self.failed += len(batch)
+            logger.exception(f"Failed to write {len(batch)} activity log entries")
+            return
+        self.written += len(batch)
+        self.flushes += 1
+
+
+# Global activity log writer
+activity_writer = ActivityLogWriter(
+    AsyncSessionLocal,
+    queue_size=settings.ACTIVITY_LOG_QUEUE_SIZE,
+    batch_size=settings.ACTIVITY_LOG_BATCH_SIZE,
+    flush_interval=settings.ACTIVITY_LOG_FLUSH_INTERVAL_MS / 1000,
+    overflow=settings.ACTIVITY_LOG_OVERFLOW,
+    enabled=settings.ACTIVITY_LOG_WRITE_BEHIND
+)
@@ -23,6 +23,33 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DATABASE_READ_URLS: str = ""  # Comma-separated read replica URLs for GET routes
+    READ_AFTER_WRITE_STICKY_SECONDS: int = 5  # Read from the primary this long after a write
+    
+    @property
+    def DATABASE_READ_URL_LIST(self) -> List[str]:
+        """Get list of read replica URLs."""
+        return [url.strip() for url in self.DATABASE_READ_URLS.split(",") if url.strip()]
+    
+    # Connection pool for server databases (e.g. PostgreSQL). Sizes are per
+    # process: each worker holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT_SECONDS: int = 30  # Wait for a free connection before failing
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout (drops dead ones after failover)
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this; -1 disables
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Prepared statements cached per connection
+    DB_SERVER_SIDE_PREPARE: bool = True  # Disable behind PgBouncer in transaction mode
+    DB_PREPARE_THRESHOLD: int = 5  # psycopg: executions before a query is prepared server-side
+    
+    # SQLite (file databases): per-connection pragmas, reader pool and write queue
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL; FULL also syncs every commit
+    SQLITE_MMAP_SIZE: int = 268435456  # 256MB
+    SQLITE_CACHE_SIZE: int = -65536  # Negative = KiB, i.e. 64MB per connection
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_READER_POOL_SIZE: int = 8
+    SQLITE_WRITER_TIMEOUT_SECONDS: int = 30  # Wait for the single writer connection
+    SQLITE_WRITE_BATCH_SIZE: int = 64  # Max queued writes committed together
     
     # Security
     SECRET_KEY: str
@@ -72,6 +99,53 @@ class Settings(BaseSettings):
     MAX_LOGIN_ATTEMPTS: int = 5
     ACCOUNT_LOCKOUT_MINUTES: int = 30
     PASSWORD_MIN_LENGTH: int = 8
+    
+    # Authenticated principal cache (per process)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    
+    # File Import
+    IMPORT_INSERT_BATCH_SIZE: int = 5000  # Rows per executemany when inserting imported records
+    IMPORT_JOB_WORKERS: int = 2  # Background import jobs processed concurrently
+    IMPORT_SPOOL_DIR: str = "./import_spool"  # Uploads are kept here until their job finishes
+    EXCEL_PARSE_WORKERS: int = 2  # Worker processes parsing .xlsx sheets
+    
+    # Background Work Claims (running import jobs and index builds record their
+    # process and a heartbeat; other processes only take over stale claims)
+    WORKER_HEARTBEAT_SECONDS: int = 15
+    WORKER_STALE_SECONDS: int = 90  # No heartbeat for this long: the owner is presumed dead
+    
+    # Export
+    EXPORT_BATCH_SIZE: int = 1000  # Records fetched from the cursor and written per batch
+    
+    # Activity Log (write-behind: audit rows are inserted in batches after the request commits)
+    ACTIVITY_LOG_WRITE_BEHIND: bool = False
+    ACTIVITY_LOG_QUEUE_SIZE: int = 10000  # Committed events waiting to be written
+    ACTIVITY_LOG_BATCH_SIZE: int = 500  # Flush when this many events are waiting...
+    ACTIVITY_LOG_FLUSH_INTERVAL_MS: int = 200  # ...or this long after the last flush
+    ACTIVITY_LOG_OVERFLOW: str = "block"  # Queue full: "block" waits for room, "drop" discards and counts
+    
+    # Activity Log Retention (rows older than this move to compressed NDJSON archives; 0 keeps everything)
+    ACTIVITY_RETENTION_DAYS: int = 0
+    ACTIVITY_ARCHIVE_DIR: str = "./activity_archive"
+    ACTIVITY_ARCHIVE_INTERVAL_MINUTES: int = 60
+    ACTIVITY_ARCHIVE_BATCH_SIZE: int = 5000  # Rows moved per archive append + delete
+    
+    # Record History (activity log stores diffs, with a full snapshot every N versions)
+    RECORD_HISTORY_SNAPSHOT_INTERVAL: int = 20
+    
+    # Record Batches (create/update/delete operations accepted per batch request)
+    RECORD_BATCH_MAX_OPERATIONS: int = 1000
+    
+    # Record Indexes (schema fields marked "indexed" get an expression index per collection)
+    RECORD_INDEX_MAX_FIELDS: int = 10
+    
+    # Search Reindexing (records per write when a text field change rebuilds a collection's search index)
+    SEARCH_REINDEX_BATCH_SIZE: int = 1000
+    
+    # Password Hashing (Argon2 runs in a bounded thread pool off the event loop)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32  # Waiting jobs beyond the workers before shedding with 503
 
 
 # Global settings instance
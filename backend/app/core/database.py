@@ -1,25 +1,186 @@
 """
 Database configuration and session management.
-Provides async SQLAlchemy engine and session factory.
+Provides async SQLAlchemy engines and session factories.
+
+With a file-backed SQLite database, writes go through a single writer
+connection and reads through a separate pool of read-only connections; WAL
+lets the readers proceed while a write is in progress. Other databases (e.g.
+PostgreSQL) use one engine for both, with a pool sized by the DB_POOL_*
+settings. Pool sizes are per process, so every uvicorn worker holds up to
+DB_POOL_SIZE + DB_MAX_OVERFLOW connections.
+
+When DATABASE_READ_URLS lists read replicas, get_read_db round-robins
+between them, except for requests inside a read-after-write window
+(see app.core.read_routing), which read from the primary.
 """
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import itertools
+import os
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from fastapi import Request
 
 from app.core.config import settings
+from app.core.read_routing import prefers_primary
+
+
+def is_sqlite(url: str) -> bool:
+    """Check whether a database URL points at SQLite."""
+    return url.startswith("sqlite")
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that also records how long checkouts take, which includes
+    waiting for a free connection and opening overflow connections.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def _driver_connect_args(url: str) -> Dict[str, Any]:
+    """
+    Statement caching / server-side prepare options for the PostgreSQL drivers.
+    Disable DB_SERVER_SIDE_PREPARE behind PgBouncer in transaction mode.
+    """
+    driver = make_url(url).get_driver_name()
+    if driver == "asyncpg":
+        if not settings.DB_SERVER_SIDE_PREPARE:
+            return {"prepared_statement_cache_size": 0, "statement_cache_size": 0}
+        return {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    if driver == "psycopg":
+        # prepare_threshold=None turns server-side prepared statements off
+        return {"prepare_threshold": settings.DB_PREPARE_THRESHOLD if settings.DB_SERVER_SIDE_PREPARE else None}
+    return {}
+
+
+def _apply_psycopg_statement_cache(engine: AsyncEngine) -> None:
+    # psycopg has no connect argument for its prepared statement cache size
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_prepared_max(dbapi_connection, connection_record):
+        dbapi_connection.driver_connection.prepared_max = settings.DB_STATEMENT_CACHE_SIZE
 
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    # SQLite-specific settings for async
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    poolclass=StaticPool if "sqlite" in settings.DATABASE_URL else None,
+def _apply_sqlite_pragmas(engine: AsyncEngine, readonly: bool = False) -> None:
+    """
+    Configure every new SQLite connection of an engine.
+
+    Write connections take the write lock up front (BEGIN IMMEDIATE) so a
+    contended write waits for busy_timeout instead of failing when a read
+    transaction is upgraded. pysqlite's own transaction handling is disabled
+    for that, which also makes SAVEPOINTs work.
+    """
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        if readonly:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN" if readonly else "BEGIN IMMEDIATE")
+
+
+def create_engine_for(url: str, readonly: bool = False) -> AsyncEngine:
+    """
+    Create an async engine for a database URL.
+
+    Args:
+        url: Database URL
+        readonly: For file-backed SQLite, build the read-only reader pool
+                  instead of the single writer connection
+
+    Returns:
+        AsyncEngine
+    """
+    if not is_sqlite(url):
+        engine = create_async_engine(
+            url,
+            echo=settings.DEBUG,
+            future=True,
+            connect_args=_driver_connect_args(url),
+            poolclass=TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        )
+        if make_url(url).get_driver_name() == "psycopg":
+            _apply_psycopg_statement_cache(engine)
+        return engine
+
+    if ":memory:" in url:
+        # An in-memory database only exists on its one shared connection
+        return create_async_engine(
+            url,
+            echo=settings.DEBUG,
+            future=True,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+
+    engine = create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        future=True,
+        connect_args={"check_same_thread": False},
+        # Readers get a pool; writes are serialized through one connection
+        poolclass=TimedQueuePool,
+        pool_size=settings.SQLITE_READER_POOL_SIZE if readonly else 1,
+        max_overflow=0,
+        pool_timeout=settings.SQLITE_WRITER_TIMEOUT_SECONDS,
+    )
+    _apply_sqlite_pragmas(engine, readonly=readonly)
+    return engine
+
+
+def _separate_read_engine(url: str) -> bool:
+    return is_sqlite(url) and ":memory:" not in url
+
+
+# Create async engines
+engine = create_engine_for(settings.DATABASE_URL)
+read_engine = (
+    create_engine_for(settings.DATABASE_URL, readonly=True)
+    if _separate_read_engine(settings.DATABASE_URL)
+    else engine
 )
 
-# Create async session factory
+# Create async session factories
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -28,6 +189,68 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+# Read replicas (optional), used by get_read_db in round-robin order
+replica_engines = [create_engine_for(url, readonly=True) for url in settings.DATABASE_READ_URL_LIST]
+ReplicaSessionLocals = [
+    async_sessionmaker(
+        replica,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+    for replica in replica_engines
+]
+_next_replica = itertools.cycle(ReplicaSessionLocals)
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """
+    Describe an engine's connection pool.
+
+    Returns:
+        Pool class, configured size and current checked-in / checked-out /
+        overflow counts; for TimedQueuePool also checkout count, timeouts and
+        wait times in milliseconds.
+    """
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    if isinstance(pool, TimedQueuePool):
+        stats.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "wait_ms_avg": round(pool.wait_seconds_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            "wait_ms_max": round(pool.wait_seconds_max * 1000, 3),
+        })
+    return stats
+
+
+def database_pool_stats() -> Dict[str, Any]:
+    """Pool stats for this worker process's engines."""
+    stats = {"pid": os.getpid(), "primary": pool_stats(engine)}
+    if read_engine is not engine:
+        stats["read"] = pool_stats(read_engine)
+    if replica_engines:
+        stats["replicas"] = [pool_stats(replica) for replica in replica_engines]
+    return stats
+
+
 # Base class for models
 Base = declarative_base()
 
@@ -35,7 +258,7 @@ Base = declarative_base()
 async def get_db() -> AsyncSession:
     """
     Dependency function to get database session.
-    
+
     Yields:
         AsyncSession: Database session
     """
@@ -46,6 +269,44 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    Dependency function to get a read-only database session.
+    Use for GET routes so reads do not queue behind the SQLite writer and can
+    be served by read replicas.
+
+    Yields:
+        AsyncSession: Database session on the next replica, or on the primary
+        when no replicas are configured or the client recently wrote
+    """
+    if ReplicaSessionLocals and not prefers_primary(request):
+        session_factory = next(_next_replica)
+    else:
+        session_factory = ReadSessionLocal
+
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_primary_read_db() -> AsyncSession:
+    """
+    Dependency function to get a read-only database session on the primary.
+    Use where reads must see the latest commits (e.g. credentials and lockout
+    state) but must not hold the SQLite writer, e.g. while hashing passwords.
+    
+    Yields:
+        AsyncSession: Read session on the primary database
+    """
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def init_db():
     """
     Initialize database - create all tables.
@@ -61,3 +322,7 @@ async def close_db():
     Call this on application shutdown.
     """
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
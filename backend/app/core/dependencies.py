@@ -8,7 +8,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.core.principal_cache import AuthenticatedUser, principal_cache
 from app.core.security import verify_access_token
 from app.models.user import User
 
@@ -17,10 +18,59 @@ from app.models.user import User
 security = HTTPBearer()
 
 
+async def _resolve_principal(
+    token: str,
+    db: AsyncSession
+) -> Optional[AuthenticatedUser]:
+    """
+    Resolve an access token to a user snapshot, using the principal cache.
+    
+    Only active, unlocked users are cached, so a cache hit is always
+    authorized; misses fall through to the database.
+    
+    Args:
+        token: Raw access token
+        db: Database session
+        
+    Returns:
+        AuthenticatedUser, or None if the token is invalid or the user is gone
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    
+    payload = verify_access_token(token)
+    if payload is None:
+        return None
+    
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        return None
+    
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    
+    if user is None:
+        return None
+    
+    principal = AuthenticatedUser(
+        id=user.id,
+        email=user.email,
+        is_active=user.is_active,
+        is_locked=user.is_locked,
+        email_verified=user.email_verified
+    )
+    
+    if principal.is_active and not principal.is_locked:
+        principal_cache.set(token, principal, payload.get("exp"))
+    
+    return principal
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_read_db)
+) -> AuthenticatedUser:
     """
     Get the current authenticated user from JWT token.
     
@@ -29,7 +79,8 @@ async def get_current_user(
         db: Database session
         
     Returns:
-        User object
+        AuthenticatedUser snapshot (load the User row explicitly if more
+        profile fields are needed)
         
     Raises:
         HTTPException: If token is invalid or user not found
@@ -40,18 +91,7 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    # Verify token
-    payload = verify_access_token(credentials.credentials)
-    if payload is None:
-        raise credentials_exception
-    
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
-    
-    # Get user from database
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await _resolve_principal(credentials.credentials, db)
     
     if user is None:
         raise credentials_exception
@@ -72,8 +112,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: AuthenticatedUser = Depends(get_current_user)
+) -> AuthenticatedUser:
     """
     Get current active user (verified email).
     
@@ -81,7 +121,7 @@ async def get_current_active_user(
         current_user: Current user from token
         
     Returns:
-        User object
+        AuthenticatedUser snapshot
         
     Raises:
         HTTPException: If email is not verified
@@ -97,8 +137,8 @@ async def get_current_active_user(
 
 async def get_optional_current_user(
     authorization: Optional[str] = Header(None),
-    db: AsyncSession = Depends(get_db)
-) -> Optional[User]:
+    db: AsyncSession = Depends(get_read_db)
+) -> Optional[AuthenticatedUser]:
     """
     Get current user if authenticated, None otherwise.
     Useful for endpoints that work for both authenticated and anonymous users.
@@ -108,7 +148,7 @@ async def get_optional_current_user(
         db: Database session
         
     Returns:
-        User object or None
+        AuthenticatedUser snapshot or None
     """
     if not authorization:
         return None
@@ -117,17 +157,7 @@ async def get_optional_current_user(
         return None
     
     token = authorization.replace("Bearer ", "")
-    payload = verify_access_token(token)
-    
-    if payload is None:
-        return None
-    
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        return None
-    
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await _resolve_principal(token, db)
     
     if user and user.is_active and not user.is_locked:
         return user
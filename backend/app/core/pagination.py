@@ -0,0 +1,114 @@
+"""
+Keyset (cursor) pagination helpers.
+Pages are addressed by the (created_at, id) of the last row seen instead of an
+OFFSET, so every page costs the same index seek regardless of depth.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, Select, and_, bindparam, or_
+from sqlalchemy.dialects import sqlite
+
+
+# SQLite stores server-generated timestamps as "YYYY-MM-DD HH:MM:SS" with no
+# fractional part, while the default DateTime bind always appends ".ffffff".
+# Cursor values are bound in the same text form as the stored column so that
+# equality and ordering comparisons line up.
+_SECONDS_TIMESTAMP = DateTime().with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """
+    Encode a (created_at, id) position as an opaque URL-safe cursor.
+
+    Args:
+        created_at: Timestamp of the last row on the page
+        row_id: Primary key of the last row on the page
+
+    Returns:
+        Cursor string
+    """
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous page
+
+    Returns:
+        Tuple of (created_at, id)
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def apply_keyset(query: Select, model: Any, cursor: str, limit: int) -> Select:
+    """
+    Order a query newest-first and restrict it to rows after the cursor.
+
+    Fetches one extra row so build_cursor_page can tell whether a next page
+    exists without a separate COUNT.
+
+    Args:
+        query: Select statement over model
+        model: Mapped class with created_at and id columns
+        cursor: Cursor from a previous page, or empty for the first page
+        limit: Page size
+
+    Returns:
+        Paginated select statement
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        timestamp_type = _SECONDS_TIMESTAMP if created_at.microsecond == 0 else DateTime()
+        cursor_ts = bindparam("cursor_created_at", created_at, type_=timestamp_type)
+        query = query.where(
+            or_(
+                model.created_at < cursor_ts,
+                and_(model.created_at == cursor_ts, model.id < row_id)
+            )
+        )
+
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def build_cursor_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Split the over-fetched rows from apply_keyset into a page and next cursor.
+
+    Args:
+        rows: Rows returned by a query built with apply_keyset
+        limit: Page size
+
+    Returns:
+        Tuple of (rows on this page, next cursor or None on the last page)
+    """
+    page = list(rows[:limit])
+
+    if len(rows) > limit and page:
+        return page, encode_cursor(page[-1].created_at, page[-1].id)
+
+    return page, None
@@ -0,0 +1,129 @@
+"""
+In-process cache of authenticated principals.
+Maps a verified access token to a small snapshot of its user so that
+authenticated requests skip the per-request user lookup.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Snapshot of the user fields needed to authorize a request."""
+    id: str
+    email: str
+    is_active: bool
+    is_locked: bool
+    email_verified: bool
+
+
+class PrincipalCache:
+    """
+    TTL + LRU cache of access token -> AuthenticatedUser.
+
+    Entries expire after PRINCIPAL_CACHE_TTL_SECONDS or when the token itself
+    expires, whichever comes first. The cache is per process, so with several
+    workers a lock or deactivation is seen by other workers within one TTL;
+    auth_service invalidates the local entries explicitly.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[AuthenticatedUser, float]]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> Optional[AuthenticatedUser]:
+        """
+        Look up a token, returning None on a miss or an expired entry.
+        """
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        principal, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._remove(token)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return principal
+
+    def set(self, token: str, principal: AuthenticatedUser, token_exp: Optional[float] = None) -> None:
+        """
+        Cache a principal for a verified token.
+
+        Args:
+            token: Raw access token
+            principal: User snapshot
+            token_exp: Token "exp" claim (unix time), caps the entry lifetime
+        """
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+
+        lifetime = self.ttl_seconds
+        if token_exp is not None:
+            lifetime = min(lifetime, token_exp - time.time())
+        if lifetime <= 0:
+            return
+
+        if token in self._entries:
+            self._remove(token)
+
+        self._entries[token] = (principal, time.monotonic() + lifetime)
+        self._tokens_by_user.setdefault(principal.id, set()).add(token)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate_user(self, user_id: str) -> None:
+        """
+        Drop every cached token for a user.
+        Call after any change to the user's active, locked or verified state.
+        """
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+
+        user_tokens = self._tokens_by_user.get(entry[0].id)
+        if user_tokens is not None:
+            user_tokens.discard(token)
+            if not user_tokens:
+                del self._tokens_by_user[entry[0].id]
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
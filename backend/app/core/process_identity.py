@@ -0,0 +1,26 @@
+"""
+Identity of this server process.
+Background work claimed in the database (import jobs, record index builds)
+records the id of the process running it, so that with several workers a
+process only recovers work whose owner has stopped sending heartbeats.
+"""
+import os
+import socket
+import uuid
+from typing import Optional, Tuple
+
+
+_identity: Optional[Tuple[int, str]] = None
+
+
+def process_id() -> str:
+    """
+    Id of this process: host, pid and a random suffix, so a restarted process
+    that happens to reuse a pid is never taken for the old one. Recomputed
+    after a fork, so forked workers do not share their parent's id.
+    """
+    global _identity
+    pid = os.getpid()
+    if _identity is None or _identity[0] != pid:
+        _identity = (pid, f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}")
+    return _identity[1]
@@ -0,0 +1,88 @@
+"""
+Read-your-writes support for read-replica routing.
+
+After a successful mutation the client is told to keep reading from the
+primary for READ_AFTER_WRITE_STICKY_SECONDS, so it does not see a replica
+that has not caught up with its own write yet. The deadline is sent both as
+a cookie and as the X-Read-Primary-Until response header; clients echo
+either one back.
+
+The SPA talks to the API cross-origin without credentials, so browsers
+neither store nor send the cookie for it. It relies on the header instead:
+CORS exposes it (see app.main) and the axios client in
+frontend/src/utils/api.ts sends the latest deadline back on every request.
+"""
+import time
+from typing import Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+
+
+READ_PRIMARY_COOKIE = "nexora_read_primary_until"
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _parse_deadline(value: Optional[str]) -> float:
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def prefers_primary(request: Request) -> bool:
+    """
+    Check whether a request should read from the primary: mutations always
+    do, other requests while inside a read-after-write window.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        True if reads should go to the primary database
+    """
+    if request.method not in _SAFE_METHODS:
+        return True
+    deadline = max(
+        _parse_deadline(request.cookies.get(READ_PRIMARY_COOKIE)),
+        _parse_deadline(request.headers.get(READ_PRIMARY_HEADER)),
+    )
+    return deadline > time.time()
+
+
+class ReadAfterWriteMiddleware:
+    """
+    ASGI middleware marking successful mutations (non-GET/HEAD/OPTIONS,
+    status < 400) with a primary-read deadline cookie and response header.
+    Plain ASGI rather than BaseHTTPMiddleware so streamed responses pass
+    through untouched.
+    """
+
+    def __init__(self, app, sticky_seconds: int):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_deadline(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                deadline = f"{time.time() + self.sticky_seconds:.3f}"
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={deadline}; Max-Age={self.sticky_seconds}; "
+                    f"Path=/; HttpOnly; SameSite={settings.SESSION_COOKIE_SAMESITE}"
+                )
+                if settings.SESSION_COOKIE_SECURE:
+                    cookie += "; Secure"
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"set-cookie", cookie.encode("latin-1")),
+                    (READ_PRIMARY_HEADER.lower().encode("latin-1"), deadline.encode("latin-1")),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_deadline)
@@ -2,8 +2,11 @@
 Security utilities for authentication and encryption.
 Handles JWT tokens, password hashing, and CSRF protection.
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, TypeVar
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import secrets
@@ -21,6 +24,16 @@ pwd_context = CryptContext(
     argon2__parallelism=4
 )
 
+# Argon2 is CPU- and memory-bound and releases the GIL, so a small thread pool
+# keeps it off the event loop without blocking unrelated requests.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="argon2"
+)
+_hash_jobs_in_flight = 0
+
+T = TypeVar("T")
+
 
 def hash_password(password: str) -> str:
     """
@@ -49,6 +62,76 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_hash_job(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a password hashing job in the Argon2 thread pool.
+    
+    Jobs beyond the pool size queue up to PASSWORD_HASH_QUEUE_LIMIT; past that
+    the request is shed instead of letting a login storm build an unbounded
+    backlog.
+    
+    Raises:
+        HTTPException: 503 if the hashing queue is full
+    """
+    global _hash_jobs_in_flight
+    
+    capacity = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT
+    if _hash_jobs_in_flight >= capacity:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+    
+    _hash_jobs_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_jobs_in_flight -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password using Argon2 without blocking the event loop.
+    
+    Args:
+        password: Plain text password
+        
+    Returns:
+        Hashed password
+        
+    Raises:
+        HTTPException: 503 if the hashing queue is full
+    """
+    return await _run_hash_job(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against its hash without blocking the event loop.
+    
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password to verify against
+        
+    Returns:
+        True if password matches, False otherwise
+        
+    Raises:
+        HTTPException: 503 if the hashing queue is full
+    """
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+
+def shutdown_password_hasher() -> None:
+    """
+    Stop the Argon2 thread pool.
+    Call this on application shutdown.
+    """
+    _hash_executor.shutdown(wait=True, cancel_futures=True)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -0,0 +1,171 @@
+"""
+Async write queue with group commit.
+On SQLite every write goes through one connection. Queued write operations
+are run back to back by a single task and committed together, so a burst of
+small transactions pays for one commit instead of one each.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.activity_writer import activity_writer
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, is_sqlite
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# A write operation receives the shared session and must not commit it
+WriteOperation = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriteQueue:
+    """
+    Runs write operations on a single task and group-commits them.
+
+    While one batch is being written, newly submitted operations queue up and
+    form the next batch (up to max_batch). Each operation runs in its own
+    SAVEPOINT, so one that raises is rolled back and re-raised to its caller
+    while the rest of the batch still commits.
+
+    When the queue is not running (disabled for non-SQLite databases, or
+    before start()), submit() runs the operation in its own session and
+    commits it directly.
+
+    Activity events recorded by an operation (see ActivityLogWriter) are
+    published once its commit succeeds and dropped if it is rolled back.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, max_batch: int, enabled: bool = True):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.enabled = enabled
+        self._queue: "asyncio.Queue[Optional[Tuple[WriteOperation, asyncio.Future]]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.operations = 0
+
+    async def start(self) -> None:
+        """Start the writer task (no-op when disabled)."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="write-queue")
+
+    async def stop(self) -> None:
+        """Write everything already queued, then stop the writer task."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, operation: WriteOperation) -> T:
+        """
+        Run a write operation and wait until it is committed.
+
+        Args:
+            operation: Async callable taking the session. It may add, flush,
+                       refresh and execute, but must not commit or roll back.
+
+        Returns:
+            Whatever the operation returned
+
+        Raises:
+            Exception: Whatever the operation raised, or the commit error
+        """
+        if self._task is None:
+            async with self.session_factory() as session:
+                result = await operation(session)
+                await session.commit()
+                await activity_writer.publish(session)
+                return result
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future))
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch counters and current queue depth."""
+        return {
+            "enabled": self._task is not None,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "operations": self.operations,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                await self._write_batch(batch)
+            except Exception:
+                logger.exception("Write queue batch failed")
+
+            if stopping:
+                return
+
+    async def _write_batch(self, batch: List[Tuple[WriteOperation, asyncio.Future]]) -> None:
+        # Callers that gave up (e.g. disconnected clients) are skipped
+        pending = [(operation, future) for operation, future in batch if not future.done()]
+        if not pending:
+            return
+
+        outcomes = []
+        try:
+            async with self.session_factory() as session:
+                for operation, future in pending:
+                    recorded = activity_writer.pending_count(session)
+                    try:
+                        async with session.begin_nested():
+                            result = await operation(session)
+                    except Exception as e:
+                        activity_writer.discard_pending(session, recorded)
+                        outcomes.append((future, None, e))
+                    else:
+                        outcomes.append((future, result, None))
+
+                await session.commit()
+                await activity_writer.publish(session)
+        except Exception as e:
+            # Nothing in the batch was written
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+
+        self.batches += 1
+        self.operations += len(pending)
+
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+# Global write queue (group commit is only used with SQLite)
+write_queue = WriteQueue(
+    AsyncSessionLocal,
+    max_batch=settings.SQLITE_WRITE_BATCH_SIZE,
+    enabled=is_sqlite(settings.DATABASE_URL)
+)
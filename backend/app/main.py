@@ -8,8 +8,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from app.core.activity_writer import activity_writer
 from app.core.config import settings
-from app.core.database import init_db, close_db
+from app.core.database import init_db, close_db, database_pool_stats
+from app.core.security import shutdown_password_hasher
+from app.core.principal_cache import principal_cache
+from app.core.read_routing import READ_PRIMARY_HEADER, ReadAfterWriteMiddleware
+from app.core.write_queue import write_queue
+from app.services.import_jobs import import_job_runner
+from app.services.activity_archive import activity_retention_job
+from app.services.record_indexes import record_index_builder
+from app.services.record_search import search_reindexer
+from app.services.excel_reader import shutdown_excel_pool
 from app.api.v1 import router as api_v1_router
 
 
@@ -34,12 +44,39 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Database initialized")
     
+    # Start the group-commit writer (SQLite only)
+    await write_queue.start()
+    
+    # Start the write-behind activity log writer (if enabled)
+    await activity_writer.start()
+    
+    # Start background import workers (re-queues unfinished jobs)
+    await import_job_runner.start()
+    
+    # Start archiving activity logs past the retention window (if enabled)
+    await activity_retention_job.start()
+    
+    # Build and drop record field indexes queued by schema changes
+    await record_index_builder.start()
+    
+    # Rebuild search index rows of collections whose text fields changed
+    await search_reindexer.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    await search_reindexer.stop()
+    await record_index_builder.stop()
+    await activity_retention_job.stop()
+    await import_job_runner.stop()
+    await write_queue.stop()
+    # After the writers above, so their last events are flushed too
+    await activity_writer.stop()
     await close_db()
     logger.info("Database connections closed")
+    shutdown_password_hasher()
+    shutdown_excel_pool()
 
 
 # Create FastAPI application
@@ -53,16 +90,26 @@ app = FastAPI(
 )
 
 
-# Configure CORS
+# Configure CORS (the read-after-write deadline is exposed so the SPA can
+# echo it back; it does not send cookies cross-origin)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[READ_PRIMARY_HEADER],
 )
 
 
+# Read-your-writes stickiness (only needed with read replicas)
+if settings.DATABASE_READ_URL_LIST:
+    app.add_middleware(
+        ReadAfterWriteMiddleware,
+        sticky_seconds=settings.READ_AFTER_WRITE_STICKY_SECONDS,
+    )
+
+
 # Include routers
 app.include_router(api_v1_router, prefix="/api")
 
@@ -86,10 +133,26 @@ async def health_check():
     return {
         "status": "healthy",
         "app": settings.APP_NAME,
-        "version": settings.APP_VERSION
+        "version": settings.APP_VERSION,
+        "principal_cache": principal_cache.stats(),
+        "write_queue": write_queue.stats(),
+        "activity_log": activity_writer.stats(),
+        "activity_retention": activity_retention_job.stats(),
+        "record_indexes": record_index_builder.stats(),
+        "search_reindex": search_reindexer.stats()
     }
 
 
+# Database pool statistics
+@app.get("/health/db", tags=["Health"])
+async def database_pool_health():
+    """
+    Connection pool statistics for the worker process that serves the request:
+    configured size, checked-out and overflow connections, checkout wait times.
+    """
+    return database_pool_stats()
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -6,6 +6,9 @@ from app.models.otp import OTP
 from app.models.collection import Collection
 from app.models.record import Record
 from app.models.activity_log import ActivityLog
+from app.models.import_job import ImportJob
+from app.models.record_index import RecordIndex
+from app.models import record_search  # noqa: F401 - registers the full-text index DDL
 
 __all__ = [
     "User",
@@ -15,4 +18,6 @@ __all__ = [
     "Collection",
     "Record",
     "ActivityLog",
+    "ImportJob",
+    "RecordIndex",
 ]
@@ -2,7 +2,7 @@
 Activity log model for audit trail.
 """
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, text
+from sqlalchemy import Column, Index, String, DateTime, ForeignKey, JSON, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -12,6 +12,12 @@ class ActivityLog(Base):
     """Audit log for user activities."""
     
     __tablename__ = "activity_logs"
+    __table_args__ = (
+        # Serves newest-first keyset pagination (see app.core.pagination)
+        Index("ix_activity_logs_user_keyset", "user_id", "created_at", "id"),
+        # Serves per-entity history lookups (see app.services.record_history)
+        Index("ix_activity_logs_entity", "entity_type", "entity_id"),
+    )
     
     # Primary key
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
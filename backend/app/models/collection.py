@@ -2,7 +2,7 @@
 Collection model for user-defined data structures.
 """
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, JSON, text
+from sqlalchemy import Column, Index, String, Boolean, DateTime, ForeignKey, Integer, JSON, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -12,6 +12,13 @@ class Collection(Base):
     """User-defined data collection."""
     
     __tablename__ = "collections"
+    __table_args__ = (
+        # Serves newest-first keyset pagination (see app.core.pagination)
+        Index("ix_collections_user_keyset", "user_id", "is_deleted", "created_at", "id"),
+    )
+    # Fetch server-generated timestamps with RETURNING on INSERT/UPDATE
+    # instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     # Primary key
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -26,6 +33,14 @@ class Collection(Base):
     # Schema definition (field types, validations, etc.)
     schema = Column(JSON, nullable=True, default=dict)
     
+    # Denormalized count of non-deleted records, maintained transactionally
+    # by app.services.collection_service.adjust_record_count
+    record_count = Column(Integer, default=0, server_default=text("0"), nullable=False)
+    
+    # Set while the search index rows are rebuilt after a text field change
+    # (SQLite): the last records.rowid done. See app.services.record_search
+    search_reindex_rowid = Column(Integer, nullable=True)
+    
     # Soft delete
     is_deleted = Column(Boolean, default=False, nullable=False)
     
@@ -47,5 +62,10 @@ class Collection(Base):
     user = relationship("User", back_populates="collections")
     records = relationship("Record", back_populates="collection", cascade="all, delete-orphan")
     
+    @property
+    def search_reindexing(self) -> bool:
+        """Whether search may still match the previous text fields."""
+        return self.search_reindex_rowid is not None
+    
     def __repr__(self) -> str:
         return f"<Collection {self.name} (user: {self.user_id})>"
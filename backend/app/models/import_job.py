@@ -0,0 +1,65 @@
+"""
+Import job model for background file imports.
+"""
+import uuid
+from sqlalchemy import Column, Index, String, Boolean, DateTime, ForeignKey, Integer, JSON, text
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+
+class ImportJob(Base):
+    """Background import of a spooled upload into a new collection."""
+    
+    __tablename__ = "import_jobs"
+    __table_args__ = (
+        # Startup recovery scans for unfinished jobs
+        Index("ix_import_jobs_status_created", "status", "created_at"),
+    )
+    
+    # Primary key
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    
+    # User relationship
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # Job state: 'queued', 'running', 'completed', 'failed', 'cancelled'
+    status = Column(String, nullable=False, default="queued")
+    cancel_requested = Column(Boolean, default=False, nullable=False)
+    error = Column(String, nullable=True)
+    
+    # Process running the job and its last sign of life (see process_identity)
+    claimed_by = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    
+    # Source file (spooled to disk until the job finishes)
+    filename = Column(String, nullable=False)
+    file_path = Column(String, nullable=False)
+    
+    # Import parameters
+    folder_name = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    schema = Column(JSON, nullable=True)  # Renamed schema from frontend, if any
+    
+    # Progress (live values are kept in memory while running)
+    total_rows_estimate = Column(Integer, nullable=True)
+    rows_parsed = Column(Integer, default=0, nullable=False)
+    rows_inserted = Column(Integer, default=0, nullable=False)
+    
+    # Result
+    collection_id = Column(String, ForeignKey("collections.id", ondelete="SET NULL"), nullable=True)
+    
+    # Timestamps - Database-generated UTC
+    created_at = Column(
+        DateTime,
+        server_default=text("(datetime('now'))"),
+        nullable=False
+    )
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    user = relationship("User", back_populates="import_jobs")
+    
+    def __repr__(self) -> str:
+        return f"<ImportJob {self.id} {self.status}>"
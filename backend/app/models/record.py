@@ -2,7 +2,7 @@
 Record model for collection entries.
 """
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, JSON, text
+from sqlalchemy import Column, Index, String, Boolean, DateTime, ForeignKey, Integer, JSON, text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -12,12 +12,19 @@ class Record(Base):
     """Data record in a collection."""
     
     __tablename__ = "records"
+    __table_args__ = (
+        # Serves newest-first keyset pagination (see app.core.pagination)
+        Index("ix_records_collection_keyset", "collection_id", "is_deleted", "created_at", "id"),
+    )
+    # Fetch server-generated timestamps with RETURNING on INSERT/UPDATE
+    # instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     # Primary key
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     
     # Collection relationship
-    collection_id = Column(String, ForeignKey("collections.id", ondelete="CASCADE"), nullable=False, index=True)
+    collection_id = Column(String, ForeignKey("collections.id", ondelete="CASCADE"), nullable=False)
     
     # Record data (flexible JSON structure)
     data = Column(JSON, nullable=False, default=dict)
@@ -25,6 +32,9 @@ class Record(Base):
     # Soft delete
     is_deleted = Column(Boolean, default=False, nullable=False)
     
+    # Bumped on every data update; history lives in the activity log (see app.services.record_history)
+    version = Column(Integer, default=1, server_default=text("1"), nullable=False)
+    
     # Timestamps - Database-generated UTC
     created_at = Column(
         DateTime,
@@ -0,0 +1,60 @@
+"""
+Record index model: expression indexes on record data fields.
+"""
+import uuid
+from sqlalchemy import Column, Index, Integer, String, DateTime, ForeignKey, text
+
+from app.core.database import Base
+
+
+class RecordIndex(Base):
+    """A data field of a collection marked as indexed, and its index build state."""
+    
+    __tablename__ = "record_indexes"
+    __table_args__ = (
+        Index("ix_record_indexes_collection_field", "collection_id", "field", unique=True),
+        # The builder scans for pending and dropping indexes
+        Index("ix_record_indexes_status", "status"),
+    )
+    
+    # Primary key
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    
+    # Collection relationship (cleared when the collection is hard-deleted
+    # so the builder can still drop the index)
+    collection_id = Column(String, ForeignKey("collections.id", ondelete="SET NULL"), nullable=True)
+    
+    # Indexed data field and how it is compared: 'number', 'date' or 'text'
+    field = Column(String, nullable=False)
+    field_type = Column(String, nullable=False)
+    
+    # Database index name
+    index_name = Column(String, nullable=False, unique=True)
+    
+    # Build state: 'pending', 'building', 'ready', 'failed', 'dropping'
+    status = Column(String, nullable=False, default="pending")
+    error = Column(String, nullable=True)
+    
+    # Failed drops are retried with backoff: not before retry_at
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    retry_at = Column(DateTime, nullable=True)
+    
+    # Process building the index and its last sign of life (see process_identity)
+    claimed_by = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    
+    # Timestamps - Database-generated UTC
+    created_at = Column(
+        DateTime,
+        server_default=text("(datetime('now'))"),
+        nullable=False
+    )
+    updated_at = Column(
+        DateTime,
+        server_default=text("(datetime('now'))"),
+        onupdate=text("(datetime('now'))"),
+        nullable=False
+    )
+    
+    def __repr__(self) -> str:
+        return f"<RecordIndex {self.field} {self.status} (collection: {self.collection_id})>"
@@ -0,0 +1,109 @@
+"""
+Full-text index over record data and collections.
+
+SQLite: an FTS5 table records_fts (rowid = records.rowid) holding the owner,
+collection and text fields of each record, maintained by triggers on records.
+Text fields are the schema fields that are not number or date fields, or every
+string value for collections without schema fields. collections_fts
+(rowid = collections.rowid) indexes collection names and descriptions the
+same way. Queries are scoped by matching the user_id or collection_id column,
+so one user's search only reads that user's postings. Ids are stored without
+hyphens (see fts_id), which makes each one a single token rather than a
+five-token phrase.
+
+PostgreSQL: a generated tsvector column records.search_vector over all string
+values of data, with a GIN index. A generated column cannot look up the
+collection schema, so every string value is searchable there. Collection
+names and descriptions are matched without an index (a user has few).
+
+Created with the tables by init_db; the add_record_search and
+add_global_search migrations do the same for existing databases, each with
+its own frozen copy of the DDL. Changing it here needs a new migration.
+"""
+from sqlalchemy import DDL, event
+
+from app.models.record import Record
+
+
+def fts_id(value: str) -> str:
+    """An id as stored in the FTS tables."""
+    return value.replace("-", "")
+
+
+def fts_id_sql(expression: str) -> str:
+    """SQLite counterpart of fts_id."""
+    return f"replace({expression}, '-', '')"
+
+
+def owner_sql(row: str) -> str:
+    """SQLite expression for the owner of a records row, as an FTS id."""
+    return fts_id_sql(f"(SELECT user_id FROM collections WHERE id = {row}.collection_id)")
+
+
+def search_body_sql(row: str) -> str:
+    """
+    SQLite expression building the searchable text of a record row.
+
+    Args:
+        row: Alias of the records row ("new" in triggers)
+    """
+    return f"""coalesce((
+        SELECT group_concat(item.value, ' ') FROM json_each({row}.data) AS item
+        WHERE item.type = 'text' AND (
+            NOT EXISTS (
+                SELECT 1 FROM collections AS c, json_each(c.schema, '$.fields') AS f
+                WHERE c.id = {row}.collection_id
+            )
+            OR item.key IN (
+                SELECT json_extract(f.value, '$.name')
+                FROM collections AS c, json_each(c.schema, '$.fields') AS f
+                WHERE c.id = {row}.collection_id
+                  AND coalesce(json_extract(f.value, '$.type'), 'text') NOT IN ('number', 'date')
+            )
+        )
+    ), '')"""
+
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5("
+    "user_id, collection_id, body, tokenize = 'unicode61 remove_diacritics 2')",
+    f"""CREATE TRIGGER IF NOT EXISTS records_fts_insert AFTER INSERT ON records BEGIN
+        INSERT INTO records_fts (rowid, user_id, collection_id, body)
+        VALUES (new.rowid, {owner_sql("new")}, {fts_id_sql("new.collection_id")}, {search_body_sql("new")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS records_fts_update AFTER UPDATE OF data, collection_id ON records BEGIN
+        DELETE FROM records_fts WHERE rowid = old.rowid;
+        INSERT INTO records_fts (rowid, user_id, collection_id, body)
+        VALUES (new.rowid, {owner_sql("new")}, {fts_id_sql("new.collection_id")}, {search_body_sql("new")});
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS records_fts_delete AFTER DELETE ON records BEGIN
+        DELETE FROM records_fts WHERE rowid = old.rowid;
+    END""",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS collections_fts USING fts5("
+    "user_id, name, description, tokenize = 'unicode61 remove_diacritics 2')",
+    f"""CREATE TRIGGER IF NOT EXISTS collections_fts_insert AFTER INSERT ON collections BEGIN
+        INSERT INTO collections_fts (rowid, user_id, name, description)
+        VALUES (new.rowid, {fts_id_sql("new.user_id")}, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS collections_fts_update AFTER UPDATE OF user_id, name, description ON collections BEGIN
+        DELETE FROM collections_fts WHERE rowid = old.rowid;
+        INSERT INTO collections_fts (rowid, user_id, name, description)
+        VALUES (new.rowid, {fts_id_sql("new.user_id")}, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS collections_fts_delete AFTER DELETE ON collections BEGIN
+        DELETE FROM collections_fts WHERE rowid = old.rowid;
+    END""",
+]
+
+POSTGRESQL_SEARCH_DDL = [
+    "ALTER TABLE records ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (jsonb_to_tsvector('simple', data::jsonb, '[\"string\"]')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_records_search_vector ON records USING gin (search_vector)",
+]
+
+
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Record.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+for _statement in POSTGRESQL_SEARCH_DDL:
+    event.listen(Record.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
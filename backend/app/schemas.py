@@ -5,6 +5,8 @@ from datetime import datetime
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, EmailStr, Field, validator
 
+from app.core.config import settings
+
 
 # ==================== User Schemas ====================
 
@@ -105,6 +107,18 @@ class CollectionUpdate(BaseModel):
     schema: Optional[Dict[str, Any]] = None
 
 
+class RecordIndexResponse(BaseModel):
+    """Schema for an indexed data field and its build state."""
+    field: str
+    field_type: str
+    status: str
+    error: Optional[str] = None
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class CollectionResponse(CollectionBase):
     """Schema for collection response."""
     id: str
@@ -113,11 +127,21 @@ class CollectionResponse(CollectionBase):
     created_at: datetime
     updated_at: datetime
     record_count: Optional[int] = 0
+    # Search index rows are being rebuilt after a change of text fields
+    search_reindexing: bool = False
+    # Only filled in for single-collection responses
+    indexes: Optional[List[RecordIndexResponse]] = None
     
     class Config:
         from_attributes = True
 
 
+class CollectionPage(BaseModel):
+    """Cursor-paginated collection list."""
+    items: List[CollectionResponse]
+    next_cursor: Optional[str] = None
+
+
 # ==================== Record Schemas ====================
 
 class RecordBase(BaseModel):
@@ -135,11 +159,17 @@ class RecordUpdate(BaseModel):
     data: Dict[str, Any] = Field(..., min_length=1)
 
 
+class RecordPatch(BaseModel):
+    """Schema for a partial record update: a JSON Merge Patch (RFC 7396) of the data."""
+    data: Dict[str, Any] = Field(..., min_length=1)
+
+
 class RecordResponse(RecordBase):
     """Schema for record response."""
     id: str
     collection_id: str
     is_deleted: bool
+    version: int
     created_at: datetime
     updated_at: datetime
     
@@ -150,6 +180,57 @@ class RecordResponse(RecordBase):
         }
 
 
+class RecordPage(BaseModel):
+    """Cursor-paginated record list."""
+    items: List[RecordResponse]
+    next_cursor: Optional[str] = None
+
+
+class RecordSearchResult(RecordResponse):
+    """Full-text search hit: a record with its relevance and matched snippets."""
+    score: float
+    highlights: Dict[str, str] = {}
+
+
+class RecordBatchOperation(BaseModel):
+    """One operation of a record batch: create needs data, update id and data, delete id."""
+    op: str = Field(..., pattern="^(create|update|delete)$")
+    id: Optional[str] = None
+    data: Optional[Dict[str, Any]] = Field(None, min_length=1)
+    hard_delete: bool = False
+
+
+class RecordBatchRequest(BaseModel):
+    """Schema for a batch of record operations, applied in order."""
+    operations: List[RecordBatchOperation] = Field(
+        ..., min_length=1, max_length=settings.RECORD_BATCH_MAX_OPERATIONS
+    )
+
+
+class RecordBatchItemResult(BaseModel):
+    """Outcome of one batch operation, with the status it would have had on its own."""
+    index: int
+    op: str
+    status: int
+    id: Optional[str] = None
+    version: Optional[int] = None
+    error: Optional[str] = None
+
+
+class RecordBatchResponse(BaseModel):
+    """Schema for the per-operation results of a record batch."""
+    results: List[RecordBatchItemResult]
+    succeeded: int
+    failed: int
+
+
+class RecordVersionResponse(BaseModel):
+    """Schema for a reconstructed historical record version."""
+    record_id: str
+    version: int
+    data: Dict[str, Any]
+
+
 # ==================== Activity Log Schemas ====================
 
 class ActivityLogResponse(BaseModel):
@@ -170,6 +251,29 @@ class ActivityLogResponse(BaseModel):
         }
 
 
+class ActivityLogPage(BaseModel):
+    """Cursor-paginated activity log list."""
+    items: List[ActivityLogResponse]
+    next_cursor: Optional[str] = None
+
+
+# ==================== Search Schemas ====================
+
+class SearchGroupResponse(BaseModel):
+    """A collection in global search results, with its best record hits."""
+    collection: CollectionResponse
+    # Set when the collection name or description itself matched
+    score: Optional[float] = None
+    highlights: Dict[str, str] = {}
+    hits: List[RecordSearchResult]
+
+
+class GlobalSearchResponse(BaseModel):
+    """Global search results grouped by collection."""
+    query: str
+    groups: List[SearchGroupResponse]
+
+
 # ==================== Generic Response Schemas ====================
 
 class MessageResponse(BaseModel):
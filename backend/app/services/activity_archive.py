@@ -0,0 +1,294 @@
+"""
+Activity log retention and cold archive.
+A background job moves activity log rows older than ACTIVITY_RETENTION_DAYS
+out of the hot table into gzip-compressed NDJSON files, one per month and
+user (<ACTIVITY_ARCHIVE_DIR>/<YYYY-MM>/<user_id>.ndjson.gz), so the table
+stays the size of the retention window. ActivityArchive.read serves those
+rows back, newest first, for list requests that page past the hot table and
+for record history older than the window (see app.services.record_history).
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.core.write_queue import write_queue
+from app.models.activity_log import ActivityLog
+
+
+logger = logging.getLogger(__name__)
+
+# A lock file older than this is assumed to belong to a crashed process
+_LOCK_STALE_SECONDS = 3600
+
+_MONTH_FORMAT = "%Y-%m"
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value: datetime) -> datetime:
+    return (_month_start(value) + timedelta(days=32)).replace(day=1)
+
+
+class ActivityArchive:
+    """
+    Month/user partitioned archive of activity log rows.
+    Files are append-only gzip streams (one gzip member per append); a row
+    that was archived twice because a move was interrupted is read once.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, month: str, user_id: str) -> str:
+        return os.path.join(self.directory, month, f"{user_id}.ndjson.gz")
+
+    def append(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Append activity log rows to their month/user files and fsync them.
+
+        Args:
+            rows: Activity log rows as column dictionaries
+        """
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for row in rows:
+            key = (row["created_at"].strftime(_MONTH_FORMAT), row["user_id"])
+            groups.setdefault(key, []).append(row)
+
+        for (month, user_id), group in groups.items():
+            path = self._path(month, user_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lines = "".join(
+                json.dumps({**row, "created_at": row["created_at"].isoformat()}, separators=(",", ":")) + "\n"
+                for row in group
+            )
+            with open(path, "ab") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="ab") as archive_file:
+                    archive_file.write(lines.encode())
+                raw.flush()
+                os.fsync(raw.fileno())
+
+    def has_user(self, user_id: str) -> bool:
+        """Check whether any rows of a user are archived."""
+        return bool(self._months(user_id))
+
+    def _months(self, user_id: str) -> List[str]:
+        """Months with archived rows for a user, newest first."""
+        try:
+            months = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            (month for month in months if os.path.exists(self._path(month, user_id))),
+            reverse=True
+        )
+
+    def _load(self, month: str, user_id: str) -> List[Dict[str, Any]]:
+        rows: Dict[str, Dict[str, Any]] = {}
+        with gzip.open(self._path(month, user_id), "rt", encoding="utf-8") as archive_file:
+            for line in archive_file:
+                row = json.loads(line)
+                row["created_at"] = datetime.fromisoformat(row["created_at"])
+                rows[row["id"]] = row
+        return sorted(rows.values(), key=lambda row: (row["created_at"], row["id"]), reverse=True)
+
+    def read(
+        self,
+        user_id: str,
+        limit: int,
+        offset: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        entity_type: Optional[str] = None,
+        action: Optional[str] = None,
+        entity_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read a user's archived rows newest first (by created_at, id).
+        Only month files that can contain matching rows are opened.
+
+        Args:
+            user_id: Owner of the rows
+            limit: Maximum number of rows
+            offset: Matching rows to skip first
+            before: Only rows strictly before this (created_at, id) position
+            since: Only rows created at or after this time
+            until: Only rows created before this time
+            entity_type: Only rows for this entity type
+            action: Only rows with this action
+            entity_id: Only rows for this entity
+
+        Returns:
+            Row dictionaries with created_at as datetime
+        """
+        results: List[Dict[str, Any]] = []
+        for month in self._months(user_id):
+            start = datetime.strptime(month, _MONTH_FORMAT)
+            if since and _next_month(start) <= since:
+                break
+            if (until and start >= until) or (before and start > before[0]):
+                continue
+
+            for row in self._load(month, user_id):
+                if before and (row["created_at"], row["id"]) >= before:
+                    continue
+                if until and row["created_at"] >= until:
+                    continue
+                if since and row["created_at"] < since:
+                    break
+                if entity_type and row["entity_type"] != entity_type:
+                    continue
+                if action and row["action"] != action:
+                    continue
+                if entity_id and row["entity_id"] != entity_id:
+                    continue
+                if offset:
+                    offset -= 1
+                    continue
+                results.append(row)
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+class ActivityRetentionJob:
+    """
+    Periodically moves activity log rows past the retention window into the
+    archive, oldest first and in batches: rows are read from a read session,
+    appended to the archive and only then deleted through the write queue.
+    A lock file in the archive directory keeps several worker processes from
+    moving the same rows.
+    """
+
+    def __init__(
+        self,
+        archive: ActivityArchive,
+        retention_days: int,
+        batch_size: int,
+        interval_seconds: float
+    ):
+        self.archive = archive
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+        self.archived = 0
+        self.last_run: Optional[datetime] = None
+
+    async def start(self) -> None:
+        """Start the periodic job (no-op when retention is disabled)."""
+        if self.retention_days > 0 and self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._run(), name="activity-retention")
+
+    async def stop(self) -> None:
+        """Stop after the batch being moved, if any."""
+        if self._task is None:
+            return
+        self._stop.set()
+        await self._task
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return job settings and counters."""
+        return {
+            "enabled": self._task is not None,
+            "retention_days": self.retention_days,
+            "archived": self.archived,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+    async def archive_expired(self) -> int:
+        """
+        Move every row older than the retention window to the archive.
+
+        Returns:
+            Number of rows moved (0 if another process holds the lock)
+        """
+        lock_path = os.path.join(self.archive.directory, ".retention.lock")
+        if not await run_in_threadpool(self._acquire_lock, lock_path):
+            return 0
+
+        moved = 0
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+            table = ActivityLog.__table__
+            while not self._stop.is_set():
+                async with ReadSessionLocal() as db:
+                    result = await db.execute(
+                        select(table)
+                        .where(table.c.created_at < cutoff)
+                        .order_by(table.c.created_at, table.c.id)
+                        .limit(self.batch_size)
+                    )
+                    rows = [dict(row) for row in result.mappings()]
+                if not rows:
+                    break
+
+                await run_in_threadpool(self.archive.append, rows)
+                ids = [row["id"] for row in rows]
+
+                async def remove(db):
+                    await db.execute(delete(table).where(table.c.id.in_(ids)))
+
+                await write_queue.submit(remove)
+                moved += len(rows)
+                # Keep the lock fresh so a long run is not taken for a crashed one
+                os.utime(lock_path)
+        finally:
+            await run_in_threadpool(os.remove, lock_path)
+
+        self.archived += moved
+        self.last_run = datetime.utcnow()
+        if moved:
+            logger.info(f"Archived {moved} activity log rows older than {self.retention_days} days")
+        return moved
+
+    def _acquire_lock(self, path: str) -> bool:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if time.time() - os.path.getmtime(path) < _LOCK_STALE_SECONDS:
+                    return False
+                os.remove(path)
+                continue
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            return True
+        return False
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await self.archive_expired()
+            except Exception:
+                logger.exception("Activity log archiving failed")
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global archive and retention job
+activity_archive = ActivityArchive(settings.ACTIVITY_ARCHIVE_DIR)
+activity_retention_job = ActivityRetentionJob(
+    activity_archive,
+    retention_days=settings.ACTIVITY_RETENTION_DAYS,
+    batch_size=settings.ACTIVITY_ARCHIVE_BATCH_SIZE,
+    interval_seconds=settings.ACTIVITY_ARCHIVE_INTERVAL_MINUTES * 60
+)
@@ -12,8 +12,8 @@ from app.models.user import User
 from app.models.session import Session
 from app.models.otp import OTP
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     hash_token,
@@ -23,6 +23,8 @@ from app.core.security import (
     validate_password_strength
 )
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.write_queue import write_queue
 from app.services.email_service import send_otp_email, send_welcome_email
 
 
@@ -33,16 +35,22 @@ async def register_user(
     db: AsyncSession,
     email: str,
     password: str,
-    full_name: str
+    full_name: str,
+    email_verified: bool = False
 ) -> User:
     """
     Register a new user.
+    
+    The password is hashed outside any write transaction, so with SQLite's
+    single writer other writes do not wait behind Argon2; only the insert
+    goes through the write queue.
    
     Args:
-        db: Database session
+        db: Read session on the primary (see get_primary_read_db)
         email: User email
         password: User password
         full_name: User's full name
+        email_verified: Whether the email was already verified (e.g. by OTP)
         
     Returns:
         Created user
@@ -68,17 +76,31 @@ async def register_user(
             detail=error_msg
         )
     
-    # Create user
-    user = User(
-        email=email,
-        password_hash=hash_password(password),
-        full_name=full_name,
-        email_verified=False
-    )
-    
-    db.add(user)
+    # End the read transaction before the slow part (reads keep their attributes)
     await db.commit()
-    await db.refresh(user)
+    password_hash = await hash_password_async(password)
+    
+    async def insert(session: AsyncSession) -> User:
+        # Checked again: a concurrent registration may have won meanwhile
+        result = await session.execute(select(User.id).where(User.email == email))
+        if result.scalar_one_or_none() is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+        
+        user = User(
+            email=email,
+            password_hash=password_hash,
+            full_name=full_name,
+            email_verified=email_verified
+        )
+        session.add(user)
+        await session.flush()
+        await session.refresh(user)
+        return user
+    
+    user = await write_queue.submit(insert)
     
     logger.info(f"User registered: {email}")
     return user
@@ -235,6 +257,16 @@ async def verify_otp_code(
     return True
 
 
+def _lockout_minutes_remaining(user: User) -> Optional[int]:
+    """Minutes left of an active lockout, or None if the account is not locked (any more)."""
+    if not user.is_locked or not user.last_failed_login:
+        return None
+    lockout_until = user.last_failed_login + timedelta(minutes=settings.ACCOUNT_LOCKOUT_MINUTES)
+    if datetime.utcnow() >= lockout_until:
+        return None
+    return (lockout_until - datetime.utcnow()).seconds // 60
+
+
 async def authenticate_user(
     db: AsyncSession,
     email: str,
@@ -243,13 +275,19 @@ async def authenticate_user(
     """
     Authenticate user with email and password.
     
+    The lookup and the password check run on a read session, outside any
+    write transaction: with SQLite's single writer, verifying while holding
+    it would queue every login and every other write behind Argon2. The
+    outcome (failed attempt and lockout, or last login) is then written
+    through the write queue against the current row.
+    
     Args:
-        db: Database session
+        db: Read session on the primary (see get_primary_read_db)
         email: User email
         password: User password
         
     Returns:
-        User if authenticated, None otherwise
+        User if authenticated (as updated by the write), None otherwise
         
     Raises:
         HTTPException: If account is locked
@@ -261,55 +299,78 @@ async def authenticate_user(
         return None
     
     # Check if account is locked
-    if user.is_locked:
-        # Check if lockout period has expired
-        if user.last_failed_login:
-            lockout_until = user.last_failed_login + timedelta(minutes=settings.ACCOUNT_LOCKOUT_MINUTES)
-            if datetime.utcnow() < lockout_until:
-                remaining = (lockout_until - datetime.utcnow()).seconds // 60
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Account locked. Try again in {remaining} minutes."
-                )
-            else:
-                # Unlock account
-                user.is_locked = False
-                user.failed_login_attempts = 0
+    remaining = _lockout_minutes_remaining(user)
+    if remaining is not None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Account locked. Try again in {remaining} minutes."
+        )
+    
+    # End the read transaction before the slow part (reads keep their attributes)
+    await db.commit()
     
     # Verify password
-    if not user.password_hash or not verify_password(password, user.password_hash):
-        # Increment failed attempts
-        user.failed_login_attempts += 1
-        user.last_failed_login = datetime.utcnow()
+    password_ok = bool(user.password_hash) and await verify_password_async(password, user.password_hash)
+    
+    async def record_outcome(session: AsyncSession) -> Tuple[Optional[User], str]:
+        current = await session.get(User, user.id)
+        if current is None:
+            return None, "failed"
         
-        # Lock account if max attempts exceeded
-        if user.failed_login_attempts >= settings.MAX_LOGIN_ATTEMPTS:
-            user.is_locked = True
-            await db.commit()
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Too many failed login attempts. Account locked for 30 minutes."
-            )
+        if current.is_locked:
+            # Locked by concurrent failures meanwhile, or a lockout that has expired
+            if _lockout_minutes_remaining(current) is not None:
+                return current, "locked"
+            current.is_locked = False
+            current.failed_login_attempts = 0
         
-        await db.commit()
-        return None
+        if not password_ok:
+            # Increment failed attempts
+            current.failed_login_attempts += 1
+            current.last_failed_login = datetime.utcnow()
+            
+            # Lock account if max attempts exceeded
+            outcome = "failed"
+            if current.failed_login_attempts >= settings.MAX_LOGIN_ATTEMPTS:
+                current.is_locked = True
+                outcome = "locked_now"
+            await session.flush()
+            return current, outcome
+        
+        # Reset failed attempts on successful login
+        current.failed_login_attempts = 0
+        current.last_login = datetime.utcnow()
+        await session.flush()
+        return current, "ok"
     
-    # Reset failed attempts on successful login
-    user.failed_login_attempts = 0
-    user.last_login = datetime.utcnow()
-    await db.commit()
+    current, outcome = await write_queue.submit(record_outcome)
     
-    return user
+    if outcome == "locked_now":
+        principal_cache.invalidate_user(user.id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Too many failed login attempts. Account locked for 30 minutes."
+        )
+    if outcome == "locked":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Account locked. Try again in {_lockout_minutes_remaining(current)} minutes."
+        )
+    if outcome != "ok":
+        return None
+    
+    return current
 
 
-async def create_user_session(
+async def add_user_session(
     db: AsyncSession,
     user: User,
     device_info: Optional[str] = None,
     ip_address: Optional[str] = None
 ) -> Tuple[str, str]:
     """
-    Create access and refresh tokens for user.
+    Create access and refresh tokens for user, storing the session in the
+    caller's transaction (e.g. a write queue operation) without committing.
     
     Args:
         db: Database session
@@ -335,12 +396,35 @@ async def create_user_session(
     )
     
     db.add(session)
-    await db.commit()
+    await db.flush()
     
     logger.info(f"Session created for user {user.email}")
     return access_token, refresh_token
 
 
+async def create_user_session(
+    db: AsyncSession,
+    user: User,
+    device_info: Optional[str] = None,
+    ip_address: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    Create access and refresh tokens for user and commit the session.
+    
+    Args:
+        db: Database session
+        user: User object
+        device_info: User agent string (optional)
+        ip_address: Client IP address (optional)
+        
+    Returns:
+        Tuple of (access_token, refresh_token)
+    """
+    tokens = await add_user_session(db, user, device_info, ip_address)
+    await db.commit()
+    return tokens
+
+
 async def refresh_access_token(
     db: AsyncSession,
     refresh_token: str
@@ -424,6 +508,42 @@ async def logout_user(
     if session:
         await db.delete(session)
         await db.commit()
+        principal_cache.invalidate_user(session.user_id)
         logger.info(f"User logged out: session {session.id}")
     
     return True
+
+
+async def deactivate_user(
+    db: AsyncSession,
+    user_id: str
+) -> bool:
+    """
+    Deactivate a user account and revoke all of its sessions.
+    
+    Args:
+        db: Database session
+        user_id: User to deactivate
+        
+    Returns:
+        True if the user was found and deactivated
+    """
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    
+    if not user:
+        return False
+    
+    user.is_active = False
+    
+    sessions = (await db.execute(
+        select(Session).where(Session.user_id == user_id)
+    )).scalars().all()
+    for session in sessions:
+        await db.delete(session)
+    
+    await db.commit()
+    principal_cache.invalidate_user(user_id)
+    
+    logger.info(f"User deactivated: {user.email}")
+    return True
@@ -0,0 +1,39 @@
+"""
+Collection service for bookkeeping shared by record and import endpoints.
+"""
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.collection import Collection
+
+
+async def adjust_record_count(
+    db: AsyncSession,
+    collection_id: str,
+    delta: int
+) -> None:
+    """
+    Atomically adjust a collection's denormalized record count.
+    
+    Runs as an UPDATE inside the caller's transaction so the count commits
+    (or rolls back) together with the record change that caused it.
+    
+    Args:
+        db: Database session
+        collection_id: Collection to update
+        delta: Number of live records added (positive) or removed (negative)
+    """
+    if delta == 0:
+        return
+    
+    await db.execute(
+        update(Collection)
+        .where(Collection.id == collection_id)
+        .values(
+            record_count=Collection.record_count + delta,
+            # Record churn is not a change to the collection itself; keep the
+            # onupdate hook from bumping updated_at
+            updated_at=Collection.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
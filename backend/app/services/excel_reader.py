@@ -0,0 +1,175 @@
+"""
+Streaming Excel (.xlsx) reader backed by a process pool.
+Worksheets are read with openpyxl's read-only row iteration in worker
+processes, one task per sheet, and handed back in row chunks through bounded
+queues, so parsing neither blocks the event loop nor holds the workbook DOM
+in memory. This module avoids app imports so spawned workers start quickly.
+"""
+import asyncio
+import itertools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence, Tuple
+
+import openpyxl
+
+
+# Chunks buffered per sheet before its worker waits for the consumer
+SHEET_QUEUE_CHUNKS = 4
+
+# How often blocked workers and consumers re-check for cancellation or failure
+_POLL_SECONDS = 0.5
+
+# Sentinel for a queue poll that timed out
+_EMPTY = object()
+
+_executor: Optional[ProcessPoolExecutor] = None
+_manager = None
+# _get_pool runs in executor threads; concurrent imports must share one pool
+_pool_lock = threading.Lock()
+
+
+def list_sheet_headers(path: str) -> List[Tuple[str, Optional[Tuple[Any, ...]]]]:
+    """
+    Read the header row of every worksheet without loading the sheets.
+
+    Returns:
+        List of (sheet title, header row or None), active sheet first.
+    """
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        active = workbook.active
+        sheets = [active] + [sheet for sheet in workbook.worksheets if sheet is not active]
+        return [
+            (sheet.title, next(sheet.iter_rows(values_only=True, max_row=1), None))
+            for sheet in sheets
+        ]
+    finally:
+        workbook.close()
+
+
+def _chunked(rows: Iterator[Tuple[Any, ...]], size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _put(out, item, stop) -> bool:
+    """Put into a bounded queue, giving up once stop is set."""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def read_sheet_chunks(path: str, sheet_title: str, chunk_rows: int, out, stop) -> int:
+    """
+    Worker process entry point: stream one sheet's data rows (header
+    skipped) into `out` as lists of row tuples, followed by None.
+
+    Returns:
+        Number of rows handed over
+    """
+    rows_read = 0
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_title].iter_rows(values_only=True, min_row=2)
+        for chunk in _chunked(rows, chunk_rows):
+            if not _put(out, chunk, stop):
+                return rows_read
+            rows_read += len(chunk)
+        _put(out, None, stop)
+        return rows_read
+    finally:
+        workbook.close()
+
+
+def _get(source):
+    try:
+        return source.get(timeout=_POLL_SECONDS)
+    except queue.Empty:
+        return _EMPTY
+
+
+def _get_pool(max_workers: int):
+    global _executor, _manager
+    with _pool_lock:
+        if _executor is None:
+            # Spawn rather than fork: the parent runs an event loop and threads
+            context = multiprocessing.get_context("spawn")
+            _manager = context.Manager()
+            _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        return _executor, _manager
+
+
+def _submit_sheets(path: str, sheet_titles: Sequence[str], chunk_rows: int, max_workers: int):
+    executor, manager = _get_pool(max_workers)
+    stop = manager.Event()
+    queues = [manager.Queue(maxsize=SHEET_QUEUE_CHUNKS) for _ in sheet_titles]
+    futures = [
+        executor.submit(read_sheet_chunks, path, title, chunk_rows, out, stop)
+        for title, out in zip(sheet_titles, queues)
+    ]
+    return stop, queues, futures
+
+
+async def iter_sheet_chunks(
+    path: str,
+    sheet_titles: Sequence[str],
+    chunk_rows: int,
+    max_workers: int
+) -> AsyncIterator[List[Tuple[Any, ...]]]:
+    """
+    Parse sheets in parallel, one pool task per sheet, and yield their row
+    chunks in sheet order. Each sheet buffers at most SHEET_QUEUE_CHUNKS
+    chunks ahead of the consumer. Closing the iterator stops all workers.
+
+    Raises:
+        Exception: Whatever a worker raised while parsing its sheet
+    """
+    loop = asyncio.get_running_loop()
+    # Starting processes and creating manager proxies block, so do it off the loop
+    stop, queues, futures = await loop.run_in_executor(
+        None, _submit_sheets, path, sheet_titles, chunk_rows, max_workers
+    )
+
+    try:
+        for source, future in zip(queues, futures):
+            while True:
+                chunk = await loop.run_in_executor(None, _get, source)
+                if chunk is _EMPTY:
+                    if not future.done():
+                        continue
+                    # Worker finished or failed; pick up anything it put last
+                    chunk = await loop.run_in_executor(None, _get, source)
+                    if chunk is _EMPTY:
+                        future.result()
+                        break
+                if chunk is None:
+                    break
+                yield chunk
+    finally:
+        stop.set()
+        for future in futures:
+            future.cancel()
+
+
+def shutdown_excel_pool() -> None:
+    """
+    Shut down the worker processes. Called on application shutdown.
+    """
+    global _executor, _manager
+    with _pool_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
@@ -3,16 +3,43 @@ File import service for parsing CSV and Excel files.
 Handles file validation, parsing, and data type detection.
 """
 import io
+import itertools
 import os
-from typing import List, Dict, Any, Tuple, Optional
+import shutil
+import tempfile
+import warnings
+from typing import List, Dict, Any, Tuple, Optional, AsyncIterator, BinaryIO
 from datetime import datetime
+import numpy as np
+import openpyxl
 import pandas as pd
+from pandas.tseries.api import guess_datetime_format
 from fastapi import UploadFile, HTTPException
+from starlette.concurrency import run_in_threadpool
 
+from app.core.config import settings
+from app.services.excel_reader import iter_sheet_chunks, list_sheet_headers
 
-# Maximum file size: 10MB
+
+# Maximum file size for formats parsed fully in memory: 10MB
 MAX_FILE_SIZE = 10 * 1024 * 1024
 
+# Maximum file size for CSV imports, which are streamed in chunks: 500MB
+MAX_STREAMING_FILE_SIZE = 500 * 1024 * 1024
+
+# Rows parsed, converted and inserted per chunk during streaming imports
+IMPORT_CHUNK_SIZE = 5000
+
+# Rows parsed from the head of a file to build an import preview
+PREVIEW_PARSE_ROWS = 1000
+
+# Rows returned in an import preview
+PREVIEW_ROWS = 5
+
+# Field type detection sample: leading rows plus randomly chosen rows
+TYPE_DETECTION_HEAD_ROWS = 200
+TYPE_DETECTION_RANDOM_ROWS = 800
+
 # Supported file extensions
 SUPPORTED_EXTENSIONS = {'.csv', '.xlsx'}
 
@@ -33,32 +60,139 @@ def validate_file(file: UploadFile) -> None:
     # File size will be checked during read
 
 
-def detect_field_type(series: pd.Series) -> str:
+def get_upload_size(file: UploadFile) -> int:
     """
-    Detect the most appropriate field type for a pandas Series.
-    Returns: 'number', 'date', or 'text'
+    Get the size of an uploaded file without reading it into memory.
     """
-    # Skip empty series
-    if series.isna().all():
-        return 'text'
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
+def validate_upload_size(file: UploadFile) -> None:
+    """
+    Check an upload against the size limit for its type.
+    CSV is streamed and allows MAX_STREAMING_FILE_SIZE; Excel is parsed in
+    memory and is limited to MAX_FILE_SIZE.
+    Raises HTTPException 413 if the file is too large.
+    """
+    file_ext = os.path.splitext(file.filename or '')[1].lower()
+    max_size = MAX_STREAMING_FILE_SIZE if file_ext == '.csv' else MAX_FILE_SIZE
     
-    # Try to detect numeric
+    if get_upload_size(file) > max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {max_size / (1024*1024):.0f}MB."
+        )
+
+
+def _sample_values(values: pd.Series, head_rows: int, random_rows: int) -> pd.Series:
+    """
+    Take a bounded sample of non-null values: the first head_rows plus up to
+    random_rows picked (deterministically) from the remainder.
+    """
+    if len(values) <= head_rows + random_rows:
+        return values
+    
+    rng = np.random.default_rng(0)
+    picked = rng.choice(len(values) - head_rows, size=random_rows, replace=False) + head_rows
+    positions = np.concatenate([np.arange(head_rows), np.sort(picked)])
+    return values.iloc[positions]
+
+
+def _is_numeric(values: pd.Series) -> bool:
+    """Check whether every value converts to a number."""
     try:
-        pd.to_numeric(series.dropna())
-        return 'number'
+        pd.to_numeric(values)
+        return True
     except (ValueError, TypeError):
-        pass
+        return False
+
+
+def _infer_datetime_format(values: pd.Series) -> Optional[str]:
+    """
+    Infer an explicit strptime format from the first non-null value, the same
+    way pandas does for a column-level parse. Returns None if no format fits.
+    """
+    first = values.iloc[0] if len(values) else None
+    if not isinstance(first, str):
+        return None
     
-    # Try to detect date
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return guess_datetime_format(first)
+
+
+def _all_digits(values: pd.Series) -> bool:
+    """Check whether every value is a plain run of digits."""
+    return bool(values.astype(str).str.match(r'^\d+$').all())
+
+
+def _parses_as_dates(values: pd.Series, date_format: Optional[str]) -> bool:
+    """Check whether every value parses as a date, using date_format if known."""
     try:
-        pd.to_datetime(series.dropna())
-        # Check if it looks like dates (not just numbers that can be parsed as dates)
-        if not series.dropna().astype(str).str.match(r'^\d+$').all():
-            return 'date'
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            pd.to_datetime(values, format=date_format)
+        return True
     except (ValueError, TypeError, AttributeError):
-        pass
+        return False
+
+
+def detect_field(
+    series: pd.Series,
+    head_rows: int = TYPE_DETECTION_HEAD_ROWS,
+    random_rows: int = TYPE_DETECTION_RANDOM_ROWS
+) -> Tuple[str, Optional[str]]:
+    """
+    Detect the most appropriate field type for a pandas Series.
+    
+    Checks run on a bounded sample first. A failed check on the sample is
+    conclusive. A passing one escalates to the full column only where that is
+    cheap: numbers via pd.to_numeric, dates via pd.to_datetime with the
+    explicit inferred format. If no date format can be inferred, the sample
+    verdict stands rather than parsing every value one by one.
+    
+    Returns:
+        Tuple of ('number' | 'date' | 'text', datetime format for dates or None)
+    """
+    values = series.dropna()
+    
+    # Skip empty series
+    if values.empty:
+        return 'text', None
+    
+    sample = _sample_values(values, head_rows, random_rows)
+    sampled = len(sample) < len(values)
+    
+    # Try to detect numeric
+    if pd.api.types.is_numeric_dtype(values):
+        return 'number', None
+    
+    if _is_numeric(sample) and (not sampled or _is_numeric(values)):
+        return 'number', None
     
-    return 'text'
+    # Try to detect date
+    date_format = _infer_datetime_format(values)
+    if _parses_as_dates(sample, date_format):
+        if sampled and date_format is not None and not _parses_as_dates(values, date_format):
+            return 'text', None
+        
+        # Check if it looks like dates (not just numbers that can be parsed as dates).
+        # A non-digit value in the sample settles it without scanning the column.
+        if not _all_digits(sample) or (sampled and not _all_digits(values)):
+            return 'date', date_format
+    
+    return 'text', None
+
+
+def detect_field_type(series: pd.Series) -> str:
+    """
+    Detect the most appropriate field type for a pandas Series.
+    Returns: 'number', 'date', or 'text'
+    """
+    return detect_field(series)[0]
 
 
 def parse_csv_file(file_content: bytes) -> pd.DataFrame:
@@ -148,14 +282,14 @@ def generate_schema_from_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
     """
     fields = []
     
-    for column in df.columns:
+    for position, column in enumerate(df.columns):
         # Clean column name
         field_name = str(column).strip().lower().replace(' ', '_').replace('-', '_')
         if not field_name:
             field_name = f'column_{len(fields)}'
         
         # Detect field type
-        field_type = detect_field_type(df[column])
+        field_type, date_format = detect_field(df.iloc[:, position])
         
         # Create field definition
         field = {
@@ -165,106 +299,546 @@ def generate_schema_from_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
             'required': False
         }
         
+        # Remember the inferred format so conversion can parse dates in one pass
+        if date_format:
+            field['format'] = date_format
+        
         fields.append(field)
     
     return {'fields': fields}
 
 
+def _convert_value(value: Any, field_type: str) -> Any:
+    """
+    Convert a single non-null cell based on field type.
+    Falls back to the stripped string representation if conversion fails.
+    """
+    try:
+        if field_type == 'number':
+            return float(value) if '.' in str(value) else int(value)
+        elif field_type == 'date':
+            # Convert to ISO format string
+            if isinstance(value, (pd.Timestamp, datetime)):
+                return value.strftime('%Y-%m-%d')
+            return pd.to_datetime(value).strftime('%Y-%m-%d')
+        else:  # text
+            return str(value).strip()
+    except Exception:
+        # Fallback to string representation
+        return str(value).strip()
+
+
+def _convert_scalars(values: pd.Series, field_type: str) -> np.ndarray:
+    """Convert cells one at a time with _convert_value."""
+    return np.array([_convert_value(value, field_type) for value in values], dtype=object)
+
+
+def _convert_number_column(values: pd.Series) -> np.ndarray:
+    """
+    Convert non-null numeric cells column-wise.
+    Produces exactly what _convert_value would for every cell.
+    """
+    kind = values.dtype.kind
+    
+    if kind in 'iu':
+        return np.array(values.tolist(), dtype=object)
+    
+    if kind == 'b':
+        return np.array(values.astype(int).tolist(), dtype=object)
+    
+    if values.dtype == np.float64:
+        arr = values.to_numpy()
+        converted = np.array(arr.tolist(), dtype=object)
+        
+        # str() of a float has no '.' outside [1e-4, 1e16) (exponent notation) or
+        # for inf, where _convert_value takes the int() branch instead
+        magnitude = np.abs(arr)
+        irregular = ~np.isfinite(arr) | ((arr != 0) & ((magnitude < 1e-4) | (magnitude >= 1e16)))
+        if irregular.any():
+            converted[irregular] = _convert_scalars(values[irregular], 'number')
+        
+        return converted
+    
+    return _convert_scalars(values, 'number')
+
+
+def _convert_date_column(values: pd.Series, date_format: Optional[str] = None) -> np.ndarray:
+    """
+    Convert non-null date cells column-wise to 'YYYY-MM-DD' strings.
+    Cells the column-level parse cannot handle are converted one at a time.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.strftime('%Y-%m-%d').to_numpy(dtype=object)
+    
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+    except (ValueError, TypeError):
+        return _convert_scalars(values, 'date')
+    
+    converted = parsed.dt.strftime('%Y-%m-%d').to_numpy(dtype=object)
+    
+    failed = parsed.isna().to_numpy()
+    if failed.any():
+        converted[failed] = _convert_scalars(values[failed], 'date')
+    
+    return converted
+
+
+def _convert_column(values: pd.Series, field: Dict[str, Any]) -> np.ndarray:
+    """Convert the non-null cells of one column based on its field definition."""
+    field_type = field['type']
+    
+    if field_type == 'number':
+        return _convert_number_column(values)
+    elif field_type == 'date':
+        return _convert_date_column(values, field.get('format'))
+    else:  # text
+        return values.astype(str).str.strip().to_numpy(dtype=object)
+
+
 def dataframe_to_records(df: pd.DataFrame, schema: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Convert DataFrame rows to record dictionaries using the schema.
     
+    Conversion is column-wise: each column is cast once according to its
+    field type, with null cells left out of the resulting records.
+    
     Returns:
         List of record data dictionaries
     """
-    records = []
     fields = schema.get('fields', [])
+    width = min(len(fields), len(df.columns))
+    
+    if width == 0 or df.empty:
+        return []
+    
+    names = [field['name'] for field in fields[:width]]
+    columns = []
+    all_present = True
     
-    for _, row in df.iterrows():
-        record_data = {}
+    for i in range(width):
+        column = df.iloc[:, i]
+        present = column.notna().to_numpy()
         
-        for i, (column, value) in enumerate(row.items()):
-            if i < len(fields):
-                field = fields[i]
-                field_name = field['name']
-                field_type = field['type']
-                
-                # Handle empty/null values
-                if pd.isna(value):
-                    continue
-                
-                # Convert value based on field type
-                try:
-                    if field_type == 'number':
-                        record_data[field_name] = float(value) if '.' in str(value) else int(value)
-                    elif field_type == 'date':
-                        # Convert to ISO format string
-                        if isinstance(value, (pd.Timestamp, datetime)):
-                            record_data[field_name] = value.strftime('%Y-%m-%d')
-                        else:
-                            date_obj = pd.to_datetime(value)
-                            record_data[field_name] = date_obj.strftime('%Y-%m-%d')
-                    else:  # text
-                        record_data[field_name] = str(value).strip()
-                except Exception:
-                    # Fallback to string representation
-                    record_data[field_name] = str(value).strip()
+        converted = np.full(len(df), None, dtype=object)
+        if present.all():
+            converted[:] = _convert_column(column, fields[i])
+        else:
+            all_present = False
+            if present.any():
+                converted[present] = _convert_column(column[present], fields[i])
         
-        # Only add non-empty records
+        columns.append(converted)
+    
+    # Dense frame with unique field names: every row maps 1:1 onto a record
+    if all_present and len(set(names)) == len(names):
+        return pd.DataFrame(dict(zip(names, columns))).to_dict('records')
+    
+    # Otherwise drop null cells per row (later duplicate names overwrite earlier
+    # ones) and skip rows that end up empty
+    records = []
+    for row in zip(*columns):
+        record_data = {name: value for name, value in zip(names, row) if value is not None}
         if record_data:
             records.append(record_data)
     
     return records
 
 
+def folder_name_from_filename(filename: Optional[str]) -> str:
+    """
+    Generate a folder name from an uploaded file's name.
+    """
+    filename_without_ext = os.path.splitext(filename or 'imported_data')[0]
+    return filename_without_ext.replace('_', ' ').replace('-', ' ').title()
+
+
+def count_csv_rows(fileobj: BinaryIO) -> Tuple[int, bool]:
+    """
+    Count CSV data rows by counting newlines over the raw bytes.
+    Reads in fixed-size blocks, so memory use does not depend on file size.
+    
+    Returns:
+        Tuple of (row count excluding the header, whether it is an estimate).
+        The count is flagged as an estimate because quoted fields may contain
+        newlines and blank lines are included.
+    """
+    fileobj.seek(0)
+    newlines = 0
+    last_block = b''
+    
+    while True:
+        block = fileobj.read(1024 * 1024)
+        if not block:
+            break
+        newlines += block.count(b'\n')
+        last_block = block
+    
+    fileobj.seek(0)
+    
+    lines = newlines + (1 if last_block and not last_block.endswith(b'\n') else 0)
+    return max(lines - 1, 0), True
+
+
+def read_csv_head(fileobj: BinaryIO, nrows: int) -> pd.DataFrame:
+    """
+    Parse only the first nrows data rows of a CSV file.
+    """
+    fileobj.seek(0)
+    try:
+        return pd.read_csv(fileobj, nrows=nrows)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to parse CSV file: {str(e)}"
+        )
+    finally:
+        fileobj.seek(0)
+
+
+def read_excel_head(fileobj: BinaryIO, nrows: int) -> Tuple[pd.DataFrame, Optional[int]]:
+    """
+    Parse only the first nrows data rows of the active worksheet using
+    openpyxl's read-only row iteration.
+    
+    Returns:
+        Tuple of (DataFrame, row count from the sheet dimensions or None).
+        The dimension-based count may include trailing formatted empty rows.
+    """
+    fileobj.seek(0)
+    try:
+        workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to parse Excel file: {str(e)}"
+        )
+    
+    try:
+        sheet = workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        data = [row for row in itertools.islice(rows, nrows)]
+        total_rows = sheet.max_row - 1 if sheet.max_row else None
+    finally:
+        workbook.close()
+        fileobj.seek(0)
+    
+    if not header:
+        return pd.DataFrame(), 0
+    
+    return excel_rows_to_dataframe(data, excel_columns(header)), total_rows
+
+
+def excel_columns(header: Tuple[Any, ...]) -> List[str]:
+    """
+    Column names from an Excel header row, named like pandas for blank cells.
+    """
+    return [
+        str(name) if name is not None else f'Unnamed: {i}'
+        for i, name in enumerate(header)
+    ]
+
+
+def excel_rows_to_dataframe(rows: List[Tuple[Any, ...]], columns: List[str]) -> pd.DataFrame:
+    """
+    Build a DataFrame from openpyxl row tuples, dropping blank rows.
+    """
+    df = pd.DataFrame([row[:len(columns)] for row in rows], columns=columns)
+    return df.dropna(how='all').infer_objects()
+
+
+async def preview_import_file(file: UploadFile, nrows: int = PREVIEW_PARSE_ROWS) -> Dict[str, Any]:
+    """
+    Build an import preview from the head of the file only.
+    
+    Parses at most nrows rows for schema detection and the preview; the total
+    row count comes from a newline count (CSV) or the sheet dimensions (Excel)
+    and is flagged as an estimate unless the whole file fit in the head.
+    
+    Field types are detected from those rows only, and imports keep them for
+    the whole file: a later value that does not fit its field's type (e.g. a
+    word in a number column) is stored as text. type_detection_rows and
+    type_detection_partial report this.
+    
+    Returns:
+        Dictionary containing schema, preview, and stats.
+    """
+    validate_file(file)
+    validate_upload_size(file)
+    file_ext = os.path.splitext(file.filename or '')[1].lower()
+    
+    if file_ext == '.csv':
+        df = await run_in_threadpool(read_csv_head, file.file, nrows)
+        total_rows, estimated = await run_in_threadpool(count_csv_rows, file.file)
+    else:
+        df, total_rows = await run_in_threadpool(read_excel_head, file.file, nrows)
+        estimated = True
+    
+    # Validate DataFrame
+    if df.empty or len(df.columns) == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="File is empty or contains no data"
+        )
+    
+    # The whole file fit in the head, so its length is exact
+    if len(df) < nrows or total_rows is None:
+        total_rows, estimated = len(df), len(df) >= nrows
+    
+    schema = generate_schema_from_dataframe(df)
+    
+    return {
+        'folder_name': folder_name_from_filename(file.filename),
+        'schema': schema,
+        'preview': dataframe_to_records(df.head(PREVIEW_ROWS), schema),
+        'total_rows': max(total_rows, len(df)),
+        'total_rows_estimated': estimated,
+        'total_columns': len(schema.get('fields', [])),
+        'type_detection_rows': len(df),
+        'type_detection_partial': max(total_rows, len(df)) > len(df)
+    }
+
+
 async def process_import_file(file: UploadFile, preview_only: bool = False) -> Dict[str, Any]:
     """
     Process uploaded file and prepare import data.
     
     Args:
         file: The uploaded file
-        preview_only: If True, only returns preview and stats, skips full record parsing if possible.
-                      (Current implementation still parses full DF but avoids returning records list)
+        preview_only: If True, only the head of the file is parsed (see
+                      preview_import_file) and no records are returned.
     
     Returns:
         Dictionary containing schema, preview, and stats.
         'records' is included only if preview_only=False.
     """
+    if preview_only:
+        return await preview_import_file(file)
+    
     # Parse file
     df, file_ext = await parse_file(file)
     
-    # Generate folder name from filename
-    filename_without_ext = os.path.splitext(file.filename or 'imported_data')[0]
-    folder_name = filename_without_ext.replace('_', ' ').replace('-', ' ').title()
-    
     # Generate schema
     schema = generate_schema_from_dataframe(df)
     
-    # Calculate totals
-    total_rows = len(df)
-    total_columns = len(schema.get('fields', []))
-    
-    # Prepare preview (limit to first 5)
-    # Convert only the head to records for efficiency
-    preview_df = df.head(5)
-    preview = dataframe_to_records(preview_df, schema)
+    # Convert all to records
+    records = dataframe_to_records(df, schema)
+    if not records:
+        raise HTTPException(
+            status_code=400,
+            detail="No valid data found in file"
+        )
     
-    result = {
-        'folder_name': folder_name,
+    return {
+        'folder_name': folder_name_from_filename(file.filename),
         'schema': schema,
-        'preview': preview,
-        'total_rows': total_rows,
-        'total_columns': total_columns
+        'preview': dataframe_to_records(df.head(PREVIEW_ROWS), schema),
+        'total_rows': len(df),
+        'total_rows_estimated': False,
+        'total_columns': len(schema.get('fields', [])),
+        'type_detection_rows': len(df),
+        'type_detection_partial': False,
+        'records': records
     }
 
-    if not preview_only:
-        # Convert all to records
-        records = dataframe_to_records(df, schema)
-        if not records:
-             raise HTTPException(
-                status_code=400,
-                detail="No valid data found in file"
-            )
-        result['records'] = records
-
-    return result
+
+def _read_next_chunk(reader) -> Optional[pd.DataFrame]:
+    """
+    Read the next chunk from a pandas chunked reader, or None when exhausted.
+    StopIteration cannot cross a thread-pool boundary, so it is mapped to None.
+    """
+    try:
+        return next(reader)
+    except StopIteration:
+        return None
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to parse CSV file: {str(e)}"
+        )
+
+
+async def open_import_stream(
+    file: UploadFile,
+    chunksize: int = IMPORT_CHUNK_SIZE
+) -> Tuple[Dict[str, Any], AsyncIterator[List[Dict[str, Any]]]]:
+    """
+    Open an uploaded file for batched import.
+    
+    CSV files are read from the spooled upload in `chunksize` rows at a time;
+    each chunk is converted only when the previous batch has been consumed, so
+    memory stays bounded by the chunk size rather than the file size. The
+    schema is detected from the first chunk and not revised afterwards: rows
+    already inserted cannot be re-typed, so a later value that does not fit
+    its field's type is stored as text (see preview_import_file). Excel files
+    are streamed the same way by open_excel_stream.
+    
+    Parsing and conversion run in the thread pool to keep the event loop free.
+    
+    Returns:
+        Tuple of (detected schema, async iterator of record batches)
+    """
+    validate_file(file)
+    file_ext = os.path.splitext(file.filename or '')[1].lower()
+    
+    validate_upload_size(file)
+    
+    if file_ext != '.csv':
+        return await open_excel_stream(file, chunksize)
+    
+    try:
+        reader = pd.read_csv(file.file, chunksize=chunksize)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to parse CSV file: {str(e)}"
+        )
+    
+    first_chunk = await run_in_threadpool(_read_next_chunk, reader)
+    
+    if first_chunk is None or first_chunk.empty or len(first_chunk.columns) == 0:
+        reader.close()
+        raise HTTPException(
+            status_code=400,
+            detail="File is empty or contains no data"
+        )
+    
+    schema = generate_schema_from_dataframe(first_chunk)
+    
+    async def csv_batches() -> AsyncIterator[List[Dict[str, Any]]]:
+        chunk = first_chunk
+        try:
+            while chunk is not None:
+                records = await run_in_threadpool(dataframe_to_records, chunk, schema)
+                if records:
+                    yield records
+                chunk = await run_in_threadpool(_read_next_chunk, reader)
+        finally:
+            reader.close()
+    
+    return schema, csv_batches()
+
+
+def _excel_source_path(file: UploadFile) -> Tuple[str, Optional[str]]:
+    """
+    Path the worker processes can open: the upload's own file when it is on
+    disk (spooled import jobs), otherwise a temporary copy.
+    
+    Returns:
+        Tuple of (path, temporary path to delete afterwards or None)
+    """
+    name = getattr(file.file, 'name', None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name, None
+    
+    file.file.seek(0)
+    with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as target:
+        shutil.copyfileobj(file.file, target, 1024 * 1024)
+    file.file.seek(0)
+    return target.name, target.name
+
+
+def _remove_temp_file(path: Optional[str]) -> None:
+    if path is not None and os.path.exists(path):
+        os.remove(path)
+
+
+async def _excel_frames(
+    path: str,
+    sheet_titles: List[str],
+    columns: List[str],
+    chunksize: int,
+    temp_path: Optional[str]
+) -> AsyncIterator[pd.DataFrame]:
+    """
+    Stream non-empty DataFrames from the Excel process pool. Stops the sheet
+    workers and removes the temporary copy when closed.
+    """
+    chunks = iter_sheet_chunks(path, sheet_titles, chunksize, settings.EXCEL_PARSE_WORKERS)
+    try:
+        async for rows in chunks:
+            df = await run_in_threadpool(excel_rows_to_dataframe, rows, columns)
+            if not df.empty:
+                yield df
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to parse Excel file: {str(e)}"
+        )
+    finally:
+        await chunks.aclose()
+        _remove_temp_file(temp_path)
+
+
+async def open_excel_stream(
+    file: UploadFile,
+    chunksize: int = IMPORT_CHUNK_SIZE
+) -> Tuple[Dict[str, Any], AsyncIterator[List[Dict[str, Any]]]]:
+    """
+    Open an Excel upload for batched import.
+    
+    Sheets are parsed with openpyxl's read-only row iteration in the Excel
+    process pool (see excel_reader) and arrive in `chunksize` row chunks.
+    The active sheet is imported; other sheets whose header row matches it
+    (e.g. an export split across sheets at Excel's row limit) are parsed in
+    parallel and appended in workbook order. The schema is detected from the
+    first chunk, with the same limit as for CSV (see open_import_stream).
+    
+    Returns:
+        Tuple of (detected schema, async iterator of record batches)
+    """
+    path, temp_path = await run_in_threadpool(_excel_source_path, file)
+    
+    try:
+        sheets = await run_in_threadpool(list_sheet_headers, path)
+    except Exception as e:
+        _remove_temp_file(temp_path)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to parse Excel file: {str(e)}"
+        )
+    
+    header = sheets[0][1] if sheets else None
+    if not header or all(name is None for name in header):
+        _remove_temp_file(temp_path)
+        raise HTTPException(
+            status_code=400,
+            detail="File is empty or contains no data"
+        )
+    
+    columns = excel_columns(header)
+    sheet_titles = [
+        title for title, sheet_header in sheets
+        if sheet_header and excel_columns(sheet_header) == columns
+    ]
+    
+    frames = _excel_frames(path, sheet_titles, columns, chunksize, temp_path)
+    try:
+        first_frame = await frames.__anext__()
+        schema = generate_schema_from_dataframe(first_frame)
+    except StopAsyncIteration:
+        raise HTTPException(
+            status_code=400,
+            detail="File is empty or contains no data"
+        )
+    except BaseException:
+        await frames.aclose()
+        raise
+    
+    async def excel_batches() -> AsyncIterator[List[Dict[str, Any]]]:
+        df = first_frame
+        try:
+            while True:
+                records = await run_in_threadpool(dataframe_to_records, df, schema)
+                if records:
+                    yield records
+                df = await frames.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            await frames.aclose()
+    
+    return schema, excel_batches()
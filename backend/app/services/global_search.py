@@ -0,0 +1,253 @@
+"""
+Search across all of a user's collections.
+
+Uses the same full-text indexes as the per-collection record search (see
+app.models.record_search), scoped to the user instead of one collection:
+collection names and descriptions, plus record text fields.
+
+Record hits are ranked among the user's newest RECORD_CANDIDATES live
+matches. The index lookup for those is a few milliseconds even for a word in
+most of a million records, where ranking every match (bm25 on SQLite,
+ts_rank_cd on PostgreSQL) takes seconds. The candidates are scored here with a BM25-style
+term frequency and length weighting and grouped by collection.
+"""
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Row, column, func, literal_column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.collection import Collection
+from app.models.record import Record
+from app.models.record_search import fts_id
+from app.services.record_search import (
+    SearchTerm,
+    fold_text,
+    fts_words,
+    highlight_record,
+    pg_tsquery,
+    searchable_values
+)
+
+
+# Newest matching records ranked per search. Bounds the work for common
+# words; older matches of a word found in more records are left out.
+RECORD_CANDIDATES = 500
+
+# Index windows of RECORD_CANDIDATES matches read on SQLite while the newest
+# ones are deleted records or records of deleted collections, which stay in
+# the index (collection search can include deleted records)
+_CANDIDATE_WINDOWS = 8
+
+# BM25 term frequency saturation and length normalization
+_K1 = 1.2
+_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_COMBINING_PATTERN = re.compile("[\u0300-\u036f]")
+
+_records_fts = table("records_fts", column("rowid"))
+_collections_fts = table("collections_fts", column("rowid"))
+
+
+@dataclass
+class SearchGroup:
+    """A collection with its own match (if any) and its best record hits."""
+    collection: Collection
+    score: Optional[float] = None
+    highlights: Dict[str, str] = field(default_factory=dict)
+    # (record row, score, highlights)
+    hits: List[Tuple[Row, float, Dict[str, str]]] = field(default_factory=list)
+
+
+async def _match_collections(
+    db: AsyncSession,
+    user_id: str,
+    terms: List[SearchTerm],
+    limit: int
+) -> List[Tuple[Collection, float]]:
+    if db.get_bind().dialect.name == "postgresql":
+        vector = func.to_tsvector(
+            "simple", func.coalesce(Collection.name, "") + " " + func.coalesce(Collection.description, "")
+        )
+        tsquery = func.to_tsquery("simple", pg_tsquery(terms))
+        score = func.ts_rank_cd(vector, tsquery)
+        query = select(Collection, score.label("score")).where(vector.op("@@")(tsquery))
+    else:
+        score = -func.bm25(
+            literal_column("collections_fts"), literal_column("0.0"), literal_column("1.0"), literal_column("1.0")
+        )
+        match = f'user_id:"{fts_id(user_id)}" AND {{name description}}:({fts_words(terms)})'
+        query = (
+            select(Collection, score.label("score"))
+            .join(_collections_fts, _collections_fts.c.rowid == literal_column("collections.rowid"))
+            .where(literal_column("collections_fts").op("MATCH")(match))
+        )
+
+    query = (
+        query.where(Collection.user_id == user_id, Collection.is_deleted == False)
+        .order_by(score.desc(), Collection.id)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return [(collection, float(score)) for collection, score in result.all()]
+
+
+async def _record_candidates(
+    db: AsyncSession,
+    user_id: str,
+    terms: List[SearchTerm],
+    collections: Dict[str, Collection]
+) -> List[Row]:
+    """
+    Newest matching live records of the user, as plain rows, restricted to
+    `collections` (the user's live collections by id).
+    """
+    # Rows rather than ORM objects: hydrating hundreds of records costs more
+    # than finding them
+    query = select(Record.__table__).where(Record.is_deleted == False)
+
+    if db.get_bind().dialect.name == "postgresql":
+        tsquery = func.to_tsquery("simple", pg_tsquery(terms))
+        query = (
+            query.join(Collection, Collection.id == Record.collection_id)
+            .where(
+                Collection.user_id == user_id,
+                Collection.is_deleted == False,
+                literal_column("records.search_vector").op("@@")(tsquery)
+            )
+            .order_by(Record.created_at.desc(), Record.id.desc())
+            .limit(RECORD_CANDIDATES)
+        )
+        result = await db.execute(query)
+        return list(result.all())
+
+    # Newest first by rowid: FTS5 walks the user's postings backwards and
+    # stops after the limit, without ranking anything. No join with
+    # collections, which would make SQLite scan the user's records instead.
+    # Deleted records are filtered out afterwards, so further windows are
+    # read until enough live ones are found.
+    rowid = literal_column("records.rowid")
+    match = literal_column("records_fts").op("MATCH")(
+        f'user_id:"{fts_id(user_id)}" AND body:({fts_words(terms)})'
+    )
+    candidates: List[Row] = []
+    before: Optional[int] = None
+    for _ in range(_CANDIDATE_WINDOWS):
+        newest = select(_records_fts.c.rowid).where(match)
+        if before is not None:
+            newest = newest.where(_records_fts.c.rowid < before)
+        result = await db.execute(newest.order_by(_records_fts.c.rowid.desc()).limit(RECORD_CANDIDATES))
+        rowids = list(result.scalars())
+        if not rowids:
+            break
+
+        result = await db.execute(query.where(rowid.in_(rowids)).order_by(rowid.desc()))
+        candidates.extend(row for row in result if row.collection_id in collections)
+        if len(candidates) >= RECORD_CANDIDATES or len(rowids) < RECORD_CANDIDATES:
+            break
+        before = rowids[-1]
+
+    return candidates[:RECORD_CANDIDATES]
+
+
+def _tokens(text: str) -> List[str]:
+    """Words of a text, folded like the index tokenizer."""
+    text = text.lower()
+    if not text.isascii():
+        text = _COMBINING_PATTERN.sub("", unicodedata.normalize("NFD", text))
+    return _TOKEN_PATTERN.findall(text)
+
+
+def _score_candidates(
+    candidates: List[Row],
+    collections: Dict[str, Collection],
+    terms: List[SearchTerm]
+) -> List[Tuple[Row, float]]:
+    """
+    BM25 over the candidates' searchable text. Every candidate contains every
+    term, so inverse document frequency is left out.
+    """
+    folded_terms = [(fold_text(word), prefix) for word, prefix in terms]
+    documents = []
+    for row in candidates:
+        schema = collections[row.collection_id].schema
+        text = " ".join(value for _, value in searchable_values(row.data, schema))
+        tokens = _tokens(text)
+        documents.append((len(tokens), Counter(tokens)))
+    average_length = sum(length for length, _ in documents) / len(documents) if documents else 0
+
+    scored = []
+    for row, (length, counts) in zip(candidates, documents):
+        norm = _K1 * (1 - _B + _B * length / average_length) if average_length else _K1
+        score = 0.0
+        for word, prefix in folded_terms:
+            if prefix:
+                frequency = sum(count for token, count in counts.items() if token.startswith(word))
+            else:
+                frequency = counts.get(word, 0)
+            score += frequency * (_K1 + 1) / (frequency + norm)
+        scored.append((row, score))
+
+    scored.sort(key=lambda hit: (-hit[1], hit[0].id))
+    return scored
+
+
+async def search_user(
+    db: AsyncSession,
+    user_id: str,
+    terms: List[SearchTerm],
+    limit: int,
+    hits_per_collection: int
+) -> List[SearchGroup]:
+    """
+    Search a user's collections and records in one pass.
+
+    Args:
+        db: Database session
+        user_id: Owner whose collections are searched
+        terms: Terms from parse_search_terms
+        limit: Maximum collections (groups) returned
+        hits_per_collection: Maximum record hits per collection
+
+    Returns:
+        Groups whose collection name or description matched first (best
+        first), then the other collections by their best record hit
+    """
+    groups: Dict[str, SearchGroup] = {}
+
+    for collection, score in await _match_collections(db, user_id, terms, limit):
+        groups[collection.id] = SearchGroup(
+            collection=collection,
+            score=score,
+            highlights=highlight_record(
+                {"name": collection.name, "description": collection.description or ""}, None, terms
+            )
+        )
+
+    result = await db.execute(
+        select(Collection).where(Collection.user_id == user_id, Collection.is_deleted == False)
+    )
+    collections = {collection.id: collection for collection in result.scalars()}
+
+    candidates = await _record_candidates(db, user_id, terms, collections)
+    for row, score in _score_candidates(candidates, collections, terms):
+        collection = collections[row.collection_id]
+        group = groups.get(collection.id)
+        if group is None:
+            group = groups[collection.id] = SearchGroup(collection=collection)
+        if len(group.hits) < hits_per_collection:
+            group.hits.append((row, score, highlight_record(row.data, collection.schema, terms)))
+
+    # Collection matches first, then collections found through their records
+    ordered = sorted(
+        groups.values(),
+        key=lambda group: (
+            group.score is None,
+            -(group.score if group.score is not None else (group.hits[0][1] if group.hits else 0.0))
+        )
+    )
+    return ordered[:limit]
@@ -0,0 +1,569 @@
+"""
+Background import jobs.
+Uploads are spooled to disk and imported by a bounded pool of worker tasks.
+Job state and committed progress live in the import_jobs table, so queued
+and interrupted jobs are picked up again after a restart. A running job
+records the process running it and a heartbeat, so with several workers only
+jobs whose process has died are taken over.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Dict, List, Optional, Set
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.activity_writer import activity_writer
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReadSessionLocal
+from app.core.process_identity import process_id
+from app.models.collection import Collection
+from app.models.import_job import ImportJob
+from app.models.record import Record
+from app.services.file_import import count_csv_rows, open_import_stream
+from app.services.record_service import bulk_insert_records
+
+
+logger = logging.getLogger(__name__)
+
+# Jobs in these states are finished and never change again
+TERMINAL_JOB_STATUSES = {"completed", "failed", "cancelled"}
+
+
+class ImportCancelled(Exception):
+    """Raised inside an import when its job has been cancelled."""
+
+
+class ImportInterrupted(Exception):
+    """Raised inside an import when the runner is shutting down."""
+
+
+class ImportClaimLost(Exception):
+    """Raised inside an import when another process has taken the job over."""
+
+
+@dataclass
+class ImportProgress:
+    """Live progress of a job running in this process."""
+    total_rows: Optional[int] = None
+    rows_parsed: int = 0
+    rows_inserted: int = 0
+    resumed_from: int = 0  # Rows already inserted before this run started
+    started_at: Optional[float] = None
+    cancel_requested: bool = False
+    stop_requested: bool = False
+
+    def rows_per_second(self) -> Optional[float]:
+        """Insert throughput since this run started."""
+        if self.started_at is None:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        if elapsed <= 0:
+            return None
+        return (self.rows_inserted - self.resumed_from) / elapsed
+
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated time to finish, from the row estimate and current throughput."""
+        rate = self.rows_per_second()
+        if not rate or self.total_rows is None:
+            return None
+        return max(self.total_rows - self.rows_inserted, 0) / rate
+
+
+def _log_import_activity(db: AsyncSession, user_id: str, collection: Collection, items_created: int) -> None:
+    """Record the activity log entry for an imported collection."""
+    activity_writer.record(
+        db,
+        user_id=user_id,
+        action="created",
+        entity_type="collection",
+        entity_id=collection.id,
+        changes={
+            "source": "file_import",
+            "items_imported": items_created,
+            "folder_name": collection.name
+        }
+    )
+
+
+def spool_upload(source: BinaryIO, path: str) -> None:
+    """
+    Copy an upload to the spool directory in fixed-size blocks.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    source.seek(0)
+    with open(path, "wb") as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+
+
+def _estimate_rows(path: str) -> Optional[int]:
+    """Row estimate for ETA reporting; only CSV can be counted cheaply."""
+    if not path.lower().endswith(".csv"):
+        return None
+    with open(path, "rb") as fileobj:
+        return count_csv_rows(fileobj)[0]
+
+
+def _remove_spool_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ImportJobRunner:
+    """
+    Bounded pool of asyncio worker tasks processing queued import jobs.
+
+    A job is claimed with a conditional UPDATE (queued -> running), so it is
+    processed once even if enqueued twice. A job commits after every chunk
+    together with its progress counters, so the write lock is only held
+    briefly and an interrupted job resumes after the rows it already
+    inserted. A failed or cancelled job deletes its partial
+    collection.
+
+    The claim records this process (claimed_by), and a monitor task renews
+    the heartbeat_at of its running jobs every WORKER_HEARTBEAT_SECONDS.
+    Running jobs without a heartbeat for WORKER_STALE_SECONDS belong to a
+    dead process and are re-queued - on start and by every monitor pass - so
+    several processes can share the job table. Every commit of a job first
+    checks that this process still holds the claim, so a process that was
+    only stalled stops instead of inserting rows twice.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        shutdown_timeout: float = 30.0,
+        heartbeat_interval: float = settings.WORKER_HEARTBEAT_SECONDS,
+        stale_after: float = settings.WORKER_STALE_SECONDS
+    ):
+        self.workers = workers
+        self.shutdown_timeout = shutdown_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._monitor: Optional[asyncio.Task] = None
+        self._busy: Set[asyncio.Task] = set()
+        self._progress: Dict[str, ImportProgress] = {}
+        self._stopping = False
+
+    async def start(self) -> None:
+        """
+        Queue waiting jobs, re-queue those abandoned by a dead process and
+        start the worker and monitor tasks. Jobs other live processes are
+        running are left alone.
+        """
+        async with AsyncSessionLocal() as db:
+            recovered = await self._requeue_stale(db)
+            result = await db.execute(
+                select(ImportJob.id)
+                .where(ImportJob.status == "queued")
+                .order_by(ImportJob.created_at)
+            )
+            job_ids = list(result.scalars())
+            await db.commit()
+
+        self._stopping = False
+        # A job queued twice (here and by the process that created it) is
+        # still only run once: claiming it is conditional
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+        if job_ids:
+            logger.info(f"Queued {len(job_ids)} unfinished import jobs ({len(recovered)} recovered)")
+
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"import-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._monitor = asyncio.create_task(self._monitor_claims(), name="import-job-monitor")
+
+    async def stop(self) -> None:
+        """
+        Stop the workers. Running jobs stop at their next chunk boundary and
+        are re-queued to resume on the next start; idle workers are cancelled.
+        Cancelling a worker in the middle of a database call can leave its
+        connection holding the write lock, so that only happens after
+        shutdown_timeout.
+        """
+        self._stopping = True
+        if self._monitor is not None:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+        for progress in self._progress.values():
+            progress.stop_requested = True
+        for task in self._tasks:
+            if task not in self._busy:
+                task.cancel()
+
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=self.shutdown_timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, job_id: str) -> None:
+        """Queue a committed job for processing."""
+        self._queue.put_nowait(job_id)
+
+    def progress(self, job_id: str) -> Optional[ImportProgress]:
+        """Live progress of a job running in this process, if any."""
+        return self._progress.get(job_id)
+
+    async def cancel(self, db: AsyncSession, job: ImportJob) -> None:
+        """
+        Cancel a job. Queued jobs are cancelled immediately; running jobs stop
+        at the next chunk boundary and their worker cleans up.
+        """
+        progress = self._progress.get(job.id)
+        if progress is not None:
+            progress.cancel_requested = True
+
+        # Conditional updates so a worker claiming the job concurrently wins cleanly
+        cancelled = await db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job.id, ImportJob.status == "queued")
+            .values(status="cancelled", cancel_requested=True, finished_at=datetime.utcnow())
+        )
+        if cancelled.rowcount != 1:
+            await db.execute(
+                update(ImportJob)
+                .where(ImportJob.id == job.id, ImportJob.status == "running")
+                .values(cancel_requested=True)
+            )
+        await db.commit()
+        await db.refresh(job)
+
+        if cancelled.rowcount == 1:
+            _remove_spool_file(job.file_path)
+
+    async def _requeue_stale(self, db: AsyncSession) -> List[str]:
+        """
+        Re-queue running jobs whose process stopped sending heartbeats.
+        They resume from their committed progress. Not committed.
+
+        Returns:
+            Ids of the re-queued jobs
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        result = await db.execute(
+            update(ImportJob)
+            .where(
+                ImportJob.status == "running",
+                (ImportJob.heartbeat_at.is_(None)) | (ImportJob.heartbeat_at < cutoff)
+            )
+            .values(status="queued", claimed_by=None, heartbeat_at=None)
+            .returning(ImportJob.id)
+        )
+        job_ids = list(result.scalars())
+        if job_ids:
+            logger.warning(f"Re-queued {len(job_ids)} import jobs abandoned by a stopped process")
+        return job_ids
+
+    async def _monitor_claims(self) -> None:
+        """
+        Renew the heartbeat of this process's running jobs and take over
+        jobs whose process has died.
+        """
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(ImportJob)
+                        .where(ImportJob.claimed_by == process_id(), ImportJob.status == "running")
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    recovered = await self._requeue_stale(db)
+                    await db.commit()
+                for job_id in recovered:
+                    self._queue.put_nowait(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Import job heartbeat failed")
+
+    async def _renew_claim(self, db: AsyncSession, job_id: str) -> None:
+        """
+        Renew the heartbeat in the transaction about to commit a job's
+        progress, which must only commit while this process holds the claim.
+
+        Raises:
+            ImportClaimLost: The job was re-queued or claimed by another process
+        """
+        renewed = await db.execute(
+            update(ImportJob)
+            .where(
+                ImportJob.id == job_id,
+                ImportJob.status == "running",
+                ImportJob.claimed_by == process_id()
+            )
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        if renewed.rowcount != 1:
+            raise ImportClaimLost()
+
+    async def _worker(self) -> None:
+        task = asyncio.current_task()
+        while True:
+            job_id = await self._queue.get()
+            self._busy.add(task)
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception(f"Import job {job_id} crashed")
+            finally:
+                self._busy.discard(task)
+                self._progress.pop(job_id, None)
+                self._queue.task_done()
+
+            # Queued jobs stay queued in the table for the next start
+            if self._stopping:
+                return
+
+    async def _run(self, job_id: str) -> None:
+        # Registered before the claim so a cancel never misses a running job
+        progress = ImportProgress(stop_requested=self._stopping)
+        self._progress[job_id] = progress
+
+        async with AsyncSessionLocal() as db:
+            # Claim the job
+            claimed = await db.execute(
+                update(ImportJob)
+                .where(
+                    ImportJob.id == job_id,
+                    ImportJob.status == "queued",
+                    ImportJob.cancel_requested.is_(False)
+                )
+                .values(
+                    status="running",
+                    started_at=datetime.utcnow(),
+                    claimed_by=process_id(),
+                    heartbeat_at=datetime.utcnow()
+                )
+            )
+            job = await db.get(ImportJob, job_id) if claimed.rowcount == 1 else None
+            await db.commit()
+            if job is None:
+                return
+
+            file_path = job.file_path
+
+            try:
+                await self._import(db, job, progress)
+                logger.info(f"Import job {job_id} completed: {progress.rows_inserted} records")
+            except ImportInterrupted:
+                # Committed chunks are kept; the job resumes on the next start
+                await db.rollback()
+                await db.execute(
+                    update(ImportJob)
+                    .where(ImportJob.id == job_id, ImportJob.claimed_by == process_id())
+                    .values(status="queued", claimed_by=None, heartbeat_at=None)
+                )
+                await db.commit()
+                logger.info(f"Import job {job_id} interrupted by shutdown")
+                return
+            except ImportClaimLost:
+                # Another process resumes the job from its committed progress
+                # and still needs the spooled file
+                await db.rollback()
+                logger.warning(f"Import job {job_id} was taken over by another process")
+                return
+            except ImportCancelled:
+                await db.rollback()
+                finished = await self._abandon(db, job_id, "cancelled")
+            except HTTPException as e:
+                await db.rollback()
+                finished = await self._abandon(db, job_id, "failed", str(e.detail))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Import job {job_id} failed")
+                await db.rollback()
+                finished = await self._abandon(db, job_id, "failed", f"Import failed: {str(e)}")
+            else:
+                finished = True
+
+            if finished:
+                _remove_spool_file(file_path)
+
+    async def _import(self, db: AsyncSession, job: ImportJob, progress: ImportProgress) -> None:
+        """
+        Import a claimed job's file, committing after every chunk.
+        """
+        if job.total_rows_estimate is None:
+            job.total_rows_estimate = await run_in_threadpool(_estimate_rows, job.file_path)
+
+        with open(job.file_path, "rb") as fileobj:
+            detected_schema, batches = await open_import_stream(
+                UploadFile(fileobj, filename=job.filename)
+            )
+            try:
+                collection = await self._get_or_create_collection(db, job, detected_schema)
+
+                progress.total_rows = job.total_rows_estimate
+                progress.rows_inserted = progress.resumed_from = job.rows_inserted
+                progress.started_at = time.monotonic()
+
+                # Chunking is deterministic, so resuming skips the rows already inserted
+                skip = job.rows_inserted
+                rows_parsed = 0
+
+                async for batch in batches:
+                    rows_parsed += len(batch)
+                    progress.rows_parsed = rows_parsed
+                    if progress.cancel_requested:
+                        raise ImportCancelled()
+                    if progress.stop_requested:
+                        raise ImportInterrupted()
+
+                    if skip:
+                        skipped = min(skip, len(batch))
+                        batch = batch[skipped:]
+                        skip -= skipped
+                        if not batch:
+                            continue
+
+                    await bulk_insert_records(db, collection.id, batch)
+                    job.rows_parsed = rows_parsed
+                    job.rows_inserted += len(batch)
+                    collection.record_count = job.rows_inserted
+                    await self._renew_claim(db, job.id)
+                    await db.commit()
+                    progress.rows_inserted = job.rows_inserted
+
+                    # Pick up a cancel requested through another process; read
+                    # through the reader pool so the writer stays free while parsing
+                    async with ReadSessionLocal() as read_db:
+                        cancel_requested = await read_db.scalar(
+                            select(ImportJob.cancel_requested).where(ImportJob.id == job.id)
+                        )
+                    progress.cancel_requested = progress.cancel_requested or bool(cancel_requested)
+            finally:
+                # Close the reader while the file is still open
+                await batches.aclose()
+
+        if job.rows_inserted == 0:
+            raise HTTPException(
+                status_code=400,
+                detail="No valid data found in file"
+            )
+
+        _log_import_activity(db, job.user_id, collection, job.rows_inserted)
+        await self._renew_claim(db, job.id)
+        job.status = "completed"
+        job.finished_at = datetime.utcnow()
+        await db.commit()
+        await activity_writer.publish(db)
+
+    async def _get_or_create_collection(
+        self,
+        db: AsyncSession,
+        job: ImportJob,
+        detected_schema: Dict[str, Any]
+    ) -> Collection:
+        """
+        Load the collection of a resumed job, or create it for a new one.
+        """
+        if job.collection_id is not None:
+            collection = await db.get(Collection, job.collection_id)
+            # End the read so the writer connection is free while parsing
+            await db.commit()
+            if collection is not None:
+                return collection
+
+        # Create collection - database will set created_at and updated_at
+        collection = Collection(
+            user_id=job.user_id,
+            name=job.folder_name,
+            description=job.description or "",
+            schema=job.schema or detected_schema
+        )
+        db.add(collection)
+        await db.flush()
+
+        job.collection_id = collection.id
+        job.rows_parsed = 0
+        job.rows_inserted = 0
+        await self._renew_claim(db, job.id)
+        await db.commit()
+        return collection
+
+    async def _abandon(
+        self,
+        db: AsyncSession,
+        job_id: str,
+        status: str,
+        error: Optional[str] = None
+    ) -> bool:
+        """
+        Finish a job that did not complete and delete its partial collection.
+
+        Returns:
+            False if another process has taken the job over (nothing is changed)
+        """
+        job = await db.get(ImportJob, job_id, populate_existing=True)
+        if job.status != "running" or job.claimed_by != process_id():
+            await db.rollback()
+            logger.warning(f"Import job {job_id} was taken over by another process")
+            return False
+
+        if job.collection_id is not None:
+            await db.execute(delete(Record).where(Record.collection_id == job.collection_id))
+            await db.execute(delete(Collection).where(Collection.id == job.collection_id))
+
+        job.status = status
+        job.error = error
+        job.collection_id = None
+        job.rows_inserted = 0
+        job.finished_at = datetime.utcnow()
+        await db.commit()
+        logger.info(f"Import job {job_id} {status}")
+        return True
+
+
+def job_snapshot(job: ImportJob, progress: Optional[ImportProgress]) -> Dict[str, Any]:
+    """
+    Combine a job row with its live progress (if running in this process).
+    """
+    snapshot = {
+        "id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "folder_name": job.folder_name,
+        "collection_id": job.collection_id,
+        "total_rows_estimate": job.total_rows_estimate,
+        "rows_parsed": job.rows_parsed,
+        "rows_inserted": job.rows_inserted,
+        "rows_per_second": None,
+        "eta_seconds": None,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+    if progress is not None and progress.started_at is not None and job.status == "running":
+        snapshot.update(
+            total_rows_estimate=progress.total_rows,
+            rows_parsed=progress.rows_parsed,
+            rows_inserted=progress.rows_inserted,
+            rows_per_second=progress.rows_per_second(),
+            eta_seconds=progress.eta_seconds(),
+        )
+
+    return snapshot
+
+
+# Global import job runner
+import_job_runner = ImportJobRunner(workers=settings.IMPORT_JOB_WORKERS)
@@ -0,0 +1,341 @@
+"""
+Export of a collection's records as CSV, NDJSON, Excel or Parquet.
+
+Records are read through a server-side cursor in EXPORT_BATCH_SIZE batches
+and written out batch by batch, so memory use does not grow with the size of
+the collection. CSV, NDJSON and Parquet bytes are sent as each batch is
+written. Excel workbooks can only be zipped up once complete: the sheet is
+built in openpyxl's write-only mode (rows go to a temporary file, not
+memory) and the finished file is streamed from disk.
+
+Columns follow the collection schema: field order, with field labels as
+headers, so an exported file imports back into the same field names. Data
+keys outside the schema (or every key, for collections without a schema)
+follow in order of first appearance.
+
+Record data is untrusted: text that a spreadsheet would run as a formula is
+written as plain text (Excel) or prefixed with a quote (CSV).
+"""
+import csv
+import io
+import json
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import quote
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from fastapi import HTTPException, status
+from sqlalchemy import Text, cast, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.models.collection import Collection
+from app.models.record import Record
+
+
+# Format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Data rows in one Excel worksheet (the sheet limit minus the header row)
+XLSX_MAX_ROWS = 1048575
+
+# Bytes read per chunk when streaming a finished Excel file
+_FILE_CHUNK_SIZE = 64 * 1024
+
+_FILENAME_PATTERN = re.compile(r"[^\w.-]+", re.ASCII)
+
+# Leading characters that make spreadsheet applications evaluate CSV text
+_CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# Signed numbers (number fields entered in forms are stored as strings) are
+# read as numbers, not formulas, and must round-trip unchanged
+_CSV_NUMBER_PATTERN = re.compile(r"[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?")
+
+
+@dataclass
+class ExportColumn:
+    """One exported column: data key, header and schema type."""
+    name: str
+    label: str
+    type: str = "text"
+
+
+async def _data_keys(db: AsyncSession, collection_id: str) -> List[str]:
+    """Distinct keys of the collection's live record data, by first appearance."""
+    if db.get_bind().dialect.name == "postgresql":
+        query = text(
+            "SELECT keys.key FROM records, "
+            "json_object_keys(records.data) WITH ORDINALITY AS keys(key, position) "
+            "WHERE records.collection_id = :collection_id AND NOT records.is_deleted "
+            "GROUP BY keys.key ORDER BY min(records.created_at), min(keys.position)"
+        )
+    else:
+        query = text(
+            "SELECT json_each.key FROM records, json_each(records.data) "
+            "WHERE records.collection_id = :collection_id AND records.is_deleted = 0 "
+            "GROUP BY json_each.key ORDER BY min(records.rowid), min(json_each.id)"
+        )
+    result = await db.execute(query, {"collection_id": collection_id})
+    return [key for key, in result.all()]
+
+
+async def export_columns(db: AsyncSession, collection: Collection) -> List[ExportColumn]:
+    """
+    Columns of a tabular export: schema fields first, then other data keys.
+
+    Args:
+        db: Database session
+        collection: Collection being exported
+
+    Returns:
+        Columns in export order
+    """
+    columns = [
+        ExportColumn(
+            name=field["name"],
+            label=field.get("label") or field["name"],
+            type=field.get("type") or "text"
+        )
+        for field in (collection.schema or {}).get("fields") or []
+        if isinstance(field, dict) and field.get("name")
+    ]
+    known = {column.name for column in columns}
+    columns.extend(
+        ExportColumn(name=key, label=key)
+        for key in await _data_keys(db, collection.id)
+        if key not in known
+    )
+    return columns
+
+
+async def count_live_records(db: AsyncSession, collection_id: str) -> int:
+    """Number of records an export of the collection contains."""
+    result = await db.execute(
+        select(func.count()).select_from(Record).where(
+            Record.collection_id == collection_id,
+            Record.is_deleted == False
+        )
+    )
+    return result.scalar_one()
+
+
+def require_parquet_support() -> None:
+    """
+    Raises:
+        HTTPException: 501 if pyarrow (an optional dependency) is not installed
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export is not available on this server"
+        )
+
+
+def export_filename(collection: Collection, export_format: str) -> str:
+    """Content-Disposition value naming the file after the collection."""
+    extension = EXPORT_FORMATS[export_format][1]
+    fallback = _FILENAME_PATTERN.sub("_", collection.name).strip("._") or "export"
+    return (
+        f'attachment; filename="{fallback}.{extension}"; '
+        f"filename*=UTF-8''{quote(collection.name, safe='')}.{extension}"
+    )
+
+
+async def _record_batches(collection_id: str, raw: bool = False) -> AsyncIterator[List[Any]]:
+    """
+    Data of the collection's live records, oldest first, in batches read
+    through a server-side cursor. With raw, the stored JSON text is returned
+    as-is instead of parsed.
+    """
+    # Runs after the request-scoped session is closed, so it has its own
+    async with ReadSessionLocal() as db:
+        result = await db.stream_scalars(
+            select(cast(Record.data, Text) if raw else Record.data)
+            .where(Record.collection_id == collection_id, Record.is_deleted == False)
+            .order_by(Record.created_at, Record.id)
+            .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        async for batch in result.partitions():
+            yield batch
+
+
+def _cell(value: Any) -> Any:
+    """A data value as a spreadsheet cell: scalars as-is, objects and lists as JSON."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    value = _cell(value)
+    if (
+        isinstance(value, str)
+        and value.startswith(_CSV_FORMULA_PREFIXES)
+        and not _CSV_NUMBER_PATTERN.fullmatch(value)
+    ):
+        # A leading quote keeps spreadsheets from evaluating the text
+        return "'" + value
+    return value
+
+
+async def _csv_chunks(collection_id: str, columns: List[ExportColumn]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([_csv_cell(column.label) for column in columns])
+    yield buffer.getvalue().encode()
+
+    async for batch in _record_batches(collection_id):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [_csv_cell(data.get(column.name)) for column in columns]
+            for data in batch
+        )
+        yield buffer.getvalue().encode()
+
+
+async def _ndjson_chunks(collection_id: str) -> AsyncIterator[bytes]:
+    # Stored JSON is written out without a parse and re-encode
+    async for batch in _record_batches(collection_id, raw=True):
+        yield ("\n".join(batch) + "\n").encode()
+
+
+async def _xlsx_chunks(
+    collection_id: str,
+    columns: List[ExportColumn],
+    title: str
+) -> AsyncIterator[bytes]:
+    workbook = openpyxl.Workbook(write_only=True)
+    # Sheet titles are limited to 31 characters and a few forbidden ones
+    sheet = workbook.create_sheet(re.sub(r"[\[\]:*?/\\]", " ", title)[:31] or "Records")
+
+    def xlsx_cell(value: Any) -> Any:
+        value = _cell(value)
+        if isinstance(value, str) and value.startswith("="):
+            # openpyxl saves text starting with = as a formula; keep it a string
+            cell = WriteOnlyCell(sheet, value=value)
+            cell.data_type = "s"
+            return cell
+        return value
+
+    sheet.append([xlsx_cell(column.label) for column in columns])
+
+    def append_rows(batch: List[Dict[str, Any]]) -> None:
+        for data in batch:
+            sheet.append([xlsx_cell(data.get(column.name)) for column in columns])
+
+    async for batch in _record_batches(collection_id):
+        await run_in_threadpool(append_rows, batch)
+
+    with tempfile.TemporaryFile() as output:
+        await run_in_threadpool(workbook.save, output)
+        output.seek(0)
+        while chunk := await run_in_threadpool(output.read, _FILE_CHUNK_SIZE):
+            yield chunk
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting written bytes until they are drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def _parquet_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+async def _parquet_chunks(collection_id: str, columns: List[ExportColumn]) -> AsyncIterator[bytes]:
+    """
+    One row group per batch. Number fields are float64 columns (values that
+    are not numbers become null); every other column holds strings.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (column.label, pa.float64() if column.type == "number" else pa.string())
+        for column in columns
+    ])
+    converters = [_parquet_number if column.type == "number" else _parquet_text for column in columns]
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def write_batch(batch: List[Dict[str, Any]]) -> bytes:
+        arrays = [
+            pa.array([convert(data.get(column.name)) for data in batch], type=field.type)
+            for column, convert, field in zip(columns, converters, schema)
+        ]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        return sink.drain()
+
+    try:
+        async for batch in _record_batches(collection_id):
+            yield await run_in_threadpool(write_batch, batch)
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_stream(
+    collection: Collection,
+    export_format: str,
+    columns: List[ExportColumn]
+) -> AsyncIterator[bytes]:
+    """
+    Encoded chunks of a collection export.
+
+    Args:
+        collection: Collection being exported
+        export_format: Key of EXPORT_FORMATS
+        columns: Columns from export_columns (unused for NDJSON)
+
+    Returns:
+        Async iterator of file chunks for a StreamingResponse
+    """
+    if export_format == "csv":
+        return _csv_chunks(collection.id, columns)
+    if export_format == "xlsx":
+        return _xlsx_chunks(collection.id, columns, collection.name)
+    if export_format == "parquet":
+        return _parquet_chunks(collection.id, columns)
+    return _ndjson_chunks(collection.id)
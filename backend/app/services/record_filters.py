@@ -0,0 +1,239 @@
+"""
+Server-side filters over record data.
+
+A filter is a JSON object keyed by data field name. Each value is either a
+bare value (equality) or an object of operators, all of which must match:
+
+    {"status": "open",
+     "price": {"gte": 10, "lt": 100},
+     "city": {"in": ["Paris", "Lyon"]},
+     "name": {"contains": "acme"},
+     "due": {"is_null": true}}
+
+Fields and values are checked against the collection's schema field types
+(number, date, text-like). Conditions compile to json_extract on SQLite and
+to ->> on PostgreSQL, so only matching rows leave the database. The field
+expressions are the ones app.services.record_indexes builds indexes on.
+
+SQLite JSON paths cannot name a key containing a double quote, so such
+fields are rejected (on every database, so the API behaves the same).
+"""
+import json
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, Numeric, and_, case, cast, func, literal
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.record import Record
+
+
+RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+OPERATORS = ("eq", "in", "contains", "is_null") + RANGE_OPERATORS
+
+# Values allowed in one "in" list
+MAX_IN_VALUES = 100
+
+# Text values that count as numbers (number fields entered in forms are
+# stored as strings): JSON number syntax with surrounding spaces, the same
+# rule SQLite applies with json_valid. No backslashes, so it renders the same
+# inline.
+_PG_NUMBER_PATTERN = "^ *-?(0|[1-9][0-9]*)([.][0-9]+)?([eE][-+]?[0-9]+)? *$"
+
+_JSON_NUMBER_TYPES = ("integer", "real")
+
+
+def _bad_filter(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid filter: {detail}")
+
+
+def parse_record_filter(raw: str) -> Dict[str, Any]:
+    """
+    Parse the JSON `filter` query parameter.
+
+    Raises:
+        HTTPException: 400 if it is not a JSON object
+    """
+    try:
+        spec = json.loads(raw)
+    except ValueError:
+        raise _bad_filter("not valid JSON")
+    if not isinstance(spec, dict):
+        raise _bad_filter("expected a JSON object of field conditions")
+    return spec
+
+
+def is_addressable_field(field: str) -> bool:
+    """Whether a data field can be named in a JSON path (see json_field_text)."""
+    return '"' not in field
+
+
+def schema_field_types(schema: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Map field names to types from a collection schema ({"fields": [...]})."""
+    fields = (schema or {}).get("fields") or []
+    return {
+        field["name"]: field.get("type") or "text"
+        for field in fields
+        if isinstance(field, dict) and field.get("name")
+    }
+
+
+def json_field_text(field: str, dialect: str) -> ColumnElement:
+    """
+    Text value of a top-level data field (NULL when missing or JSON null).
+    The path is rendered inline so the expression can match an index on it.
+
+    SQLite matches a quoted path label against the key as written in the
+    stored JSON, escapes included, and ends the label at the next double
+    quote. Data is stored by json.dumps, so the label is the key encoded the
+    same way; keys containing a double quote cannot be named at all (check
+    is_addressable_field first).
+    """
+    if dialect == "postgresql":
+        return Record.data.op("->>")(literal(field, literal_execute=True))
+    return func.json_extract(Record.data, _sqlite_path(field))
+
+
+def _sqlite_path(field: str) -> ColumnElement:
+    return literal("$." + json.dumps(field), literal_execute=True)
+
+
+def json_field_number(field: str, dialect: str) -> ColumnElement:
+    """
+    Numeric value of a data field; numbers stored as numeric strings count.
+    Anything else (non-numeric text such as "n/a", booleans) is NULL, so it
+    never matches a comparison - rather than a cast error on PostgreSQL or
+    0.0 on SQLite.
+    """
+    value = json_field_text(field, dialect)
+    if dialect == "postgresql":
+        pattern = literal(_PG_NUMBER_PATTERN, literal_execute=True)
+        return case((value.op("~")(pattern), cast(value, Numeric)))
+
+    # json_type of the text is only asked once json_valid holds: it raises
+    # on malformed JSON, and AND does not guarantee evaluation order
+    path = _sqlite_path(field)
+    value_type = case((func.json_valid(value) == 1, func.json_type(value)))
+    return case((
+        and_(
+            func.json_type(Record.data, path).in_(_JSON_NUMBER_TYPES + ("text",)),
+            value_type.in_(_JSON_NUMBER_TYPES)
+        ),
+        cast(value, Float)
+    ))
+
+
+def _field_kind(field_type: Optional[str], value: Any) -> str:
+    if field_type is None:
+        # No schema: go by the value
+        return "number" if _is_number(value) else "text"
+    if field_type in ("number", "date"):
+        return field_type
+    return "text"
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_value(field: str, kind: str, value: Any) -> Any:
+    if kind == "number":
+        if not _is_number(value):
+            raise _bad_filter(f"'{field}' is a number field")
+        return value
+    if not isinstance(value, str):
+        raise _bad_filter(f"'{field}' expects a string value")
+    if kind == "date":
+        try:
+            date.fromisoformat(value)
+        except ValueError:
+            raise _bad_filter(f"'{field}' expects dates as YYYY-MM-DD")
+    return value
+
+
+def _field_conditions(
+    field: str,
+    field_type: Optional[str],
+    condition: Any,
+    dialect: str
+) -> List[ColumnElement]:
+    operators = condition if isinstance(condition, dict) else {"eq": condition}
+    if not operators:
+        raise _bad_filter(f"no operator for '{field}'")
+
+    # Kind comes from the schema, or from the first comparable value without one
+    sample = next((v for op, v in operators.items() if op not in ("in", "is_null")), None)
+    if sample is None and isinstance(operators.get("in"), list) and operators["in"]:
+        sample = operators["in"][0]
+    kind = _field_kind(field_type, sample)
+
+    text_value = json_field_text(field, dialect)
+    value_expr = json_field_number(field, dialect) if kind == "number" else text_value
+
+    conditions: List[ColumnElement] = []
+    for op, value in operators.items():
+        if op not in OPERATORS:
+            raise _bad_filter(f"unknown operator '{op}' (use {', '.join(OPERATORS)})")
+
+        if op == "is_null":
+            if not isinstance(value, bool):
+                raise _bad_filter("is_null expects true or false")
+            conditions.append(text_value.is_(None) if value else text_value.isnot(None))
+        elif op == "contains":
+            if kind != "text":
+                raise _bad_filter(f"contains only applies to text fields, '{field}' is {kind}")
+            conditions.append(text_value.icontains(_check_value(field, kind, value), autoescape=True))
+        elif op in RANGE_OPERATORS:
+            if kind == "text":
+                raise _bad_filter(f"{op} only applies to number and date fields, '{field}' is text")
+            value = _check_value(field, kind, value)
+            conditions.append({
+                "gt": value_expr > value,
+                "gte": value_expr >= value,
+                "lt": value_expr < value,
+                "lte": value_expr <= value,
+            }[op])
+        else:
+            values = value if op == "in" else [value]
+            if op == "in" and (not isinstance(values, list) or not 0 < len(values) <= MAX_IN_VALUES):
+                raise _bad_filter(f"in expects a list of 1 to {MAX_IN_VALUES} values")
+            values = [_check_value(field, kind, item) for item in values]
+
+            if len(values) == 1:
+                conditions.append(value_expr == values[0])
+            else:
+                conditions.append(value_expr.in_(values))
+
+    return conditions
+
+
+def build_record_filter(
+    spec: Dict[str, Any],
+    schema: Optional[Dict[str, Any]],
+    dialect: str
+) -> List[ColumnElement]:
+    """
+    Compile a filter into WHERE conditions on Record.
+
+    Args:
+        spec: Parsed filter object (see module docstring)
+        schema: Collection schema; with fields defined, only those fields can be filtered
+        dialect: Database dialect name ("sqlite" or "postgresql")
+
+    Returns:
+        Conditions to AND together
+
+    Raises:
+        HTTPException: 400 for unknown or unaddressable fields, unknown
+                       operators and mistyped values
+    """
+    field_types = schema_field_types(schema)
+    conditions: List[ColumnElement] = []
+    for field, condition in spec.items():
+        if field_types and field not in field_types:
+            raise _bad_filter(f"unknown field '{field}'")
+        if not is_addressable_field(field):
+            raise _bad_filter(f"field names containing '\"' cannot be filtered ('{field}')")
+        conditions.extend(_field_conditions(field, field_types.get(field), condition, dialect))
+    return conditions
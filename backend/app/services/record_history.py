@@ -0,0 +1,284 @@
+"""
+Record version history stored as compact activity log diffs.
+
+Every data update bumps Record.version and logs, instead of the full old and
+new data, an RFC 6902 JSON Patch that turns the new data back into the
+previous version ("revert"). Every RECORD_HISTORY_SNAPSHOT_INTERVAL versions
+the full previous data is logged instead ("previous"), which bounds how many
+patches a reconstruction applies. The current row - or, for a hard-deleted
+record, the data logged with the deletion - is the starting point:
+
+    version k update:   {"version": k, "revert": [patch k -> k-1]}
+                    or  {"version": k, "previous": <data of k-1>}
+
+Entries past ACTIVITY_RETENTION_DAYS are moved to the activity archive;
+reconstruction reads them from there when the database ones do not suffice.
+"""
+import copy
+import sys
+from typing import Any, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.activity_log import ActivityLog
+from app.models.record import Record
+from app.services.activity_archive import activity_archive
+
+
+class HistoryUnavailable(Exception):
+    """A record version cannot be reconstructed from the logged history."""
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(source: Any, target: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Build an RFC 6902 JSON Patch turning `source` into `target`.
+    Objects are diffed key by key; arrays and scalars are replaced whole.
+
+    Returns:
+        List of add / remove / replace operations (empty if equal)
+    """
+    if isinstance(source, dict) and isinstance(target, dict):
+        ops: List[Dict[str, Any]] = []
+        for key in source:
+            if key not in target:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in target.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in source:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(make_patch(source[key], value, child))
+        return ops
+
+    if source == target and type(source) is type(target):
+        return []
+    return [{"op": "replace", "path": path, "value": target}]
+
+
+def apply_patch(document: Any, patch: List[Dict[str, Any]]) -> Any:
+    """
+    Apply a JSON Patch of add / remove / replace operations on object keys
+    (as produced by make_patch) to a copy of `document`.
+
+    Raises:
+        ValueError: Unsupported operation or a path that does not resolve
+    """
+    document = copy.deepcopy(document)
+    for operation in patch:
+        op, path = operation["op"], operation["path"]
+        if path == "":
+            if op != "replace":
+                raise ValueError(f"Unsupported root operation: {op}")
+            document = copy.deepcopy(operation["value"])
+            continue
+
+        *parents, last = [_unescape(token) for token in path.split("/")[1:]]
+        parent = document
+        for token in parents:
+            if not isinstance(parent, dict) or token not in parent:
+                raise ValueError(f"Path does not exist: {path}")
+            parent = parent[token]
+        if not isinstance(parent, dict):
+            raise ValueError(f"Path does not exist: {path}")
+
+        if op in ("add", "replace"):
+            parent[last] = copy.deepcopy(operation["value"])
+        elif op == "remove":
+            parent.pop(last, None)
+        else:
+            raise ValueError(f"Unsupported patch operation: {op}")
+    return document
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Apply an RFC 7396 JSON Merge Patch: null removes a key, objects merge
+    key by key, anything else replaces the target.
+
+    Returns:
+        The patched value (`target` is not modified)
+    """
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def update_changes(old_data: Dict[str, Any], new_data: Dict[str, Any], version: int) -> Dict[str, Any]:
+    """
+    Build the activity log `changes` for a data update.
+
+    Args:
+        old_data: Data before the update (version - 1)
+        new_data: Data after the update
+        version: Record version after the update
+
+    Returns:
+        {"version", "revert"} or, on snapshot versions, {"version", "previous"}
+    """
+    if version % settings.RECORD_HISTORY_SNAPSHOT_INTERVAL == 0:
+        return {"version": version, "previous": old_data}
+    return {"version": version, "revert": make_patch(new_data, old_data)}
+
+
+async def _archived_changes(user_id: str, record_id: str, action: str) -> List[Dict[str, Any]]:
+    """`changes` of a record's archived activity entries with an action, newest first."""
+    if not activity_archive.has_user(user_id):
+        return []
+    rows = await run_in_threadpool(
+        activity_archive.read,
+        user_id,
+        sys.maxsize,
+        entity_type="record",
+        entity_id=record_id,
+        action=action
+    )
+    return [row["changes"] for row in rows if isinstance(row.get("changes"), dict)]
+
+
+def _replay(
+    entries: Dict[int, Dict[str, Any]],
+    version: int,
+    current_version: int,
+    current_data: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Walk update entries (by version) forward from `version` to the nearest
+    snapshot or the current version, then apply the reverts back down.
+
+    Raises:
+        HistoryUnavailable: An entry on the way is missing
+    """
+    reverts: List[List[Dict[str, Any]]] = []
+    for expected in range(version + 1, current_version + 1):
+        changes = entries.get(expected)
+        if changes is None:
+            raise HistoryUnavailable("Record history is incomplete")
+        if "previous" in changes:
+            data = changes["previous"]
+            break
+        reverts.append(changes["revert"])
+    else:
+        data = current_data
+
+    # Patches go from each version back to the one before it
+    for patch in reversed(reverts):
+        data = apply_patch(data, patch)
+    return data
+
+
+async def reconstruct_record_version(
+    db: AsyncSession,
+    user_id: str,
+    collection_id: str,
+    record_id: str,
+    version: int
+) -> Dict[str, Any]:
+    """
+    Rebuild a record's data as of a version.
+
+    Reads at most RECORD_HISTORY_SNAPSHOT_INTERVAL update entries: walking
+    forward from the requested version to the nearest snapshot, or to the
+    current version when no snapshot lies in between. Entries no longer in
+    the database are looked up in the activity archive.
+
+    Args:
+        db: Database session
+        user_id: Owner (history is only read from their activity log)
+        collection_id: Collection the record belongs (or belonged) to
+        record_id: Record id, which may since have been hard-deleted
+        version: Version to rebuild
+
+    Returns:
+        Record data at that version
+
+    Raises:
+        HistoryUnavailable: Unknown record or version, or missing log entries
+    """
+    # Scoped like get_collection_record: a record of another collection (or
+    # another user) is unknown here
+    result = await db.execute(
+        select(Record).where(
+            and_(
+                Record.id == record_id,
+                Record.collection_id == collection_id
+            )
+        )
+    )
+    record = result.scalar_one_or_none()
+    if record is not None:
+        current_version, current_data = record.version, record.data
+    else:
+        # Hard-deleted: the deletion entry carries the final data
+        result = await db.execute(
+            select(ActivityLog.changes).where(
+                and_(
+                    ActivityLog.user_id == user_id,
+                    ActivityLog.entity_type == "record",
+                    ActivityLog.entity_id == record_id,
+                    ActivityLog.action == "deleted",
+                    ActivityLog.changes["hard_delete"].as_boolean() == True,
+                    ActivityLog.changes["collection_id"].as_string() == collection_id
+                )
+            ).limit(1)
+        )
+        changes = result.scalar_one_or_none()
+        if changes is None:
+            changes = next(
+                (
+                    archived for archived in await _archived_changes(user_id, record_id, "deleted")
+                    if archived.get("hard_delete") is True and archived.get("collection_id") == collection_id
+                ),
+                None
+            )
+        if not changes or "data" not in changes or "version" not in changes:
+            raise HistoryUnavailable("Record not found")
+        current_version, current_data = changes["version"], changes["data"]
+
+    if version < 1 or version > current_version:
+        raise HistoryUnavailable("Version not found")
+    if version == current_version:
+        return current_data
+
+    # Every run of RECORD_HISTORY_SNAPSHOT_INTERVAL versions holds a snapshot
+    window = range(version + 1, version + settings.RECORD_HISTORY_SNAPSHOT_INTERVAL + 1)
+    entry_version = ActivityLog.changes["version"].as_integer()
+    result = await db.execute(
+        select(ActivityLog.changes)
+        .where(
+            and_(
+                ActivityLog.user_id == user_id,
+                ActivityLog.entity_type == "record",
+                ActivityLog.entity_id == record_id,
+                ActivityLog.action == "updated",
+                entry_version >= window.start,
+                entry_version < window.stop
+            )
+        )
+    )
+    entries = {changes.get("version"): changes for changes in result.scalars()}
+
+    try:
+        return _replay(entries, version, current_version, current_data)
+    except HistoryUnavailable:
+        # The older entries may have been moved to the archive
+        for changes in await _archived_changes(user_id, record_id, "updated"):
+            if changes.get("version") in window:
+                entries.setdefault(changes["version"], changes)
+        return _replay(entries, version, current_version, current_data)
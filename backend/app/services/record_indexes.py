@@ -0,0 +1,451 @@
+"""
+Expression indexes on record data fields.
+
+Schema fields marked "indexed": true get a partial index on records for
+their collection, over the same expression the record filters compare
+(see app.services.record_filters):
+
+    CREATE INDEX ix_records_f_<hash> ON records ((CASE WHEN ... THEN
+        CAST(json_extract(data, '$."price"') AS FLOAT) END)) WHERE collection_id = '<collection id>'
+
+A record_indexes row per field tracks the build. Saving a schema only
+records what should exist; RecordIndexBuilder creates and drops the indexes
+in the background. On PostgreSQL that is CREATE/DROP INDEX CONCURRENTLY, so
+writes continue during the build. SQLite has no online index builds: the
+statement runs through the write queue, so it waits its turn instead of
+failing on the write lock, and blocks other writes while it runs.
+"""
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, literal, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, engine
+from app.core.process_identity import process_id
+from app.core.write_queue import write_queue
+from app.models.collection import Collection
+from app.models.record import Record
+from app.models.record_index import RecordIndex
+from app.services.record_filters import is_addressable_field, json_field_number, json_field_text
+
+
+logger = logging.getLogger(__name__)
+
+# How often the builder looks for work queued by other processes
+_POLL_SECONDS = 30
+
+# Longest wait before retrying a failed drop (the delay doubles per attempt)
+_MAX_RETRY_SECONDS = 3600
+
+# The index filtered queries compete with; the planner needs its statistics too
+_KEYSET_INDEX = "ix_records_collection_keyset"
+
+
+def indexed_fields(schema: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Map schema fields marked "indexed" to how they are compared.
+
+    Returns:
+        Field name -> 'number', 'date' or 'text'
+    """
+    fields = (schema or {}).get("fields") or []
+    kinds: Dict[str, str] = {}
+    for field in fields:
+        if isinstance(field, dict) and field.get("name") and field.get("indexed"):
+            field_type = field.get("type")
+            kinds[field["name"]] = field_type if field_type in ("number", "date") else "text"
+    return kinds
+
+
+def record_index_name(collection_id: str, field: str) -> str:
+    """Stable, identifier-safe index name for a collection field."""
+    digest = hashlib.sha1(f"{collection_id}/{field}".encode()).hexdigest()[:16]
+    return f"ix_records_f_{digest}"
+
+
+def _index_ddl(dialect, index: RecordIndex) -> str:
+    """CREATE INDEX statement for a record index, rendered for a dialect."""
+    if index.field_type == "number":
+        expression = json_field_number(index.field, dialect.name)
+    else:
+        expression = json_field_text(index.field, dialect.name)
+    kwargs = {"literal_binds": True, "include_table": False}
+    expression_sql = expression.compile(dialect=dialect, compile_kwargs=kwargs)
+    collection_sql = literal(index.collection_id).compile(dialect=dialect, compile_kwargs=kwargs)
+
+    concurrently = "CONCURRENTLY " if dialect.name == "postgresql" else ""
+    return (
+        f"CREATE INDEX {concurrently}{index.index_name} ON {Record.__tablename__} "
+        f"(({expression_sql})) WHERE collection_id = {collection_sql}"
+    )
+
+
+async def sync_record_indexes(db: AsyncSession, collection: Collection) -> bool:
+    """
+    Bring a collection's record_indexes rows in line with its schema, as part
+    of the caller's transaction. New and changed fields become 'pending',
+    fields no longer marked indexed become 'dropping'.
+
+    Args:
+        db: Session of the transaction saving the schema
+        collection: Collection with its new schema (flushed, so it has an id)
+
+    Returns:
+        True if the builder has work to do (call record_index_builder.notify after commit)
+
+    Raises:
+        HTTPException: 400 if more than RECORD_INDEX_MAX_FIELDS fields are
+                       indexed, or an indexed field name contains a double quote
+    """
+    wanted = indexed_fields(collection.schema)
+    if len(wanted) > settings.RECORD_INDEX_MAX_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.RECORD_INDEX_MAX_FIELDS} fields can be indexed per collection"
+        )
+    for field in wanted:
+        if not is_addressable_field(field):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Field names containing '\"' cannot be indexed ('{field}')"
+            )
+
+    result = await db.execute(select(RecordIndex).where(RecordIndex.collection_id == collection.id))
+    existing = {index.field: index for index in result.scalars()}
+
+    changed = False
+    for field, field_type in wanted.items():
+        index = existing.get(field)
+        if index is None:
+            db.add(RecordIndex(
+                collection_id=collection.id,
+                field=field,
+                field_type=field_type,
+                index_name=record_index_name(collection.id, field),
+                status="pending"
+            ))
+            changed = True
+        elif index.field_type != field_type or index.status in ("dropping", "failed"):
+            # Rebuilt from scratch: the builder drops any existing index first
+            index.field_type = field_type
+            index.status = "pending"
+            index.error = None
+            index.attempts = 0
+            index.retry_at = None
+            changed = True
+
+    for field, index in existing.items():
+        if field not in wanted and index.status != "dropping":
+            index.status = "dropping"
+            index.attempts = 0
+            index.retry_at = None
+            changed = True
+
+    await db.flush()
+    return changed
+
+
+async def drop_collection_indexes(db: AsyncSession, collection_id: str) -> bool:
+    """
+    Mark all indexes of a collection for dropping and detach them from it,
+    in the transaction that hard-deletes the collection.
+
+    Returns:
+        True if the builder has work to do
+    """
+    result = await db.execute(
+        update(RecordIndex)
+        .where(RecordIndex.collection_id == collection_id)
+        .values(status="dropping", collection_id=None, attempts=0, retry_at=None)
+    )
+    return result.rowcount > 0
+
+
+async def list_record_indexes(db: AsyncSession, collection_id: str) -> List[RecordIndex]:
+    """Indexed fields of a collection with their build state."""
+    result = await db.execute(
+        select(RecordIndex)
+        .where(RecordIndex.collection_id == collection_id)
+        .order_by(RecordIndex.field)
+    )
+    return list(result.scalars())
+
+
+class RecordIndexBuilder:
+    """
+    Background task creating pending and dropping removed record indexes,
+    one at a time. An index is claimed with a conditional UPDATE
+    (pending -> building), so several processes never build the same one,
+    and its final state is only written if nobody changed it meanwhile - a
+    field re-marked during a build is simply built again.
+
+    As for import jobs, the claim records this process and a heartbeat that
+    is renewed during the build; only builds without a heartbeat for
+    WORKER_STALE_SECONDS (their process died) go back to pending, on start
+    and on every poll. On SQLite the build statement holds the write lock,
+    so no heartbeat is written while it runs: keep WORKER_STALE_SECONDS
+    above the longest build, or a slow build may be repeated by another
+    process once it finishes.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = _POLL_SECONDS,
+        heartbeat_interval: float = settings.WORKER_HEARTBEAT_SECONDS,
+        stale_after: float = settings.WORKER_STALE_SECONDS
+    ):
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self.built = 0
+        self.dropped = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        """Re-queue builds abandoned by a dead process and start the builder."""
+        await self.requeue_stale()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="record-index-builder")
+
+    async def stop(self) -> None:
+        """Stop after the index being built, if any (it is re-queued otherwise)."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    def notify(self) -> None:
+        """Wake the builder after committing index changes."""
+        self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return builder counters."""
+        return {
+            "running": self._task is not None,
+            "built": self.built,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    async def requeue_stale(self) -> int:
+        """
+        Put builds whose process stopped sending heartbeats back to pending.
+        Builds other live processes are running are left alone.
+
+        Returns:
+            Number of builds re-queued
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+
+        async def requeue(db: AsyncSession) -> int:
+            result = await db.execute(
+                update(RecordIndex)
+                .where(
+                    RecordIndex.status == "building",
+                    (RecordIndex.heartbeat_at.is_(None)) | (RecordIndex.heartbeat_at < cutoff)
+                )
+                .values(status="pending", claimed_by=None, heartbeat_at=None)
+            )
+            return result.rowcount
+
+        requeued = await write_queue.submit(requeue)
+        if requeued:
+            logger.warning(f"Re-queued {requeued} record index builds abandoned by a stopped process")
+        return requeued
+
+    async def process_pending(self) -> None:
+        """Build and drop indexes until none are waiting."""
+        while not self._stopping:
+            async with ReadSessionLocal() as db:
+                result = await db.execute(
+                    select(RecordIndex)
+                    .where(
+                        RecordIndex.status.in_(("pending", "dropping")),
+                        # Failed drops wait out their backoff
+                        (RecordIndex.retry_at.is_(None)) | (RecordIndex.retry_at <= datetime.utcnow())
+                    )
+                    .order_by(RecordIndex.updated_at, RecordIndex.id)
+                    .limit(1)
+                )
+                index = result.scalar_one_or_none()
+                if index is not None:
+                    db.expunge(index)
+            if index is None:
+                return
+
+            if index.status == "dropping":
+                await self._drop(index)
+            else:
+                await self._build(index)
+
+    async def _build(self, index: RecordIndex) -> None:
+        async def claim(db: AsyncSession) -> bool:
+            result = await db.execute(
+                update(RecordIndex)
+                .where(RecordIndex.id == index.id, RecordIndex.status == "pending")
+                .values(
+                    status="building",
+                    error=None,
+                    claimed_by=process_id(),
+                    heartbeat_at=datetime.utcnow()
+                )
+            )
+            return result.rowcount == 1
+
+        if not await write_queue.submit(claim):
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(index.id))
+        try:
+            # Drop first: the field type may have changed, or an earlier
+            # concurrent build may have left an invalid index behind
+            await self._execute_ddl(
+                f"DROP INDEX {self._concurrently()}IF EXISTS {index.index_name}",
+                _index_ddl(engine.dialect, index),
+                analyze=index.index_name
+            )
+        except Exception as e:
+            logger.exception(f"Building record index {index.index_name} failed")
+            self.failed += 1
+            await self._finish(index.id, "failed", f"Index build failed: {e}"[:500])
+            return
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        self.built += 1
+        await self._finish(index.id, "ready")
+        logger.info(f"Built record index {index.index_name} on {index.field} (collection {index.collection_id})")
+
+    async def _drop(self, index: RecordIndex) -> None:
+        try:
+            await self._execute_ddl(f"DROP INDEX {self._concurrently()}IF EXISTS {index.index_name}")
+        except Exception as e:
+            logger.exception(f"Dropping record index {index.index_name} failed")
+            self.failed += 1
+            await self._defer_drop(index, f"Index drop failed: {e}"[:500])
+            return
+
+        async def remove(db: AsyncSession) -> None:
+            await db.execute(
+                delete(RecordIndex).where(RecordIndex.id == index.id, RecordIndex.status == "dropping")
+            )
+
+        await write_queue.submit(remove)
+        self.dropped += 1
+
+    async def _defer_drop(self, index: RecordIndex, error: str) -> None:
+        """Record a failed drop and schedule the retry with exponential backoff."""
+        delay = min(self.poll_interval * 2 ** index.attempts, _MAX_RETRY_SECONDS)
+
+        async def defer(db: AsyncSession) -> None:
+            await db.execute(
+                update(RecordIndex)
+                .where(RecordIndex.id == index.id, RecordIndex.status == "dropping")
+                .values(
+                    attempts=RecordIndex.attempts + 1,
+                    error=error,
+                    retry_at=datetime.utcnow() + timedelta(seconds=delay)
+                )
+            )
+
+        await write_queue.submit(defer)
+
+    async def _heartbeat(self, index_id: str) -> None:
+        """Renew the heartbeat of a build claimed by this process until cancelled."""
+        async def renew(db: AsyncSession) -> None:
+            await db.execute(
+                update(RecordIndex)
+                .where(
+                    RecordIndex.id == index_id,
+                    RecordIndex.status == "building",
+                    RecordIndex.claimed_by == process_id()
+                )
+                .values(heartbeat_at=datetime.utcnow())
+            )
+
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await write_queue.submit(renew)
+            except Exception:
+                logger.exception("Record index heartbeat failed")
+
+    async def _finish(self, index_id: str, new_status: str, error: Optional[str] = None) -> None:
+        async def finish(db: AsyncSession) -> None:
+            # Only while this process still holds the claim
+            await db.execute(
+                update(RecordIndex)
+                .where(
+                    RecordIndex.id == index_id,
+                    RecordIndex.status == "building",
+                    RecordIndex.claimed_by == process_id()
+                )
+                .values(status=new_status, error=error, claimed_by=None, heartbeat_at=None)
+            )
+
+        await write_queue.submit(finish)
+
+    @staticmethod
+    def _concurrently() -> str:
+        return "CONCURRENTLY " if engine.dialect.name == "postgresql" else ""
+
+    async def _execute_ddl(self, *statements: str, analyze: Optional[str] = None) -> None:
+        """
+        Run index DDL. On SQLite, `analyze` names a new index to gather
+        statistics for.
+        """
+        if engine.dialect.name == "postgresql":
+            # CONCURRENTLY cannot run inside a transaction block
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                for statement in statements:
+                    await conn.execute(text(statement))
+            return
+
+        async def run(db: AsyncSession) -> None:
+            for statement in statements:
+                await db.execute(text(statement))
+            if analyze and engine.dialect.name == "sqlite":
+                # Without statistics for both the new index and the collection
+                # keyset index the planner prefers the keyset index. ANALYZE
+                # of the whole table would scan every index on records while
+                # holding the write lock, so only the new index is analyzed,
+                # plus the keyset index the first time (sampled statistics
+                # misjudge its per-collection row counts)
+                await db.execute(text(f"ANALYZE {analyze}"))
+                keyset_analyzed = await db.scalar(
+                    text("SELECT 1 FROM sqlite_stat1 WHERE idx = :idx"), {"idx": _KEYSET_INDEX}
+                )
+                if not keyset_analyzed:
+                    await db.execute(text(f"ANALYZE {_KEYSET_INDEX}"))
+
+        await write_queue.submit(run)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                await self.requeue_stale()
+                await self.process_pending()
+            except Exception:
+                logger.exception("Record index builder failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global record index builder
+record_index_builder = RecordIndexBuilder()
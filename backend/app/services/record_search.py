@@ -0,0 +1,348 @@
+"""
+Full-text search over record data (index described in app.models.record_search).
+
+Queries are reduced to words, all of which must match; a word ending in *
+matches as a prefix. Results are ranked by relevance (bm25 on SQLite,
+ts_rank_cd on PostgreSQL, both higher-is-better here) and each hit carries
+HTML snippets of the text fields that matched, with matches in <mark>.
+"""
+import asyncio
+import html
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, column, func, literal_column, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, engine
+from app.core.write_queue import write_queue
+from app.models.collection import Collection
+from app.models.record import Record
+from app.models.record_search import fts_id, fts_id_sql, owner_sql, search_body_sql
+
+
+# Words taken from one query
+MAX_SEARCH_TERMS = 16
+
+# Characters of context around the first match in a snippet
+_SNIPPET_CONTEXT = 60
+
+_TERM_PATTERN = re.compile(r"(\w+)(\*?)")
+
+_records_fts = table("records_fts", column("rowid"), column("collection_id"))
+
+logger = logging.getLogger(__name__)
+
+# How often the reindexer looks for work queued by other processes
+_POLL_SECONDS = 30
+
+
+SearchTerm = Tuple[str, bool]
+
+
+def parse_search_terms(query: str) -> List[SearchTerm]:
+    """
+    Split a search query into (word, is_prefix) terms.
+
+    Raises:
+        HTTPException: 400 if the query contains no words
+    """
+    terms = [(word, bool(star)) for word, star in _TERM_PATTERN.findall(query)][:MAX_SEARCH_TERMS]
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must contain at least one word"
+        )
+    return terms
+
+
+def search_text_fields(schema: Optional[Dict[str, Any]]) -> Optional[Set[str]]:
+    """
+    Fields covered by the search index: schema fields that are not number or
+    date fields, or None (every string value) without schema fields.
+    """
+    fields = [
+        field for field in (schema or {}).get("fields") or []
+        if isinstance(field, dict) and field.get("name")
+    ]
+    if not fields:
+        return None
+    return {field["name"] for field in fields if field.get("type") not in ("number", "date")}
+
+
+def fts_words(terms: List[SearchTerm]) -> str:
+    """FTS5 query requiring every term."""
+    return " AND ".join(f'"{word}"' + ("*" if prefix else "") for word, prefix in terms)
+
+
+def _fts_match(collection_id: str, terms: List[SearchTerm]) -> str:
+    # Scoping by collection inside MATCH keeps common words in other
+    # collections from being scanned
+    return f'collection_id:"{fts_id(collection_id)}" AND body:({fts_words(terms)})'
+
+
+def pg_tsquery(terms: List[SearchTerm]) -> str:
+    """PostgreSQL to_tsquery text requiring every term."""
+    return " & ".join(f"'{word}'" + (":*" if prefix else "") for word, prefix in terms)
+
+
+async def search_records(
+    db: AsyncSession,
+    collection: Collection,
+    terms: List[SearchTerm],
+    skip: int,
+    limit: int,
+    include_deleted: bool = False
+) -> List[Tuple[Record, float]]:
+    """
+    Run a ranked full-text search within a collection.
+
+    Args:
+        db: Database session
+        collection: Collection to search
+        terms: Terms from parse_search_terms
+        skip: Hits to skip
+        limit: Maximum hits
+        include_deleted: Include soft-deleted records
+
+    Returns:
+        (record, score) pairs, best first
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        vector = literal_column("records.search_vector")
+        tsquery = func.to_tsquery("simple", pg_tsquery(terms))
+        score = func.ts_rank_cd(vector, tsquery)
+        query = select(Record, score.label("score")).where(
+            Record.collection_id == collection.id,
+            vector.op("@@")(tsquery)
+        )
+    else:
+        score = -func.bm25(
+            literal_column("records_fts"), literal_column("0.0"), literal_column("0.0"), literal_column("1.0")
+        )
+        query = (
+            select(Record, score.label("score"))
+            .join(_records_fts, _records_fts.c.rowid == literal_column("records.rowid"))
+            .where(
+                Record.collection_id == collection.id,
+                literal_column("records_fts").op("MATCH")(_fts_match(collection.id, terms))
+            )
+        )
+
+    if not include_deleted:
+        query = query.where(Record.is_deleted == False)
+
+    query = query.order_by(score.desc(), Record.id).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return [(record, float(score)) for record, score in result.all()]
+
+
+def searchable_values(data: Dict[str, Any], schema: Optional[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """(field, value) pairs of a record's data that the search index covers."""
+    fields = search_text_fields(schema)
+    return [
+        (field, value) for field, value in data.items()
+        if isinstance(value, str) and (fields is None or field in fields)
+    ]
+
+
+def fold_text(value: str) -> str:
+    """Lower-case and strip diacritics character by character (positions are kept)."""
+    return "".join(unicodedata.normalize("NFD", char)[0] for char in value).lower()
+
+
+def _term_regex(terms: List[SearchTerm]) -> re.Pattern:
+    alternatives = [
+        re.escape(fold_text(word)) + (r"\w*" if prefix else r"(?!\w)")
+        for word, prefix in terms
+    ]
+    return re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + ")")
+
+
+def highlight_record(
+    data: Dict[str, Any],
+    schema: Optional[Dict[str, Any]],
+    terms: List[SearchTerm]
+) -> Dict[str, str]:
+    """
+    Build HTML-escaped snippets of the searchable fields containing a match.
+
+    Returns:
+        Field name -> snippet with matches wrapped in <mark>
+    """
+    pattern = _term_regex(terms)
+    highlights: Dict[str, str] = {}
+
+    for field, value in searchable_values(data, schema):
+        matches = list(pattern.finditer(fold_text(value)))
+        if not matches:
+            continue
+
+        start = max(matches[0].start() - _SNIPPET_CONTEXT, 0)
+        end = min(matches[0].end() + _SNIPPET_CONTEXT * 2, len(value))
+        parts = ["…" if start > 0 else ""]
+        position = start
+        for match in matches:
+            if match.start() < position or match.end() > end:
+                continue
+            parts.append(html.escape(value[position:match.start()]))
+            parts.append(f"<mark>{html.escape(value[match.start():match.end()])}</mark>")
+            position = match.end()
+        parts.append(html.escape(value[position:end]))
+        parts.append("…" if end < len(value) else "")
+        highlights[field] = "".join(parts)
+
+    return highlights
+
+
+def mark_search_stale(db: AsyncSession, collection: Collection) -> bool:
+    """
+    Queue a rebuild of a collection's search index rows, after its schema
+    changed which fields are text fields, as part of the caller's
+    transaction. Only needed on SQLite; the PostgreSQL index does not depend
+    on the schema.
+
+    Returns:
+        True if the reindexer has work to do (call search_reindexer.notify after commit)
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return False
+    # Restarts a rebuild already under way
+    collection.search_reindex_rowid = 0
+    return True
+
+
+class SearchReindexer:
+    """
+    Background task rebuilding the search index rows of collections marked
+    by mark_search_stale, SEARCH_REINDEX_BATCH_SIZE records at a time.
+
+    The records of a chunk are picked on a read session, and only their
+    index rows are replaced through the write queue, one operation per
+    chunk, so other writes are not held up for a whole collection. Progress
+    is the last records.rowid done, in collections.search_reindex_rowid
+    (NULL once the index is current). It is only advanced if nobody changed
+    it meanwhile: a schema change during the rebuild restarts it, and a
+    restarted process resumes it. Chunks are idempotent, so processes
+    reindexing the same collection at most repeat each other's work.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.SEARCH_REINDEX_BATCH_SIZE,
+        poll_interval: float = _POLL_SECONDS
+    ):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self.reindexed = 0
+        self.completed = 0
+
+    async def start(self) -> None:
+        """Start the reindexer (no-op except on SQLite)."""
+        if engine.dialect.name != "sqlite":
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="search-reindexer")
+
+    async def stop(self) -> None:
+        """Stop after the chunk being written, if any."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    def notify(self) -> None:
+        """Wake the reindexer after committing mark_search_stale."""
+        self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return reindexer counters."""
+        return {
+            "running": self._task is not None,
+            "reindexed_records": self.reindexed,
+            "completed_collections": self.completed,
+        }
+
+    async def process_pending(self) -> None:
+        """Reindex chunks until no collection is marked stale."""
+        while not self._stopping:
+            async with ReadSessionLocal() as db:
+                result = await db.execute(
+                    select(Collection.id, Collection.search_reindex_rowid)
+                    .where(Collection.search_reindex_rowid.is_not(None))
+                    .order_by(Collection.updated_at, Collection.id)
+                    .limit(1)
+                )
+                stale = result.first()
+                if stale is None:
+                    return
+                collection_id, after = stale
+                result = await db.execute(
+                    text(
+                        "SELECT rowid FROM records "
+                        "WHERE collection_id = :collection_id AND rowid > :after "
+                        "ORDER BY rowid LIMIT :limit"
+                    ),
+                    {"collection_id": collection_id, "after": after, "limit": self.batch_size}
+                )
+                rowids = list(result.scalars())
+
+            await self._reindex_chunk(collection_id, after, rowids)
+
+    async def _reindex_chunk(self, collection_id: str, after: int, rowids: List[int]) -> None:
+        async def reindex(db: AsyncSession) -> None:
+            if rowids:
+                scope = "WHERE records.rowid IN :rowids AND records.collection_id = :collection_id"
+                params = {"rowids": rowids, "collection_id": collection_id}
+                await db.execute(
+                    text(f"DELETE FROM records_fts WHERE rowid IN (SELECT records.rowid FROM records {scope})")
+                    .bindparams(bindparam("rowids", expanding=True)),
+                    params
+                )
+                await db.execute(
+                    text(
+                        "INSERT INTO records_fts (rowid, user_id, collection_id, body) "
+                        f"SELECT records.rowid, {owner_sql('records')}, {fts_id_sql('records.collection_id')}, "
+                        f"{search_body_sql('records')} FROM records {scope}"
+                    ).bindparams(bindparam("rowids", expanding=True)),
+                    params
+                )
+            # Done when a chunk comes back empty
+            await db.execute(
+                text(
+                    "UPDATE collections SET search_reindex_rowid = :position "
+                    "WHERE id = :collection_id AND search_reindex_rowid = :after"
+                ),
+                {"position": rowids[-1] if rowids else None, "collection_id": collection_id, "after": after}
+            )
+
+        await write_queue.submit(reindex)
+        self.reindexed += len(rowids)
+        if not rowids:
+            self.completed += 1
+            logger.info(f"Rebuilt the search index of collection {collection_id}")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                await self.process_pending()
+            except Exception:
+                logger.exception("Search reindexing failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global search reindexer
+search_reindexer = SearchReindexer()
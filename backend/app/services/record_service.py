@@ -0,0 +1,380 @@
+"""
+Record service for bulk and partial record writes.
+Uses Core INSERT / UPDATE / DELETE executemany instead of per-object ORM
+unit-of-work, and applies partial updates inside the database.
+"""
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import JSON, Text, bindparam, case, cast, delete, func, insert, literal, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.activity_writer import activity_writer
+from app.core.config import settings
+from app.models.record import Record
+from app.services.collection_service import adjust_record_count
+from app.services.record_history import merge_patch, update_changes
+
+
+async def bulk_insert_records(
+    db: AsyncSession,
+    collection_id: str,
+    records: Sequence[Dict[str, Any]],
+    batch_size: Optional[int] = None
+) -> List[str]:
+    """
+    Insert record data rows in batches with a single executemany per batch.
+    
+    Ids are generated up front, so rows skip the ORM identity map, default
+    callables and flush bookkeeping; timestamps still come from the database.
+    Runs inside the caller's transaction.
+    
+    Args:
+        db: Database session
+        collection_id: Collection the records belong to
+        records: Record data dictionaries
+        batch_size: Rows per executemany (defaults to IMPORT_INSERT_BATCH_SIZE)
+        
+    Returns:
+        Ids of the inserted records, in input order
+    """
+    batch_size = batch_size or settings.IMPORT_INSERT_BATCH_SIZE
+    statement = insert(Record.__table__)
+    ids: List[str] = []
+    
+    for start in range(0, len(records), batch_size):
+        params = [
+            {
+                "id": str(uuid.uuid4()),
+                "collection_id": collection_id,
+                "data": record_data,
+                "is_deleted": False,
+            }
+            for record_data in records[start:start + batch_size]
+        ]
+        await db.execute(statement, params)
+        ids.extend(row["id"] for row in params)
+    
+    return ids
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of one operation of a record batch."""
+    index: int
+    op: str
+    status: int  # HTTP status the operation would have had on its own
+    id: Optional[str] = None
+    version: Optional[int] = None
+    error: Optional[str] = None
+
+
+def _item_error(index: int, operation: Dict[str, Any], status: int, error: str) -> BatchItemResult:
+    return BatchItemResult(index=index, op=operation["op"], status=status, id=operation.get("id"), error=error)
+
+
+async def apply_record_batch(
+    db: AsyncSession,
+    user_id: str,
+    collection_id: str,
+    operations: Sequence[Dict[str, Any]]
+) -> List[BatchItemResult]:
+    """
+    Apply create / update / delete operations to a collection's records in
+    the caller's transaction.
+    
+    Operations run in order against the records as left by the ones before
+    them. An operation that cannot run (missing id or data, unknown record)
+    gets an error result and the rest still apply. Referenced records are
+    loaded in one query, and each kind of change is written with one
+    statement (executemany for updates), whatever the batch size.
+    
+    The batch is logged as one "batch_updated" collection entry listing the
+    affected record ids. Updates and hard deletes also log the per-record
+    entries that record version history is rebuilt from.
+    
+    Args:
+        db: Database session
+        user_id: Acting user (ownership of the collection already checked)
+        collection_id: Collection the records belong to
+        operations: Dicts with op ("create", "update" or "delete"), id,
+                    data and hard_delete
+        
+    Returns:
+        One result per operation, in input order
+    """
+    now = datetime.utcnow()
+    table = Record.__table__
+    
+    # Current state of every referenced record, locked for the update
+    states: Dict[str, Dict[str, Any]] = {}
+    referenced = {operation["id"] for operation in operations if operation.get("id")}
+    if referenced:
+        result = await db.execute(
+            select(table.c.id, table.c.data, table.c.version, table.c.is_deleted)
+            .where(table.c.id.in_(referenced), table.c.collection_id == collection_id)
+            .with_for_update()
+        )
+        states = {row.id: dict(row._mapping) for row in result}
+    
+    results: List[Optional[BatchItemResult]] = []
+    created: List[Dict[str, Any]] = []
+    created_indexes: List[int] = []
+    updated: Dict[str, Dict[str, Any]] = {}
+    soft_deleted: List[str] = []
+    hard_deleted: List[str] = []
+    live_removed = 0
+    
+    for index, operation in enumerate(operations):
+        op, record_id, data = operation["op"], operation.get("id"), operation.get("data")
+        
+        if op == "create":
+            if not data:
+                results.append(_item_error(index, operation, 400, "Create needs data"))
+                continue
+            created.append(data)
+            created_indexes.append(index)
+            results.append(None)  # Filled in once ids are assigned
+            continue
+        
+        if not record_id or (op == "update" and not data):
+            needed = "id and data" if op == "update" else "id"
+            results.append(_item_error(index, operation, 400, f"{op.capitalize()} needs {needed}"))
+            continue
+        
+        state = states.get(record_id)
+        if state is None:
+            results.append(_item_error(index, operation, 404, "Record not found"))
+            continue
+        
+        if op == "update":
+            old_data = state["data"]
+            state["data"] = data
+            state["version"] += 1
+            updated[record_id] = state
+            # A diff back to the previous version, as for single updates
+            activity_writer.record(
+                db,
+                user_id=user_id,
+                action="updated",
+                entity_type="record",
+                entity_id=record_id,
+                changes=update_changes(old_data, data, state["version"])
+            )
+        elif operation.get("hard_delete"):
+            if not state["is_deleted"]:
+                live_removed += 1
+            del states[record_id]
+            updated.pop(record_id, None)
+            hard_deleted.append(record_id)
+            # A hard-deleted record's final data is the base for rebuilding its history
+            activity_writer.record(
+                db,
+                user_id=user_id,
+                action="deleted",
+                entity_type="record",
+                entity_id=record_id,
+                changes={
+                    "hard_delete": True,
+                    "collection_id": collection_id,
+                    "version": state["version"],
+                    "data": state["data"]
+                }
+            )
+        else:
+            if not state["is_deleted"]:
+                live_removed += 1
+                state["is_deleted"] = True
+                soft_deleted.append(record_id)
+        
+        results.append(BatchItemResult(
+            index=index,
+            op=op,
+            status=200,
+            id=record_id,
+            version=state["version"]
+        ))
+    
+    if updated:
+        await db.execute(
+            update(table)
+            .where(table.c.id == bindparam("record_id"))
+            .values(data=bindparam("new_data"), version=bindparam("new_version"), updated_at=now),
+            [
+                {"record_id": record_id, "new_data": state["data"], "new_version": state["version"]}
+                for record_id, state in updated.items()
+            ]
+        )
+    
+    soft_deleted = [record_id for record_id in soft_deleted if record_id in states]
+    if soft_deleted:
+        await db.execute(
+            update(table)
+            .where(table.c.id.in_(soft_deleted))
+            .values(is_deleted=True, deleted_at=now)
+        )
+    
+    if hard_deleted:
+        await db.execute(delete(table).where(table.c.id.in_(hard_deleted)))
+    
+    created_ids = await bulk_insert_records(db, collection_id, created) if created else []
+    for index, record_id in zip(created_indexes, created_ids):
+        results[index] = BatchItemResult(index=index, op="create", status=201, id=record_id, version=1)
+    
+    await adjust_record_count(db, collection_id, len(created_ids) - live_removed)
+    
+    succeeded = [result for result in results if result.error is None]
+    if succeeded:
+        activity_writer.record(
+            db,
+            user_id=user_id,
+            action="batch_updated",
+            entity_type="collection",
+            entity_id=collection_id,
+            changes={
+                "created": created_ids,
+                "updated": list(updated),
+                "deleted": soft_deleted,
+                "hard_deleted": hard_deleted,
+            }
+        )
+    
+    return results
+
+
+def _jsonb(value: Any) -> ColumnElement:
+    return cast(literal(value, JSONB), JSONB)
+
+
+def _pg_merge_patch(target: ColumnElement, patch: Any) -> ColumnElement:
+    """RFC 7396 merge of `patch` into a jsonb expression, built from - , || and jsonb_set."""
+    if not isinstance(patch, dict):
+        return _jsonb(patch)
+    
+    result = case(
+        (func.jsonb_typeof(target) == "object", target),
+        else_=_jsonb({})
+    )
+    removed = [key for key, value in patch.items() if value is None]
+    if removed:
+        result = result.op("-", return_type=JSONB)(literal(removed, ARRAY(Text)))
+    replaced = {
+        key: value for key, value in patch.items()
+        if value is not None and not isinstance(value, dict)
+    }
+    if replaced:
+        result = result.op("||", return_type=JSONB)(_jsonb(replaced))
+    for key, value in patch.items():
+        if isinstance(value, dict):
+            result = func.jsonb_set(
+                result,
+                literal([key], ARRAY(Text)),
+                _pg_merge_patch(func.jsonb_extract_path(target, key, type_=JSONB), value),
+                type_=JSONB
+            )
+    return result
+
+
+def _merge_patch_sql(dialect: str, patch: Dict[str, Any]) -> ColumnElement:
+    """Expression for records.data with `patch` merged in."""
+    if dialect == "postgresql":
+        return cast(_pg_merge_patch(cast(Record.data, JSONB), patch), JSON)
+    # SQLite's json_patch implements RFC 7396
+    return func.json_patch(Record.data, literal(patch, JSON), type_=JSON)
+
+
+async def _top_level_values(
+    db: AsyncSession,
+    record_id: str,
+    keys: Sequence[str]
+) -> Dict[str, Any]:
+    """The given top-level keys of a record's data that are present, read without loading the rest."""
+    if db.get_bind().dialect.name == "postgresql":
+        query = text(
+            "SELECT entry.key, 'json', entry.value::text "
+            "FROM records, json_each(records.data) AS entry "
+            "WHERE records.id = :record_id AND entry.key IN :keys"
+        )
+    else:
+        query = text(
+            "SELECT json_each.key, json_each.type, json_quote(json_each.value) "
+            "FROM records, json_each(records.data) "
+            "WHERE records.id = :record_id AND json_each.key IN :keys"
+        )
+    result = await db.execute(
+        query.bindparams(bindparam("keys", expanding=True)),
+        {"record_id": record_id, "keys": list(keys)}
+    )
+    # SQLite reports JSON booleans as 1 / 0 with their own types
+    return {
+        key: value_type == "true" if value_type in ("true", "false") else json.loads(value)
+        for key, value_type, value in result.all()
+    }
+
+
+async def merge_patch_record(
+    db: AsyncSession,
+    collection_id: str,
+    record_id: str,
+    patch: Dict[str, Any]
+) -> Tuple[Record, Dict[str, Any]]:
+    """
+    Apply a JSON Merge Patch (RFC 7396) to a record's data in the database,
+    in the caller's transaction.
+    
+    The merge runs in the UPDATE itself (json_patch on SQLite; - , || and
+    jsonb_set on PostgreSQL). Only the patched top-level fields are read
+    beforehand, to log a diff covering just those fields, except on
+    snapshot versions, whose history entry needs the full previous data.
+    
+    Args:
+        db: Database session
+        collection_id: Collection the record belongs to
+        record_id: Record to patch (deleted or not)
+        patch: Merge patch for the data object
+        
+    Returns:
+        The updated record and the activity log changes for the update
+        
+    Raises:
+        HTTPException: 404 if the record does not exist in the collection
+    """
+    # Lock the row so concurrent updates cannot build on the same version
+    result = await db.execute(
+        select(Record.version)
+        .where(Record.id == record_id, Record.collection_id == collection_id)
+        .with_for_update()
+    )
+    current_version = result.scalar_one_or_none()
+    if current_version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Record not found"
+        )
+    
+    version = current_version + 1
+    if version % settings.RECORD_HISTORY_SNAPSHOT_INTERVAL == 0:
+        result = await db.execute(select(Record.data).where(Record.id == record_id))
+        old_data = result.scalar_one()
+    else:
+        old_data = await _top_level_values(db, record_id, list(patch))
+    changes = update_changes(old_data, merge_patch(old_data, patch), version)
+    
+    result = await db.execute(
+        update(Record)
+        .where(Record.id == record_id)
+        .values(
+            data=_merge_patch_sql(db.get_bind().dialect.name, patch),
+            version=version,
+            updated_at=datetime.utcnow()
+        )
+        .returning(Record)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one(), changes
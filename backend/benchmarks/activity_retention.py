@@ -0,0 +1,136 @@
+"""
+Benchmark: activity log retention and archive reads.
+
+Fills the activity log with --days of history for one user, measures the
+first page and a filtered page, then moves everything past --retention-days
+into the archive with ActivityRetentionJob and measures again, along with a
+page of old entries served from the archive.
+
+Usage (from backend/):
+    python benchmarks/activity_retention.py --days 365 --per-day 500 --retention-days 30
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_bench_dir = tempfile.mkdtemp(prefix="nexora-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(_bench_dir, 'bench.db')}")
+os.environ.setdefault("ACTIVITY_ARCHIVE_DIR", os.path.join(_bench_dir, "archive"))
+for _name in (
+    "SECRET_KEY", "CSRF_SECRET_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET",
+    "GOOGLE_REDIRECT_URI", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM",
+    "FRONTEND_URL",
+):
+    os.environ.setdefault(_name, "benchmark")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, ReadSessionLocal, close_db, init_db  # noqa: E402
+from app.models import ActivityLog, User  # noqa: E402
+from app.services.activity_archive import activity_archive, activity_retention_job  # noqa: E402
+
+
+async def timed(label, query_fn, repeat=50) -> None:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await query_fn()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(f"  {label:<28} p50 {latencies[len(latencies) // 2] * 1000:7.2f}ms, "
+          f"max {latencies[-1] * 1000:7.2f}ms")
+
+
+async def measure(user_id: str) -> None:
+    async def first_page():
+        async with ReadSessionLocal() as db:
+            await db.execute(
+                select(ActivityLog).where(ActivityLog.user_id == user_id)
+                .order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(50)
+            )
+
+    async def filtered_page():
+        async with ReadSessionLocal() as db:
+            await db.execute(
+                select(ActivityLog).where(
+                    ActivityLog.user_id == user_id,
+                    ActivityLog.entity_type == "record",
+                    ActivityLog.action == "deleted"
+                ).order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(50)
+            )
+
+    async with ReadSessionLocal() as db:
+        rows = (await db.execute(select(func.count()).select_from(ActivityLog))).scalar_one()
+    print(f"  hot table rows: {rows:,}")
+    await timed("first page", first_page)
+    await timed("filtered page (rare action)", filtered_page)
+
+
+async def main(args) -> None:
+    rng = random.Random(42)
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", full_name="Benchmark")
+        db.add(user)
+        await db.commit()
+        user_id = user.id
+
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        for day in range(args.days):
+            await db.execute(insert(ActivityLog.__table__), [
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "action": rng.choices(["created", "updated", "deleted"], weights=[3, 6, 1])[0],
+                    "entity_type": rng.choice(["record", "collection"]),
+                    "entity_id": str(uuid.uuid4()),
+                    "changes": {"version": rng.randint(1, 50), "field": "x" * 80},
+                    "created_at": now - timedelta(days=day, seconds=rng.randint(0, 86399)),
+                }
+                for _ in range(args.per_day)
+            ])
+        await db.commit()
+
+    print(f"{args.days} days x {args.per_day} entries, before archiving:")
+    await measure(user_id)
+
+    activity_retention_job.retention_days = args.retention_days
+    start = time.perf_counter()
+    moved = await activity_retention_job.archive_expired()
+    elapsed = time.perf_counter() - start
+    archive_bytes = sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(activity_archive.directory) for name in names
+    )
+    print(f"archived {moved:,} rows in {elapsed:.1f}s ({moved / elapsed:,.0f} rows/s), "
+          f"{archive_bytes / 2**20:.1f} MiB of gzip NDJSON")
+
+    print(f"after archiving (retention {args.retention_days} days):")
+    await measure(user_id)
+
+    old = now - timedelta(days=args.days * 2 // 3)
+    await timed(
+        "archive page (old range)",
+        lambda: asyncio.to_thread(activity_archive.read, user_id, 50, before=(old, "")),
+        repeat=10
+    )
+
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=500)
+    parser.add_argument("--retention-days", type=int, default=30)
+    asyncio.run(main(parser.parse_args()))
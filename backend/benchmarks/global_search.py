@@ -0,0 +1,106 @@
+"""
+Benchmark: global search latency for a user with many records.
+
+Fills one user's collections with records of random words (Zipf-distributed,
+so the most common words appear in a large share of records) plus a second
+user's records, then times search_user for words of decreasing frequency.
+
+Usage (from backend/):
+    python benchmarks/global_search.py --records 1000000 --collections 20
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="nexora-bench-"), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+for _name in (
+    "SECRET_KEY", "CSRF_SECRET_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET",
+    "GOOGLE_REDIRECT_URI", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM",
+    "FRONTEND_URL",
+):
+    os.environ.setdefault(_name, "benchmark")
+
+from app.core.database import AsyncSessionLocal, ReadSessionLocal, close_db, init_db  # noqa: E402
+from app.models import Collection, User  # noqa: E402
+from app.services.global_search import search_user  # noqa: E402
+from app.services.record_search import parse_search_terms  # noqa: E402
+from app.services.record_service import bulk_insert_records  # noqa: E402
+
+
+VOCABULARY = [f"word{i}" for i in range(20000)]
+CUMULATIVE_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+QUERIES = ["word0", "word5", "word100", "word5000", "word3 word40", "word12*"]
+
+
+async def fill(user_id: str, collections: int, records: int, rng: random.Random) -> None:
+    """Insert records round-robin over the collections, in import-sized chunks."""
+    chunk = 5000
+    async with AsyncSessionLocal() as db:
+        targets = [Collection(user_id=user_id, name=f"collection {number}") for number in range(collections)]
+        db.add_all(targets)
+        await db.flush()
+        for start in range(0, records, chunk):
+            collection = targets[(start // chunk) % collections]
+            await bulk_insert_records(db, collection.id, [
+                {
+                    "title": " ".join(rng.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=3)),
+                    "notes": " ".join(rng.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=8)),
+                    "amount": rng.randint(1, 1000),
+                }
+                for _ in range(min(chunk, records - start))
+            ])
+            if start % 100000 == 0:
+                await db.commit()
+        await db.commit()
+
+
+async def main(args) -> None:
+    rng = random.Random(42)
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", full_name="Benchmark")
+        other = User(email="other@example.com", full_name="Other")
+        db.add_all([user, other])
+        await db.commit()
+
+    start = time.perf_counter()
+    await fill(user.id, args.collections, args.records, rng)
+    await fill(other.id, 5, args.records // 5, rng)
+    print(f"loaded {args.records:,} + {args.records // 5:,} records in {time.perf_counter() - start:.0f}s")
+
+    async with ReadSessionLocal() as db:
+        for query in QUERIES:
+            terms = parse_search_terms(query)
+            latencies = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                groups = await search_user(db, user.id, terms, limit=10, hits_per_collection=3)
+                latencies.append(time.perf_counter() - start)
+                db.expunge_all()
+            latencies.sort()
+            hits = sum(len(group.hits) for group in groups)
+            print(
+                f"  {query:<14} {len(groups):>2} groups {hits:>2} hits  "
+                f"p50 {latencies[len(latencies) // 2] * 1000:7.1f}ms  "
+                f"max {latencies[-1] * 1000:7.1f}ms"
+            )
+
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--collections", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,92 @@
+"""
+Benchmark: inserting imported records.
+
+Compares the previous ORM path (one Record object per row, add_all + flush
+every 1000) with bulk_insert_records (Core INSERT executemany with
+pre-generated ids) on a fresh SQLite database.
+
+Usage (from backend/):
+    python benchmarks/import_insert.py --rows 200000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="nexora-bench-"), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+for _name in (
+    "SECRET_KEY", "CSRF_SECRET_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET",
+    "GOOGLE_REDIRECT_URI", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM",
+    "FRONTEND_URL",
+):
+    os.environ.setdefault(_name, "benchmark")
+
+from app.core.database import AsyncSessionLocal, close_db, init_db  # noqa: E402
+from app.models import Collection, Record, User  # noqa: E402
+from app.services.record_service import bulk_insert_records  # noqa: E402
+
+
+def make_rows(count: int):
+    return [
+        {"name": f"item {i}", "price": i * 1.25, "qty": i % 97, "when": "2024-01-01"}
+        for i in range(count)
+    ]
+
+
+async def orm_insert(db, collection_id, rows):
+    batch = []
+    for record_data in rows:
+        batch.append(Record(collection_id=collection_id, data=record_data))
+        if len(batch) >= 1000:
+            db.add_all(batch)
+            await db.flush()
+            batch = []
+    if batch:
+        db.add_all(batch)
+
+
+async def run(label, insert, rows, user_id, batch_size):
+    async with AsyncSessionLocal() as db:
+        collection = Collection(user_id=user_id, name=label)
+        db.add(collection)
+        await db.flush()
+
+        start = time.perf_counter()
+        if batch_size:
+            await insert(db, collection.id, rows, batch_size)
+        else:
+            await insert(db, collection.id, rows)
+        await db.commit()
+        elapsed = time.perf_counter() - start
+
+    print(f"{label:<12} {len(rows)} rows: {elapsed:7.2f}s ({len(rows) / elapsed:,.0f} rows/s)")
+    return elapsed
+
+
+async def main(count: int, batch_size: int) -> None:
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", full_name="Benchmark")
+        db.add(user)
+        await db.commit()
+        user_id = user.id
+
+    rows = make_rows(count)
+    orm = await run("orm add_all", orm_insert, rows, user_id, None)
+    core = await run("core bulk", bulk_insert_records, rows, user_id, batch_size)
+    print(f"speedup: {orm / core:.1f}x")
+
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.batch_size))
@@ -0,0 +1,137 @@
+"""
+Benchmark: latency of an unrelated endpoint while logins are in flight.
+
+Probes GET /health while a burst of concurrent POST /api/v1/auth/login
+requests run against the same event loop, once with Argon2 running on the
+loop (the old behaviour) and once through the off-loop thread pool.
+
+Usage (from backend/):
+    python benchmarks/login_latency.py --logins 40 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="nexora-bench-"), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+for _name in (
+    "SECRET_KEY", "CSRF_SECRET_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET",
+    "GOOGLE_REDIRECT_URI", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM",
+    "FRONTEND_URL",
+):
+    os.environ.setdefault(_name, "benchmark")
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core import security  # noqa: E402
+from app.core.database import AsyncSessionLocal, close_db, init_db  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import auth_service  # noqa: E402
+
+
+EMAIL = "bench@example.com"
+PASSWORD = "Bench-Passw0rd!"
+
+
+async def _blocking_verify(plain_password: str, hashed_password: str) -> bool:
+    """Old behaviour: Argon2 runs directly on the event loop."""
+    return security.verify_password(plain_password, hashed_password)
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _probe(client: httpx.AsyncClient, stop: asyncio.Event, samples: list) -> None:
+    """
+    Issue /health on a fixed schedule and record latency from the scheduled
+    start, so time spent waiting for a blocked loop is counted too. Slots
+    missed while a probe was outstanding are skipped rather than queued.
+    """
+    interval = 0.02
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        await client.get("/health")
+        samples.append((time.perf_counter() - scheduled) * 1000)
+        scheduled = max(scheduled + interval, time.perf_counter())
+        await asyncio.sleep(scheduled - time.perf_counter())
+
+
+async def _login_storm(client: httpx.AsyncClient, logins: int, concurrency: int) -> int:
+    semaphore = asyncio.Semaphore(concurrency)
+    shed = 0
+
+    async def one_login():
+        nonlocal shed
+        async with semaphore:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": EMAIL, "password": PASSWORD}
+            )
+            if response.status_code == 503:
+                shed += 1
+
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+    return shed
+
+
+async def run_scenario(client, label, logins, concurrency):
+    samples = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(_probe(client, stop, samples))
+
+    start = time.perf_counter()
+    shed = await _login_storm(client, logins, concurrency)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe_task
+
+    print(
+        f"{label:<10} logins={logins:<4} wall={elapsed:6.2f}s shed={shed:<3} "
+        f"/health p50={statistics.median(samples):7.2f}ms "
+        f"p99={_percentile(samples, 99):7.2f}ms max={max(samples):7.2f}ms "
+        f"(n={len(samples)})"
+    )
+
+
+async def main(logins: int, concurrency: int) -> None:
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        db.add(User(
+            email=EMAIL,
+            full_name="Benchmark",
+            email_verified=True,
+            password_hash=security.hash_password(PASSWORD)
+        ))
+        await db.commit()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        original_verify = auth_service.verify_password_async
+
+        auth_service.verify_password_async = _blocking_verify
+        await run_scenario(client, "on-loop", logins, concurrency)
+
+        auth_service.verify_password_async = original_verify
+        await run_scenario(client, "off-loop", logins, concurrency)
+
+    await close_db()
+    security.shutdown_password_hasher()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
@@ -0,0 +1,111 @@
+"""
+Benchmark: collection export throughput and memory.
+
+Exports collections of increasing size in each format, discarding the
+output, and reports the time and the peak Python memory allocated during
+the export (tracemalloc), which should not grow with the record count.
+
+Usage (from backend/):
+    python benchmarks/record_export.py --records 100000 300000 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="nexora-bench-"), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+for _name in (
+    "SECRET_KEY", "CSRF_SECRET_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET",
+    "GOOGLE_REDIRECT_URI", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM",
+    "FRONTEND_URL",
+):
+    os.environ.setdefault(_name, "benchmark")
+
+from app.core.database import AsyncSessionLocal, ReadSessionLocal, close_db, init_db  # noqa: E402
+from app.models import Collection, User  # noqa: E402
+from app.services.record_export import export_columns, export_stream, require_parquet_support  # noqa: E402
+from app.services.record_service import bulk_insert_records  # noqa: E402
+
+
+SCHEMA = {"fields": [
+    {"name": "name", "type": "text", "label": "Name", "required": False},
+    {"name": "amount", "type": "number", "label": "Amount", "required": False},
+    {"name": "placed_on", "type": "date", "label": "Placed On", "required": False},
+    {"name": "notes", "type": "text", "label": "Notes", "required": False},
+]}
+
+
+async def fill(user_id: str, records: int, rng: random.Random) -> Collection:
+    chunk = 5000
+    async with AsyncSessionLocal() as db:
+        collection = Collection(user_id=user_id, name=f"orders {records}", schema=SCHEMA)
+        db.add(collection)
+        await db.flush()
+        for start in range(0, records, chunk):
+            await bulk_insert_records(db, collection.id, [
+                {
+                    "name": f"customer {rng.randint(1, 50000)}",
+                    "amount": round(rng.uniform(1, 1000), 2),
+                    "placed_on": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                    "notes": "x" * rng.randint(0, 80),
+                }
+                for _ in range(min(chunk, records - start))
+            ])
+        await db.commit()
+    return collection
+
+
+async def export(collection: Collection, export_format: str) -> int:
+    async with ReadSessionLocal() as db:
+        columns = await export_columns(db, collection) if export_format != "ndjson" else []
+    size = 0
+    async for chunk in export_stream(collection, export_format, columns):
+        size += len(chunk)
+    return size
+
+
+async def main(args) -> None:
+    rng = random.Random(42)
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", full_name="Benchmark")
+        db.add(user)
+        await db.commit()
+
+    formats = ["csv", "ndjson", "xlsx"]
+    try:
+        require_parquet_support()
+        formats.append("parquet")
+    except Exception:
+        print("pyarrow not installed, skipping parquet")
+
+    for records in args.records:
+        collection = await fill(user.id, records, rng)
+        print(f"{records:,} records")
+        for export_format in formats:
+            tracemalloc.start()
+            start = time.perf_counter()
+            size = await export(collection, export_format)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"  {export_format:<8} {size / 1e6:8.1f} MB out  {elapsed:6.1f}s  "
+                f"{records / elapsed:9,.0f} records/s  peak {peak / 1e6:6.1f} MB"
+            )
+
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, nargs="+", default=[100000, 300000, 1000000])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,124 @@
+"""
+Benchmark: record history storage and reconstruction.
+
+Applies a series of small updates (a few fields each) to wide records and
+compares the activity log `changes` size of the previous format (full old +
+new data per update) with reverse JSON Patches plus periodic snapshots, then
+measures how long reconstructing random historical versions takes.
+
+Usage (from backend/):
+    python benchmarks/record_history.py --records 50 --updates 100 --fields 40
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="nexora-bench-"), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+for _name in (
+    "SECRET_KEY", "CSRF_SECRET_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET",
+    "GOOGLE_REDIRECT_URI", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM",
+    "FRONTEND_URL",
+):
+    os.environ.setdefault(_name, "benchmark")
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import AsyncSessionLocal, ReadSessionLocal, close_db, init_db  # noqa: E402
+from app.models import ActivityLog, Collection, Record, User  # noqa: E402
+from app.services.record_history import reconstruct_record_version, update_changes  # noqa: E402
+
+
+def make_data(rng, fields):
+    return {f"field_{i}": f"value {rng.random():.12f} " * 2 for i in range(fields)}
+
+
+def mutate(rng, data, version):
+    data = dict(data)
+    for key in rng.sample(sorted(data), k=rng.randint(1, 3)):
+        data[key] = f"edit {version} {rng.random():.8f}"
+    return data
+
+
+async def main(args) -> None:
+    rng = random.Random(42)
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", full_name="Benchmark")
+        db.add(user)
+        await db.flush()
+        collection = Collection(user_id=user.id, name="history")
+        db.add(collection)
+        await db.commit()
+        user_id, collection_id = user.id, collection.id
+
+    previous_bytes = diff_bytes = data_bytes = 0
+    histories = {}
+    for _ in range(args.records):
+        data = make_data(rng, args.fields)
+        async with AsyncSessionLocal() as db:
+            record = Record(collection_id=collection_id, data=data)
+            db.add(record)
+            await db.flush()
+            history = {1: data}
+            for _ in range(args.updates):
+                new_data = mutate(rng, record.data, record.version + 1)
+                old_data = record.data
+                record.data = new_data
+                record.version += 1
+                changes = update_changes(old_data, new_data, record.version)
+                db.add(ActivityLog(
+                    user_id=user_id,
+                    action="updated",
+                    entity_type="record",
+                    entity_id=record.id,
+                    changes=changes
+                ))
+                previous_bytes += len(json.dumps({"old": old_data, "new": new_data}))
+                diff_bytes += len(json.dumps(changes))
+                history[record.version] = new_data
+            data_bytes += len(json.dumps(record.data))
+            await db.commit()
+            histories[record.id] = history
+
+    updates = args.records * args.updates
+    print(f"{updates} updates of {args.fields}-field records ({data_bytes // args.records} B each), "
+          f"snapshot every {settings.RECORD_HISTORY_SNAPSHOT_INTERVAL} versions")
+    print(f"previous  old+new: {previous_bytes / 1024:9,.0f} KiB ({previous_bytes // updates} B/update)")
+    print(f"diffs     patches: {diff_bytes / 1024:9,.0f} KiB ({diff_bytes // updates} B/update), "
+          f"{previous_bytes / diff_bytes:.1f}x smaller")
+
+    latencies = []
+    async with ReadSessionLocal() as db:
+        for _ in range(args.lookups):
+            record_id = rng.choice(list(histories))
+            version = rng.randint(1, args.updates + 1)
+            start = time.perf_counter()
+            data = await reconstruct_record_version(db, user_id, record_id, version)
+            latencies.append(time.perf_counter() - start)
+            assert data == histories[record_id][version]
+            db.expunge_all()
+
+    latencies.sort()
+    print(f"reconstruct {args.lookups} random versions: "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.2f}ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms, "
+          f"max {latencies[-1] * 1000:.2f}ms")
+
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=50)
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--fields", type=int, default=40)
+    parser.add_argument("--lookups", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
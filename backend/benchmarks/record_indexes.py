@@ -0,0 +1,130 @@
+"""
+Benchmark: filtered record lists with and without field indexes.
+
+Fills several collections with records, runs record filters (a selective
+number range, a text equality, a date equality) against one collection,
+then marks those fields indexed, lets RecordIndexBuilder build the partial
+expression indexes and runs the same filters again.
+
+Usage (from backend/):
+    python benchmarks/record_indexes.py --collections 5 --records 50000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="nexora-bench-"), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+for _name in (
+    "SECRET_KEY", "CSRF_SECRET_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET",
+    "GOOGLE_REDIRECT_URI", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM",
+    "FRONTEND_URL",
+):
+    os.environ.setdefault(_name, "benchmark")
+
+from sqlalchemy import literal, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, ReadSessionLocal, close_db, init_db  # noqa: E402
+from app.core.write_queue import write_queue  # noqa: E402
+from app.models import Collection, Record, User  # noqa: E402
+from app.services.record_filters import build_record_filter  # noqa: E402
+from app.services.record_indexes import record_index_builder, sync_record_indexes  # noqa: E402
+from app.services.record_service import bulk_insert_records  # noqa: E402
+
+
+FIELDS = [
+    {"name": "price", "type": "number", "label": "Price", "required": False},
+    {"name": "status", "type": "select", "label": "Status", "required": False},
+    {"name": "due", "type": "date", "label": "Due", "required": False},
+]
+
+FILTERS = {
+    "price range (0.2%)": {"price": {"gte": 100, "lt": 102}},
+    "status equals (1 of 50)": {"status": "status-7"},
+    "due equals (1 of 365)": {"due": "2026-03-14"},
+}
+
+
+async def run_filters(collection: Collection, repeat: int) -> None:
+    for label, spec in FILTERS.items():
+        conditions = build_record_filter(spec, collection.schema, "sqlite")
+        query = (
+            select(Record)
+            .where(
+                Record.collection_id == literal(collection.id, literal_execute=True),
+                Record.is_deleted == False,
+                *conditions
+            )
+            .order_by(Record.created_at.desc(), Record.id.desc())
+            .limit(100)
+        )
+        latencies = []
+        async with ReadSessionLocal() as db:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rows = (await db.execute(query)).scalars().all()
+                latencies.append(time.perf_counter() - start)
+                db.expunge_all()
+        latencies.sort()
+        print(f"  {label:<26} {len(rows):>3} rows  p50 {latencies[len(latencies) // 2] * 1000:8.2f}ms")
+
+
+async def main(args) -> None:
+    rng = random.Random(42)
+    await init_db()
+    await write_queue.start()
+
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", full_name="Benchmark")
+        db.add(user)
+        await db.flush()
+        collections = []
+        for number in range(args.collections):
+            collection = Collection(user_id=user.id, name=f"bench {number}", schema={"fields": FIELDS})
+            db.add(collection)
+            await db.flush()
+            await bulk_insert_records(db, collection.id, [
+                {
+                    "price": round(rng.uniform(0, 1000), 2),
+                    "status": f"status-{rng.randrange(50)}",
+                    "due": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                }
+                for _ in range(args.records)
+            ])
+            collections.append(collection)
+        await db.commit()
+    target = collections[0]
+
+    print(f"{args.collections} collections x {args.records:,} records, no field indexes:")
+    await run_filters(target, args.repeat)
+
+    async def mark_indexed(db):
+        collection = await db.get(Collection, target.id)
+        collection.schema = {"fields": [dict(field, indexed=True) for field in FIELDS]}
+        await sync_record_indexes(db, collection)
+        return collection
+
+    target = await write_queue.submit(mark_indexed)
+    start = time.perf_counter()
+    await record_index_builder.process_pending()
+    print(f"built {record_index_builder.built} partial indexes in {time.perf_counter() - start:.2f}s")
+
+    print("with field indexes:")
+    await run_filters(target, args.repeat)
+
+    await write_queue.stop()
+    await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--collections", type=int, default=5)
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
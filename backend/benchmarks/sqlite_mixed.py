@@ -0,0 +1,173 @@
+"""
+Benchmark: mixed read/write load on SQLite.
+
+Runs concurrent clients that each mix record reads (a 50-row page) and
+record creates (insert + activity log entry) against two setups on fresh
+database files:
+
+  previous  one engine (NullPool, WAL only), every write commits on its own
+  tuned     create_engine_for() reader pool + single writer with the pragmas
+            from settings, writes group-committed through WriteQueue
+
+Usage (from backend/):
+    python benchmarks/sqlite_mixed.py --clients 32 --seconds 10 --write-ratio 0.3
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_bench_dir = tempfile.mkdtemp(prefix="nexora-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(_bench_dir, 'unused.db')}")
+for _name in (
+    "SECRET_KEY", "CSRF_SECRET_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET",
+    "GOOGLE_REDIRECT_URI", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM",
+    "FRONTEND_URL",
+):
+    os.environ.setdefault(_name, "benchmark")
+
+from sqlalchemy import event, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import Base, create_engine_for  # noqa: E402
+from app.core.write_queue import WriteQueue  # noqa: E402
+from app.models import ActivityLog, Collection, Record, User  # noqa: E402
+
+
+def session_factory(engine):
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+
+def previous_engine(url):
+    engine = create_async_engine(url, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _wal(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+    return engine
+
+
+async def seed(engine, rows):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory(engine)() as db:
+        user = User(email="bench@example.com", full_name="Benchmark")
+        db.add(user)
+        await db.flush()
+        collection = Collection(user_id=user.id, name="bench", record_count=rows)
+        db.add(collection)
+        await db.flush()
+        db.add_all(Record(collection_id=collection.id, data={"n": i}) for i in range(rows))
+        await db.commit()
+        return user.id, collection.id
+
+
+def make_write(user_id, collection_id, n):
+    async def write(db):
+        record = Record(collection_id=collection_id, data={"n": n})
+        db.add(record)
+        await db.flush()
+        db.add(ActivityLog(
+            user_id=user_id, action="created", entity_type="record", entity_id=record.id
+        ))
+        return record.id
+    return write
+
+
+async def read(db, collection_id):
+    result = await db.execute(
+        select(Record)
+        .where(Record.collection_id == collection_id, Record.is_deleted == False)  # noqa: E712
+        .order_by(Record.created_at.desc(), Record.id.desc())
+        .limit(50)
+    )
+    return result.scalars().all()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def run(label, reader, submit_write, user_id, collection_id, args):
+    latencies = {"read": [], "write": []}
+    errors = 0
+    deadline = time.perf_counter() + args.seconds
+    counter = iter(range(10**9))
+
+    async def client(seed_value):
+        nonlocal errors
+        rng = random.Random(seed_value)
+        while time.perf_counter() < deadline:
+            kind = "write" if rng.random() < args.write_ratio else "read"
+            start = time.perf_counter()
+            try:
+                if kind == "write":
+                    await submit_write(make_write(user_id, collection_id, next(counter)))
+                else:
+                    async with reader() as db:
+                        await read(db, collection_id)
+            except Exception:
+                errors += 1
+                continue
+            latencies[kind].append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client(i) for i in range(args.clients)))
+
+    reads, writes = latencies["read"], latencies["write"]
+    print(
+        f"{label:<9} reads {len(reads) / args.seconds:8,.0f}/s p99 {percentile(reads, 0.99) * 1000:7.1f}ms | "
+        f"writes {len(writes) / args.seconds:7,.0f}/s p99 {percentile(writes, 0.99) * 1000:7.1f}ms | "
+        f"errors {errors}"
+    )
+
+
+async def main(args) -> None:
+    # Previous setup: shared engine, a transaction and commit per write
+    url = f"sqlite+aiosqlite:///{os.path.join(_bench_dir, 'previous.db')}"
+    engine = previous_engine(url)
+    user_id, collection_id = await seed(engine, args.rows)
+    sessions = session_factory(engine)
+
+    async def commit_each(operation):
+        async with sessions() as db:
+            result = await operation(db)
+            await db.commit()
+            return result
+
+    await run("previous", sessions, commit_each, user_id, collection_id, args)
+    await engine.dispose()
+
+    # Tuned setup: reader pool, single writer, group commit
+    url = f"sqlite+aiosqlite:///{os.path.join(_bench_dir, 'tuned.db')}"
+    writer = create_engine_for(url)
+    reader = create_engine_for(url, readonly=True)
+    user_id, collection_id = await seed(writer, args.rows)
+    queue = WriteQueue(session_factory(writer), max_batch=settings.SQLITE_WRITE_BATCH_SIZE)
+    await queue.start()
+
+    await run("tuned", session_factory(reader), queue.submit, user_id, collection_id, args)
+    await queue.stop()
+    print(f"          {queue.operations} writes in {queue.batches} commits")
+    await writer.dispose()
+    await reader.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--rows", type=int, default=20_000)
+    asyncio.run(main(parser.parse_args()))
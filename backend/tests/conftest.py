@@ -0,0 +1,59 @@
+"""
+Shared test setup: a throwaway SQLite database and API clients for users.
+
+Settings are read from the environment at import time, so the database URL
+and required secrets are set before the app is imported.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="nexora-test-"), "test.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+for _name in (
+    "SECRET_KEY", "CSRF_SECRET_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET",
+    "GOOGLE_REDIRECT_URI", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM",
+    "FRONTEND_URL",
+):
+    os.environ.setdefault(_name, "test")
+
+import httpx  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, close_db, init_db  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+async def create_user(name: str) -> httpx.AsyncClient:
+    """Create a verified user and return an API client authenticated as them."""
+    async with AsyncSessionLocal() as db:
+        # Tests share one database, so every user is new
+        user = User(email=f"{name}-{uuid.uuid4().hex[:8]}@example.com", full_name=name, email_verified=True)
+        db.add(user)
+        await db.commit()
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test/api/v1",
+        headers={"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+    )
+
+
+@pytest.fixture
+def run():
+    """Run a test scenario (an async function) on its own event loop."""
+    def runner(coroutine_function):
+        async def scenario():
+            await init_db()
+            try:
+                return await coroutine_function()
+            finally:
+                await close_db()
+        return asyncio.run(scenario())
+    return runner
@@ -0,0 +1,134 @@
+"""
+The retention job moves old activity rows to the archive, and reads continue there.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import literal_column, select, update
+
+from app.core.database import AsyncSessionLocal
+from app.models.activity_log import ActivityLog
+from app.services.activity_archive import ActivityRetentionJob, activity_archive
+from tests.conftest import create_user
+
+
+@pytest.fixture
+def job(tmp_path, monkeypatch):
+    monkeypatch.setattr(activity_archive, "directory", str(tmp_path))
+    return ActivityRetentionJob(activity_archive, retention_days=30, batch_size=2, interval_seconds=3600)
+
+
+async def _age_entries(user_id: str, expired: int) -> list:
+    """
+    Give a user's entries distinct times in the order they were written,
+    the first `expired` of them past the retention window. Returns their
+    ids, newest first.
+    """
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ActivityLog.id)
+            .where(ActivityLog.user_id == user_id)
+            .order_by(ActivityLog.created_at, literal_column("activity_logs.rowid"))
+        )
+        ids = list(result.scalars())
+        for position, entry_id in enumerate(ids):
+            if position < expired:
+                created_at = now - timedelta(days=60) + timedelta(minutes=position)
+            else:
+                created_at = now - timedelta(minutes=len(ids) - position)
+            await db.execute(update(ActivityLog).where(ActivityLog.id == entry_id).values(created_at=created_at))
+        await db.commit()
+    return ids[::-1]
+
+
+async def _database_ids(user_id: str) -> set:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(ActivityLog.id).where(ActivityLog.user_id == user_id))
+        return set(result.scalars())
+
+
+def test_expired_rows_move_to_the_archive(run, job):
+    async def scenario():
+        owner = await create_user("owner")
+        user_id = (await owner.get("/auth/me")).json()["id"]
+        collection_id = (await owner.post("/collections", json={"name": "Old"})).json()["id"]
+        for n in range(4):
+            await owner.post(f"/collections/{collection_id}/records", json={"data": {"n": n}})
+        ids = await _age_entries(user_id, expired=3)
+
+        assert await job.archive_expired() == 3
+        assert await _database_ids(user_id) == set(ids[:2])
+        archived = activity_archive.read(user_id, 10)
+        assert [row["id"] for row in archived] == ids[2:]
+        assert archived[-1]["action"] == "created" and archived[-1]["entity_type"] == "collection"
+
+        # Nothing left to move
+        assert await job.archive_expired() == 0
+
+    run(scenario)
+
+
+def test_activity_pages_continue_into_the_archive(run, job):
+    async def scenario():
+        owner = await create_user("owner")
+        user_id = (await owner.get("/auth/me")).json()["id"]
+        collection_id = (await owner.post("/collections", json={"name": "Paged"})).json()["id"]
+        for n in range(6):
+            await owner.post(f"/collections/{collection_id}/records", json={"data": {"n": n}})
+        ids = await _age_entries(user_id, expired=4)
+        await job.archive_expired()
+
+        # Cursor pages walk from the database rows into the archived ones
+        seen, cursor = [], ""
+        while cursor is not None:
+            page = (await owner.get("/activity", params={"limit": 2, "cursor": cursor})).json()
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+        assert seen == ids
+
+        # Offset pages too, whether a page straddles the boundary or lies past it
+        for skip in range(len(ids)):
+            response = await owner.get("/activity", params={"limit": 2, "skip": skip})
+            assert [item["id"] for item in response.json()] == ids[skip:skip + 2]
+
+        response = await owner.get("/activity", params={"entity_type": "collection"})
+        assert [item["entity_id"] for item in response.json()] == [collection_id]
+
+    run(scenario)
+
+
+def test_record_history_is_rebuilt_from_archived_entries(run, job):
+    async def scenario():
+        owner = await create_user("owner")
+        user_id = (await owner.get("/auth/me")).json()["id"]
+        collection_id = (await owner.post("/collections", json={"name": "History"})).json()["id"]
+        url = f"/collections/{collection_id}/records"
+        record_id = (await owner.post(url, json={"data": {"n": 1}})).json()["id"]
+        deleted_id = (await owner.post(url, json={"data": {"n": 1}})).json()["id"]
+        for n in range(2, 5):
+            await owner.put(f"{url}/{record_id}", json={"data": {"n": n}})
+            await owner.put(f"{url}/{deleted_id}", json={"data": {"n": n}})
+        await owner.delete(f"{url}/{deleted_id}", params={"hard_delete": True})
+        await owner.put(f"{url}/{record_id}", json={"data": {"n": 5}})
+
+        # Everything but the newest update of record_id is archived, the
+        # hard deletion entry included
+        ids = await _age_entries(user_id, expired=0)
+        await _age_entries(user_id, expired=len(ids) - 1)
+        await job.archive_expired()
+        assert await _database_ids(user_id) == {ids[0]}
+
+        for version in range(1, 6):
+            response = await owner.get(f"{url}/{record_id}/versions/{version}")
+            assert response.status_code == 200
+            assert response.json()["data"] == {"n": version}
+        for version in range(1, 5):
+            response = await owner.get(f"{url}/{deleted_id}/versions/{version}")
+            assert response.status_code == 200
+            assert response.json()["data"] == {"n": version}
+
+        response = await owner.get(f"{url}/{deleted_id}/versions/5")
+        assert response.status_code == 404
+
+    run(scenario)
@@ -0,0 +1,23 @@
+"""
+Deactivating an account takes effect immediately, despite the principal cache.
+"""
+from tests.conftest import create_user
+
+
+def test_deactivated_account_is_refused_at_once(run):
+    async def scenario():
+        client = await create_user("leaving")
+
+        # Caches the principal for this token
+        response = await client.get("/auth/me")
+        assert response.status_code == 200
+
+        response = await client.delete("/auth/me")
+        assert response.status_code == 200
+
+        response = await client.get("/auth/me")
+        assert response.status_code == 403
+        response = await client.get("/collections")
+        assert response.status_code == 403
+
+    run(scenario)
@@ -0,0 +1,16 @@
+"""
+Concurrent Excel imports share one worker pool.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services import excel_reader
+
+
+def test_concurrent_first_use_creates_one_pool():
+    try:
+        with ThreadPoolExecutor(max_workers=8) as threads:
+            pools = list(threads.map(lambda _: excel_reader._get_pool(1), range(8)))
+        assert len({id(executor) for executor, _ in pools}) == 1
+        assert len({id(manager) for _, manager in pools}) == 1
+    finally:
+        excel_reader.shutdown_excel_pool()
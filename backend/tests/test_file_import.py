@@ -0,0 +1,67 @@
+"""
+The import preview says when field types were detected from part of the file,
+and the deprecated synchronous upload runs as a background job.
+"""
+from app.core.config import settings
+from app.services.import_jobs import ImportJobRunner
+from tests.conftest import create_user
+
+
+def _csv(rows: int) -> bytes:
+    return ("name,price\n" + "".join(f"item {i},{i}\n" for i in range(rows))).encode()
+
+
+def test_preview_reports_partial_type_detection(run):
+    async def scenario():
+        client = await create_user("importer")
+
+        response = await client.post("/import/preview", files={"file": ("small.csv", _csv(10), "text/csv")})
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["type_detection_rows"], body["type_detection_partial"]) == (10, False)
+
+        response = await client.post("/import/preview", files={"file": ("large.csv", _csv(5000), "text/csv")})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["type_detection_partial"] is True
+        assert body["type_detection_rows"] < body["total_rows"]
+
+    run(scenario)
+
+
+def test_upload_imports_through_a_job(run, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_SPOOL_DIR", str(tmp_path))
+    # Workers of the app runner, which the test client does not start
+    runner = ImportJobRunner(workers=1)
+    monkeypatch.setattr("app.api.v1.file_import.import_job_runner", runner)
+
+    async def scenario():
+        client = await create_user("importer")
+        await runner.start()
+        try:
+            response = await client.post(
+                "/import/upload",
+                data={"folder_name": "Items"},
+                files={"file": ("items.csv", _csv(25), "text/csv")}
+            )
+            assert response.status_code == 200
+            body = response.json()
+            assert (body["folder_name"], body["items_created"]) == ("Items", 25)
+
+            response = await client.get(f"/collections/{body['collection_id']}")
+            assert response.json()["record_count"] == 25
+
+            response = await client.post(
+                "/import/upload",
+                data={"folder_name": "Empty"},
+                files={"file": ("empty.csv", b"name,price\n", "text/csv")}
+            )
+            assert response.status_code == 400
+            assert response.json()["detail"] == "File is empty or contains no data"
+        finally:
+            await runner.stop()
+
+        # Spooled files are removed once their job is done
+        assert list(tmp_path.iterdir()) == []
+
+    run(scenario)
@@ -0,0 +1,63 @@
+"""
+With several processes, only import jobs of a dead process are taken over.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.core.process_identity import process_id
+from app.models.import_job import ImportJob
+from app.models.user import User
+from app.services.import_jobs import ImportClaimLost, ImportJobRunner
+
+
+async def _running_job(db, user_id: str, claimed_by: str, heartbeat_at) -> ImportJob:
+    job = ImportJob(
+        user_id=user_id,
+        status="running",
+        filename="data.csv",
+        file_path="/nonexistent/data.csv",
+        folder_name="Data",
+        claimed_by=claimed_by,
+        heartbeat_at=heartbeat_at
+    )
+    db.add(job)
+    await db.flush()
+    return job
+
+
+def test_only_jobs_without_a_recent_heartbeat_are_requeued(run):
+    async def scenario():
+        runner = ImportJobRunner(workers=1, stale_after=60)
+        async with AsyncSessionLocal() as db:
+            user = User(email=f"jobs-{uuid.uuid4().hex[:8]}@example.com", full_name="jobs")
+            db.add(user)
+            await db.flush()
+            now = datetime.utcnow()
+            alive = await _running_job(db, user.id, "other-host:1:alive", now)
+            dead = await _running_job(db, user.id, "other-host:2:dead", now - timedelta(minutes=5))
+            legacy = await _running_job(db, user.id, None, None)
+            mine = await _running_job(db, user.id, process_id(), now)
+            alive_id, dead_id, legacy_id, mine_id = alive.id, dead.id, legacy.id, mine.id
+            await db.commit()
+
+            recovered = await runner._requeue_stale(db)
+            await db.commit()
+            assert alive_id not in recovered and mine_id not in recovered
+            assert {dead_id, legacy_id} <= set(recovered)
+
+            alive = await db.get(ImportJob, alive_id, populate_existing=True)
+            dead = await db.get(ImportJob, dead_id, populate_existing=True)
+            assert (alive.status, alive.claimed_by) == ("running", "other-host:1:alive")
+            assert (dead.status, dead.claimed_by) == ("queued", None)
+
+            # A process that lost its claim must not commit more progress
+            with pytest.raises(ImportClaimLost):
+                await runner._renew_claim(db, alive_id)
+            await db.rollback()
+            await runner._renew_claim(db, mine_id)
+            await db.commit()
+
+    run(scenario)
@@ -0,0 +1,35 @@
+"""
+The read-after-write deadline reaches the cross-origin SPA through a header.
+"""
+import time
+
+import httpx
+from starlette.requests import Request
+
+from app.core.read_routing import READ_PRIMARY_HEADER, prefers_primary
+from app.main import app
+
+
+def _get_request(headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_deadline_header_is_exposed_to_the_frontend(run):
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/", headers={"Origin": "http://localhost:5173"})
+        exposed = response.headers["access-control-expose-headers"].lower()
+        assert READ_PRIMARY_HEADER.lower() in exposed
+
+    run(scenario)
+
+
+def test_echoed_deadline_header_routes_reads_to_the_primary():
+    assert prefers_primary(_get_request({READ_PRIMARY_HEADER: f"{time.time() + 5:.3f}"}))
+    assert not prefers_primary(_get_request({READ_PRIMARY_HEADER: f"{time.time() - 5:.3f}"}))
+    assert not prefers_primary(_get_request({}))
@@ -0,0 +1,142 @@
+"""
+Record batches apply operations in order, report each one, and log history.
+"""
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.activity_log import ActivityLog
+from tests.conftest import create_user
+
+
+async def _activity(entity_type: str, entity_id: str):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ActivityLog.action, ActivityLog.changes)
+            .where(ActivityLog.entity_type == entity_type, ActivityLog.entity_id == entity_id)
+        )
+        return [tuple(row) for row in result]
+
+
+def test_operations_apply_in_order(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Batch"})).json()["id"]
+        record_id = (await owner.post(f"/collections/{collection_id}/records", json={"data": {"a": 1}})).json()["id"]
+
+        response = await owner.post(f"/collections/{collection_id}/records:batch", json={"operations": [
+            {"op": "update", "id": record_id, "data": {"a": 2}},
+            {"op": "delete", "id": record_id},
+            {"op": "update", "id": record_id, "data": {"a": 3}},
+        ]})
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["succeeded"], body["failed"]) == (3, 0)
+        assert [(item["op"], item["status"], item["version"]) for item in body["results"]] == [
+            ("update", 200, 2), ("delete", 200, 2), ("update", 200, 3)
+        ]
+
+        # The last update wins, and the record stays soft-deleted
+        response = await owner.get(f"/collections/{collection_id}/records/{record_id}")
+        record = response.json()
+        assert (record["data"], record["version"], record["is_deleted"]) == ({"a": 3}, 3, True)
+        response = await owner.get(f"/collections/{collection_id}/records/{record_id}/versions/2")
+        assert response.json()["data"] == {"a": 2}
+        response = await owner.get(f"/collections/{collection_id}/records/{record_id}/versions/1")
+        assert response.json()["data"] == {"a": 1}
+
+    run(scenario)
+
+
+def test_failed_operations_get_their_own_results(run):
+    async def scenario():
+        owner = await create_user("owner")
+        other = await create_user("other")
+        collection_id = (await owner.post("/collections", json={"name": "Batch"})).json()["id"]
+        foreign_id = (await other.post("/collections", json={"name": "Theirs"})).json()["id"]
+        foreign_record = (await other.post(f"/collections/{foreign_id}/records", json={"data": {"x": 1}})).json()["id"]
+
+        response = await owner.post(f"/collections/{collection_id}/records:batch", json={"operations": [
+            {"op": "create", "data": {"a": 1}},
+            {"op": "create"},
+            {"op": "update", "data": {"a": 2}},
+            {"op": "delete"},
+            {"op": "update", "id": "missing", "data": {"a": 2}},
+            {"op": "delete", "id": foreign_record},
+        ]})
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["succeeded"], body["failed"]) == (1, 5)
+        assert [(item["index"], item["status"]) for item in body["results"]] == [
+            (0, 201), (1, 400), (2, 400), (3, 400), (4, 404), (5, 404)
+        ]
+        assert body["results"][1]["error"] == "Create needs data"
+        assert body["results"][2]["error"] == "Update needs id and data"
+        assert body["results"][3]["error"] == "Delete needs id"
+
+        # A record of another collection is left alone
+        response = await other.get(f"/collections/{foreign_id}/records/{foreign_record}")
+        assert response.status_code == 200
+
+    run(scenario)
+
+
+def test_record_count_and_history_entries(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Batch"})).json()["id"]
+        kept, soft, hard = [
+            (await owner.post(f"/collections/{collection_id}/records", json={"data": {"n": n}})).json()["id"]
+            for n in range(3)
+        ]
+
+        response = await owner.post(f"/collections/{collection_id}/records:batch", json={"operations": [
+            {"op": "create", "data": {"n": 3}},
+            {"op": "create", "data": {"n": 4}},
+            {"op": "update", "id": kept, "data": {"n": 10}},
+            {"op": "delete", "id": soft},
+            {"op": "delete", "id": soft},
+            {"op": "delete", "id": hard, "hard_delete": True},
+        ]})
+        results = response.json()["results"]
+        created = [results[0]["id"], results[1]["id"]]
+
+        # Two created, two removed; deleting twice only counts once
+        response = await owner.get(f"/collections/{collection_id}")
+        assert response.json()["record_count"] == 3
+
+        # One summary entry, plus the per-record entries history is rebuilt from
+        assert ("batch_updated", {
+            "created": created, "updated": [kept], "deleted": [soft], "hard_deleted": [hard]
+        }) in await _activity("collection", collection_id)
+        assert ("updated", {
+            "version": 2, "revert": [{"op": "replace", "path": "/n", "value": 0}]
+        }) in await _activity("record", kept)
+        assert ("deleted", {
+            "hard_delete": True, "collection_id": collection_id, "version": 1, "data": {"n": 2}
+        }) in await _activity("record", hard)
+        response = await owner.get(f"/collections/{collection_id}/records/{kept}/versions/1")
+        assert response.json()["data"] == {"n": 0}
+
+    run(scenario)
+
+
+def test_batch_size_is_limited(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Batch"})).json()["id"]
+        url = f"/collections/{collection_id}/records:batch"
+        limit = settings.RECORD_BATCH_MAX_OPERATIONS
+
+        response = await owner.post(url, json={"operations": [{"op": "create", "data": {"n": 1}}] * (limit + 1)})
+        assert response.status_code == 422
+        response = await owner.post(url, json={"operations": []})
+        assert response.status_code == 422
+
+        response = await owner.post(url, json={"operations": [{"op": "create", "data": {"n": 1}}] * limit})
+        assert response.status_code == 200
+        assert response.json()["succeeded"] == limit
+        response = await owner.get(f"/collections/{collection_id}")
+        assert response.json()["record_count"] == limit
+
+    run(scenario)
@@ -0,0 +1,44 @@
+"""
+Exports write untrusted text so spreadsheets do not evaluate it.
+"""
+import io
+import zipfile
+
+from tests.conftest import create_user
+
+
+FORMULA = '=HYPERLINK("http://example.com","click")'
+
+
+def test_formula_text_is_not_exported_as_a_formula(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "a/b"})).json()["id"]
+        await owner.post(
+            f"/collections/{collection_id}/records",
+            json={"data": {
+                "link": FORMULA,
+                "total": "@SUM(A1)",
+                "amount": -5,
+                "typed": "-5",
+                "signed": "+1.5e3",
+                "sum": "-1+2"
+            }}
+        )
+
+        response = await owner.get(f"/collections/{collection_id}/export", params={"format": "csv"})
+        assert response.status_code == 200
+        assert "filename*=UTF-8''a%2Fb.csv" in response.headers["content-disposition"]
+        row = response.text.splitlines()[1]
+        assert row.startswith('"\'=HYPERLINK(')
+        # Numeric strings stay as they are; text starting with a sign does not
+        assert row.endswith(",'@SUM(A1),-5,-5,+1.5e3,'-1+2")
+
+        response = await owner.get(f"/collections/{collection_id}/export", params={"format": "xlsx"})
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as workbook:
+            sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+        assert "<f>" not in sheet
+        assert "HYPERLINK" in sheet
+
+    run(scenario)
@@ -0,0 +1,74 @@
+"""
+Filters address data keys the way they are stored, or are rejected.
+"""
+import json
+
+from tests.conftest import create_user
+
+
+def test_filters_match_keys_that_json_escapes(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Keys"})).json()["id"]
+        await owner.post(
+            f"/collections/{collection_id}/records",
+            json={"data": {"café": "open", "back\\slash": "yes", "plain": 1}}
+        )
+
+        for field, value in (("café", "open"), ("back\\slash", "yes"), ("plain", 1)):
+            response = await owner.get(
+                f"/collections/{collection_id}/records",
+                params={"filter": json.dumps({field: value})}
+            )
+            assert response.status_code == 200, field
+            assert len(response.json()) == 1, field
+
+    run(scenario)
+
+
+def test_fields_containing_a_double_quote_are_rejected(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Quotes"})).json()["id"]
+
+        response = await owner.get(
+            f"/collections/{collection_id}/records",
+            params={"filter": json.dumps({'say "hi"': "x"})}
+        )
+        assert response.status_code == 400
+
+        schema = {"fields": [{"name": 'say "hi"', "type": "text", "indexed": True}]}
+        response = await owner.post("/collections", json={"name": "Indexed", "schema": schema})
+        assert response.status_code == 400
+
+    run(scenario)
+
+
+def test_number_comparisons_skip_non_numeric_text(run):
+    async def scenario():
+        owner = await create_user("owner")
+        schema = {"fields": [{"name": "n", "type": "number"}]}
+        collection_id = (await owner.post("/collections", json={"name": "Numbers", "schema": schema})).json()["id"]
+        for value in (5, "7", " -3.5 ", "n/a", "", True, "12"):
+            await owner.post(f"/collections/{collection_id}/records", json={"data": {"n": value}})
+
+        response = await owner.get(
+            f"/collections/{collection_id}/records",
+            params={"filter": json.dumps({"n": {"lt": 10}})}
+        )
+        assert response.status_code == 200
+        assert sorted(str(record["data"]["n"]) for record in response.json()) == [" -3.5 ", "5", "7"]
+
+    run(scenario)
+
+
+def test_number_expression_renders_for_postgresql():
+    from sqlalchemy.dialects import postgresql
+
+    from app.services.record_filters import json_field_number
+
+    sql = str(json_field_number("n", "postgresql").compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+    assert "CAST(records.data ->> 'n' AS NUMERIC)" in sql
+    assert "~" in sql
@@ -0,0 +1,90 @@
+"""
+With several processes, only index builds of a dead process are taken over.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.core.database import AsyncSessionLocal
+from app.models.record_index import RecordIndex
+from app.services.record_indexes import RecordIndexBuilder
+from tests.conftest import create_user
+
+
+SCHEMA = {"fields": [{"name": "price", "type": "number", "indexed": True}]}
+
+
+async def _set_claim(index_id: str, claimed_by: str, heartbeat_at) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(RecordIndex)
+            .where(RecordIndex.id == index_id)
+            .values(status="building", claimed_by=claimed_by, heartbeat_at=heartbeat_at)
+        )
+        await db.commit()
+
+
+async def _status(index_id: str) -> str:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(RecordIndex.status).where(RecordIndex.id == index_id))
+
+
+def test_only_builds_without_a_recent_heartbeat_are_requeued(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Priced", "schema": SCHEMA})).json()["id"]
+        async with AsyncSessionLocal() as db:
+            index_id = await db.scalar(
+                select(RecordIndex.id).where(RecordIndex.collection_id == collection_id)
+            )
+
+        builder = RecordIndexBuilder(stale_after=60)
+
+        # Another live process is building it
+        await _set_claim(index_id, "other-host:1:alive", datetime.utcnow())
+        await builder.requeue_stale()
+        await builder.process_pending()
+        assert await _status(index_id) == "building"
+
+        # Its process died: the build is taken over
+        await _set_claim(index_id, "other-host:1:alive", datetime.utcnow() - timedelta(minutes=5))
+        assert await builder.requeue_stale() >= 1
+        await builder.process_pending()
+        assert await _status(index_id) == "ready"
+
+    run(scenario)
+
+
+def test_failed_drop_is_recorded_and_backed_off(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Dropped", "schema": SCHEMA})).json()["id"]
+        async with AsyncSessionLocal() as db:
+            index_id = await db.scalar(
+                select(RecordIndex.id).where(RecordIndex.collection_id == collection_id)
+            )
+        builder = RecordIndexBuilder()
+        await builder.process_pending()
+        assert await _status(index_id) == "ready"
+
+        response = await owner.put(f"/collections/{collection_id}", json={"schema": {"fields": []}})
+        assert response.status_code == 200
+
+        attempts = []
+
+        async def failing_ddl(*statements, analyze=None):
+            attempts.append(statements)
+            raise RuntimeError("database is locked")
+
+        builder._execute_ddl = failing_ddl
+        await builder.process_pending()
+
+        # One attempt, then the row waits out its backoff instead of looping
+        assert len(attempts) == 1
+        async with AsyncSessionLocal() as db:
+            index = await db.get(RecordIndex, index_id)
+            assert (index.status, index.attempts) == ("dropping", 1)
+            assert "database is locked" in index.error
+            assert index.retry_at > datetime.utcnow()
+
+    run(scenario)
@@ -0,0 +1,119 @@
+"""
+PATCH applies a JSON Merge Patch in the database and logs a diff of the patched fields.
+"""
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.activity_log import ActivityLog
+from app.services.record_service import _merge_patch_sql
+from tests.conftest import create_user
+
+
+async def _record_updates(record_id: str):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ActivityLog.changes)
+            .where(
+                ActivityLog.entity_type == "record",
+                ActivityLog.entity_id == record_id,
+                ActivityLog.action == "updated"
+            )
+        )
+        return sorted(result.scalars(), key=lambda changes: changes["version"])
+
+
+def test_merge_patch_removes_nested_nulls(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Patch"})).json()["id"]
+        data = {"name": "a", "meta": {"x": 1, "y": 2, "deep": {"z": 3}}, "tags": [1, 2], "flag": True}
+        record_id = (await owner.post(f"/collections/{collection_id}/records", json={"data": data})).json()["id"]
+
+        response = await owner.patch(f"/collections/{collection_id}/records/{record_id}", json={"data": {
+            "name": None,
+            "meta": {"y": None, "deep": {"z": None, "w": 4}, "added": "b"},
+            "tags": [3],
+            "missing": None,
+        }})
+        assert response.status_code == 200
+        record = response.json()
+        assert record["version"] == 2
+        assert record["data"] == {"meta": {"x": 1, "deep": {"w": 4}, "added": "b"}, "tags": [3], "flag": True}
+
+        response = await owner.get(f"/collections/{collection_id}/records/{record_id}/versions/1")
+        assert response.json()["data"] == data
+
+        response = await owner.patch(f"/collections/{collection_id}/records/missing", json={"data": {"a": 1}})
+        assert response.status_code == 404
+
+    run(scenario)
+
+
+def test_audit_diff_covers_only_patched_fields(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Patch"})).json()["id"]
+        data = {"keep": "x" * 100, "other": {"a": 1}, "n": 1, "flag": False}
+        record_id = (await owner.post(f"/collections/{collection_id}/records", json={"data": data})).json()["id"]
+
+        await owner.patch(f"/collections/{collection_id}/records/{record_id}", json={"data": {"n": 2, "flag": None}})
+
+        # Neither the untouched fields nor their values appear in the entry
+        [changes] = await _record_updates(record_id)
+        assert changes["version"] == 2
+        assert sorted(changes["revert"], key=lambda op: op["path"]) == [
+            {"op": "add", "path": "/flag", "value": False},
+            {"op": "replace", "path": "/n", "value": 1},
+        ]
+
+    run(scenario)
+
+
+def test_snapshot_versions_log_the_full_previous_data(run, monkeypatch):
+    monkeypatch.setattr(settings, "RECORD_HISTORY_SNAPSHOT_INTERVAL", 3)
+
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Patch"})).json()["id"]
+        record_id = (await owner.post(
+            f"/collections/{collection_id}/records", json={"data": {"n": 1, "keep": "k"}}
+        )).json()["id"]
+
+        for n in range(2, 6):
+            await owner.patch(f"/collections/{collection_id}/records/{record_id}", json={"data": {"n": n}})
+
+        updates = await _record_updates(record_id)
+        assert [changes["version"] for changes in updates] == [2, 3, 4, 5]
+        assert updates[1] == {"version": 3, "previous": {"n": 2, "keep": "k"}}
+        assert updates[2] == {"version": 4, "revert": [{"op": "replace", "path": "/n", "value": 3}]}
+
+        for version in range(1, 6):
+            response = await owner.get(f"/collections/{collection_id}/records/{record_id}/versions/{version}")
+            assert response.json()["data"] == {"n": version, "keep": "k"}
+
+    run(scenario)
+
+
+def test_postgresql_merge_patch_statement():
+    expression = _merge_patch_sql("postgresql", {"a": None, "b": 1, "c": {"d": None, "e": [1]}})
+    compiled = expression.compile(dialect=postgresql.dialect())
+
+    # Removals with -, scalar replacements with ||, nested objects merged recursively via jsonb_set
+    target = "CAST(records.data AS JSONB)"
+    nested = f"jsonb_extract_path({target}, %(jsonb_extract_path_1)s)"
+    assert str(compiled) == (
+        "CAST(jsonb_set("
+        f"(CASE WHEN (jsonb_typeof({target}) = %(jsonb_typeof_1)s) THEN {target} "
+        "ELSE CAST(%(param_1)s AS JSONB) END - %(param_2)s::TEXT[]) || CAST(%(param_3)s AS JSONB), "
+        "%(param_4)s::TEXT[], "
+        f"(CASE WHEN (jsonb_typeof({nested}) = %(jsonb_typeof_2)s) THEN {nested} "
+        "ELSE CAST(%(param_5)s AS JSONB) END - %(param_6)s::TEXT[]) || CAST(%(param_7)s AS JSONB)"
+        ") AS JSON)"
+    )
+    assert compiled.params == {
+        "jsonb_typeof_1": "object", "param_1": {}, "param_2": ["a"], "param_3": {"b": 1},
+        "param_4": ["c"], "jsonb_extract_path_1": "c",
+        "jsonb_typeof_2": "object", "param_5": {}, "param_6": ["d"], "param_7": {"e": [1]},
+    }
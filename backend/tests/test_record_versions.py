@@ -0,0 +1,51 @@
+"""
+Record version history is scoped to the caller's collection.
+"""
+from tests.conftest import create_user
+
+
+def test_version_of_another_users_record_is_not_found(run):
+    async def scenario():
+        owner = await create_user("owner")
+        other = await create_user("other")
+
+        response = await owner.post("/collections", json={"name": "Private"})
+        private_id = response.json()["id"]
+        response = await owner.post(f"/collections/{private_id}/records", json={"data": {"secret": "x"}})
+        record_id = response.json()["id"]
+
+        response = await other.post("/collections", json={"name": "Mine"})
+        other_id = response.json()["id"]
+
+        response = await other.get(f"/collections/{other_id}/records/{record_id}/versions/1")
+        assert response.status_code == 404
+        response = await other.get(f"/collections/{other_id}/records/{record_id}")
+        assert response.status_code == 404
+
+        response = await owner.get(f"/collections/{private_id}/records/{record_id}/versions/1")
+        assert response.status_code == 200
+        assert response.json()["data"] == {"secret": "x"}
+
+    run(scenario)
+
+
+def test_version_of_record_in_another_collection_is_not_found(run):
+    async def scenario():
+        owner = await create_user("owner")
+        first = (await owner.post("/collections", json={"name": "First"})).json()["id"]
+        second = (await owner.post("/collections", json={"name": "Second"})).json()["id"]
+        record_id = (await owner.post(f"/collections/{first}/records", json={"data": {"a": 1}})).json()["id"]
+        await owner.put(f"/collections/{first}/records/{record_id}", json={"data": {"a": 2}})
+
+        response = await owner.get(f"/collections/{second}/records/{record_id}/versions/1")
+        assert response.status_code == 404
+
+        # Hard-deleted records are rebuilt from the deletion entry of their own collection
+        await owner.delete(f"/collections/{first}/records/{record_id}", params={"hard_delete": True})
+        response = await owner.get(f"/collections/{second}/records/{record_id}/versions/2")
+        assert response.status_code == 404
+        response = await owner.get(f"/collections/{first}/records/{record_id}/versions/1")
+        assert response.status_code == 200
+        assert response.json()["data"] == {"a": 1}
+
+    run(scenario)
@@ -0,0 +1,108 @@
+"""
+Search leaves out deleted records and collections without losing older live matches.
+"""
+from app.services import global_search
+from app.services.record_search import SearchReindexer
+from tests.conftest import create_user
+
+
+async def _add(client, collection_id: str, text: str) -> str:
+    response = await client.post(f"/collections/{collection_id}/records", json={"data": {"text": text}})
+    return response.json()["id"]
+
+
+def test_global_search_reads_past_deleted_matches(run, monkeypatch):
+    # A small window, so the newest matches alone hold no live record
+    monkeypatch.setattr(global_search, "RECORD_CANDIDATES", 2)
+
+    async def scenario():
+        owner = await create_user("owner")
+        kept_id = (await owner.post("/collections", json={"name": "Kept"})).json()["id"]
+        gone_id = (await owner.post("/collections", json={"name": "Gone"})).json()["id"]
+        oldest = await _add(owner, kept_id, "apple one")
+        older = await _add(owner, kept_id, "apple two")
+        for n in range(3):
+            record_id = await _add(owner, kept_id, f"apple deleted {n}")
+            await owner.delete(f"/collections/{kept_id}/records/{record_id}")
+        for n in range(3):
+            await _add(owner, gone_id, f"apple gone {n}")
+        await owner.delete(f"/collections/{gone_id}")
+
+        response = await owner.get("/search", params={"q": "apple", "hits_per_collection": 5})
+        assert response.status_code == 200
+        groups = response.json()["groups"]
+        assert [group["collection"]["id"] for group in groups] == [kept_id]
+        assert {hit["id"] for hit in groups[0]["hits"]} == {oldest, older}
+        assert all("<mark>apple</mark>" in hit["highlights"]["text"] for hit in groups[0]["hits"])
+
+        # Other users' records are never candidates
+        other = await create_user("other")
+        response = await other.get("/search", params={"q": "apple"})
+        assert response.json()["groups"] == []
+
+    run(scenario)
+
+
+def test_collection_search_includes_deleted_records_on_request(run):
+    async def scenario():
+        owner = await create_user("owner")
+        collection_id = (await owner.post("/collections", json={"name": "Fruit"})).json()["id"]
+        live = await _add(owner, collection_id, "pear pear")
+        deleted = await _add(owner, collection_id, "pear")
+        await _add(owner, collection_id, "plum")
+        await owner.delete(f"/collections/{collection_id}/records/{deleted}")
+
+        url = f"/collections/{collection_id}/records/search"
+        response = await owner.get(url, params={"q": "pear"})
+        assert response.status_code == 200
+        assert [hit["id"] for hit in response.json()] == [live]
+
+        response = await owner.get(url, params={"q": "pe*", "include_deleted": True})
+        hits = response.json()
+        assert {hit["id"] for hit in hits} == {live, deleted}
+        assert hits[0]["score"] >= hits[1]["score"]
+
+        # Restoring a record makes it a live hit again
+        await owner.post(f"/collections/{collection_id}/records/{deleted}/restore")
+        response = await owner.get(url, params={"q": "pear"})
+        assert {hit["id"] for hit in response.json()} == {live, deleted}
+
+        response = await owner.get(url, params={"q": "!!"})
+        assert response.status_code == 400
+
+    run(scenario)
+
+
+def test_text_field_changes_reindex_in_the_background(run):
+    async def scenario():
+        owner = await create_user("owner")
+        schema = {"fields": [{"name": "a", "type": "text"}, {"name": "b", "type": "number"}]}
+        collection_id = (await owner.post("/collections", json={"name": "Fields", "schema": schema})).json()["id"]
+        for n in range(5):
+            await owner.post(f"/collections/{collection_id}/records", json={"data": {"a": "alpha", "b": f"beta {n}"}})
+        url = f"/collections/{collection_id}/records/search"
+        assert (await owner.get(url, params={"q": "beta"})).json() == []
+
+        schema["fields"][1]["type"] = "text"
+        response = await owner.put(f"/collections/{collection_id}", json={"schema": schema})
+        assert response.status_code == 200
+        assert response.json()["search_reindexing"] is True
+
+        # The saved schema applies to records written from now on
+        await owner.post(f"/collections/{collection_id}/records", json={"data": {"b": "beta new"}})
+        assert len((await owner.get(url, params={"q": "beta"})).json()) == 1
+
+        # In chunks of two records, until the collection is current
+        await SearchReindexer(batch_size=2).process_pending()
+
+        assert len((await owner.get(url, params={"q": "beta"})).json()) == 6
+        assert len((await owner.get(url, params={"q": "alpha"})).json()) == 5
+        response = await owner.get(f"/collections/{collection_id}")
+        assert response.json()["search_reindexing"] is False
+
+        # Changing only other schema details leaves the index alone
+        schema["fields"][0]["indexed"] = True
+        response = await owner.put(f"/collections/{collection_id}", json={"schema": schema})
+        assert response.json()["search_reindexing"] is False
+
+    run(scenario)
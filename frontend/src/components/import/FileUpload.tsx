@@ -50,9 +50,10 @@ export default function FileUpload({ onFileSelected, onCancel, isOpen }: FileUpl
             return;
         }
 
-        const maxSize = 10 * 1024 * 1024; // 10MB
-        if (file.size > maxSize) {
-            alert('File size must be less than 10MB.');
+        // CSV is streamed server-side; Excel is still parsed in memory
+        const maxSizeMb = fileExtension === '.csv' ? 500 : 10;
+        if (file.size > maxSizeMb * 1024 * 1024) {
+            alert(`File size must be less than ${maxSizeMb}MB.`);
             return;
         }
 
@@ -86,7 +87,7 @@ export default function FileUpload({ onFileSelected, onCancel, isOpen }: FileUpl
                     <ul className="list-disc list-inside space-y-1 text-xs">
                         <li>Column headers become field names</li>
                         <li>Each row becomes one item</li>
-                        <li>Maximum file size: 10MB</li>
+                        <li>Maximum file size: 500MB for CSV, 10MB for Excel</li>
                     </ul>
                 </div>
 
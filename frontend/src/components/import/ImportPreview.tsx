@@ -8,6 +8,8 @@ interface ImportPreviewProps {
     folderName: string;
     totalRows: number;
     totalColumns: number;
+    typeDetectionRows?: number;
+    typeDetectionPartial?: boolean;
     schema: {
         fields: Array<{
             name: string;
@@ -28,6 +30,8 @@ export default function ImportPreview({
     folderName,
     totalRows,
     totalColumns,
+    typeDetectionRows,
+    typeDetectionPartial = false,
     schema,
     preview,
     records,
@@ -92,6 +96,12 @@ export default function ImportPreview({
                             <p className="text-xs text-green-700 dark:text-green-300 mt-1">
                                 Found {totalRows} rows and {totalColumns} columns
                             </p>
+                            {typeDetectionPartial && (
+                                <p className="text-xs text-green-700 dark:text-green-300 mt-1">
+                                    Column types were detected from the first {typeDetectionRows} rows;
+                                    later values that do not fit are imported as text
+                                </p>
+                            )}
                         </div>
                     </div>
                 </div>
@@ -4,6 +4,7 @@ import { FiPlus, FiFolder, FiEdit2, FiTrash2, FiUpload } from 'react-icons/fi';
 import { useCollectionStore } from '../store/collectionStore';
 import { getTemplateById } from '../utils/templates';
 import { api } from '../utils/api';
+import { createImportJob, formatImportProgress, watchImportJob } from '../utils/importJobs';
 import toast from 'react-hot-toast';
 import Card from '../components/ui/Card';
 import Button from '../components/ui/Button';
@@ -123,6 +124,7 @@ export default function CollectionsPage() {
         if (!importData?.file) return;
 
         setImporting(true);
+        const progressToast = toast.loading('Uploading file…');
         try {
             const formData = new FormData();
             formData.append('folder_name', folderName);
@@ -130,14 +132,21 @@ export default function CollectionsPage() {
             formData.append('schema', JSON.stringify(editedSchema)); // Send renamed schema
             formData.append('file', importData.file); // Re-upload file for streaming
 
-            // Use new upload endpoint
-            const { data } = await api.post('/import/upload', formData, {
-                headers: {
-                    'Content-Type': 'multipart/form-data'
-                }
+            // Imported in the background; progress arrives as server-sent events
+            const job = await createImportJob(formData);
+            const finished = await watchImportJob(job.id, (update) => {
+                toast.loading(formatImportProgress(update), { id: progressToast });
             });
 
-            toast.success(data.message);
+            if (finished.status !== 'completed' || !finished.collection_id) {
+                toast.error(finished.error || `Import ${finished.status}`, { id: progressToast });
+                return;
+            }
+
+            toast.success(
+                `Successfully imported ${finished.rows_inserted} items into '${finished.folder_name}'`,
+                { id: progressToast }
+            );
             setShowImportPreview(false);
             setImportData(null);
 
@@ -145,9 +154,9 @@ export default function CollectionsPage() {
             await fetchCollections();
 
             // Navigate to new folder
-            navigate(`/folders/${data.collection_id}`);
+            navigate(`/folders/${finished.collection_id}`);
         } catch (error: any) {
-            toast.error(error.response?.data?.detail || 'Failed to import file');
+            toast.error(error.response?.data?.detail || 'Failed to import file', { id: progressToast });
         } finally {
             setImporting(false);
         }
@@ -357,6 +366,8 @@ export default function CollectionsPage() {
                         folderName={importData.folder_name}
                         totalRows={importData.total_rows}
                         totalColumns={importData.total_columns}
+                        typeDetectionRows={importData.type_detection_rows}
+                        typeDetectionPartial={importData.type_detection_partial}
                         schema={importData.schema}
                         preview={importData.preview}
                         records={importData.records || []}
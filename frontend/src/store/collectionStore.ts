@@ -13,7 +13,7 @@ interface CollectionState {
     createCollection: (name: string, description: string) => Promise<void>;
     updateCollection: (id: string, name: string, description: string) => Promise<void>;
     deleteCollection: (id: string) => Promise<void>;
-    fetchRecords: (collectionId: string) => Promise<void>;
+    fetchRecords: (collectionId: string, filter?: Record<string, any>) => Promise<void>;
     createRecord: (collectionId: string, data: Record<string, any>) => Promise<void>;
     updateRecord: (collectionId: string, recordId: string, data: Record<string, any>) => Promise<void>;
     deleteRecord: (collectionId: string, recordId: string) => Promise<void>;
@@ -104,10 +104,12 @@ export const useCollectionStore = create<CollectionState>((set, get) => ({
         }
     },
 
-    fetchRecords: async (collectionId: string) => {
+    fetchRecords: async (collectionId: string, filter?: Record<string, any>) => {
         set({ isLoading: true });
         try {
-            const { data } = await api.get(`/collections/${collectionId}/records`);
+            // Filtering on data fields happens server-side
+            const params = filter && Object.keys(filter).length > 0 ? { filter: JSON.stringify(filter) } : undefined;
+            const { data } = await api.get(`/collections/${collectionId}/records`, { params });
             set({ records: data, isLoading: false });
         } catch (error: any) {
             toast.error('Failed to load records');
@@ -25,6 +25,15 @@ export interface Collection {
     created_at: string;
     updated_at: string;
     record_count?: number;
+    indexes?: RecordIndex[] | null;
+}
+
+export interface RecordIndex {
+    field: string;
+    field_type: 'number' | 'date' | 'text';
+    status: 'pending' | 'building' | 'ready' | 'failed' | 'dropping';
+    error: string | null;
+    updated_at: string;
 }
 
 export interface Record {
@@ -36,6 +45,62 @@ export interface Record {
     updated_at: string;
 }
 
+export interface RecordSearchResult extends Record {
+    score: number;
+    highlights: { [field: string]: string };
+}
+
+export interface RecordBatchOperation {
+    op: 'create' | 'update' | 'delete';
+    id?: string;
+    data?: { [key: string]: any };
+    hard_delete?: boolean;
+}
+
+export interface RecordBatchItemResult {
+    index: number;
+    op: 'create' | 'update' | 'delete';
+    status: number;
+    id?: string | null;
+    version?: number | null;
+    error?: string | null;
+}
+
+export interface RecordBatchResponse {
+    results: RecordBatchItemResult[];
+    succeeded: number;
+    failed: number;
+}
+
+export interface SearchGroup {
+    collection: Collection;
+    score?: number | null;
+    highlights: { [field: string]: string };
+    hits: RecordSearchResult[];
+}
+
+export interface GlobalSearchResponse {
+    query: string;
+    groups: SearchGroup[];
+}
+
+export interface ImportJob {
+    id: string;
+    status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
+    filename: string;
+    folder_name: string;
+    collection_id: string | null;
+    total_rows_estimate: number | null;
+    rows_parsed: number;
+    rows_inserted: number;
+    rows_per_second: number | null;
+    eta_seconds: number | null;
+    error: string | null;
+    created_at: string;
+    started_at: string | null;
+    finished_at: string | null;
+}
+
 export interface ActivityLog {
     id: string;
     user_id: string;
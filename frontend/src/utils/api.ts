@@ -9,16 +9,32 @@ export const api = axios.create({
     },
 });
 
+// Read-your-writes: after a write the backend returns a deadline (epoch
+// seconds) until which reads must go to the primary database rather than a
+// replica. The API is cross-origin without credentials, so the cookie it
+// also sets is never sent; the header is echoed back instead.
+const READ_PRIMARY_HEADER = 'X-Read-Primary-Until';
+let readPrimaryUntil = 0;
+
 api.interceptors.request.use((config) => {
     const token = localStorage.getItem('access_token');
     if (token) {
         config.headers.Authorization = `Bearer ${token}`;
     }
+    if (readPrimaryUntil > Date.now() / 1000) {
+        config.headers[READ_PRIMARY_HEADER] = readPrimaryUntil.toString();
+    }
     return config;
 });
 
 api.interceptors.response.use(
-    (response) => response,
+    (response) => {
+        const deadline = Number(response.headers[READ_PRIMARY_HEADER.toLowerCase()]);
+        if (deadline > readPrimaryUntil) {
+            readPrimaryUntil = deadline;
+        }
+        return response;
+    },
     async (error) => {
         const originalRequest = error.config;
 
@@ -0,0 +1,80 @@
+import { api } from './api';
+import { ImportJob } from '../types';
+
+const TERMINAL_STATUSES: ImportJob['status'][] = ['completed', 'failed', 'cancelled'];
+const POLL_INTERVAL_MS = 1000;
+
+const isFinished = (job: ImportJob) => TERMINAL_STATUSES.includes(job.status);
+
+// Start a background import of a file; the job is returned while still queued
+export const createImportJob = async (formData: FormData): Promise<ImportJob> => {
+    const { data } = await api.post<ImportJob>('/import/jobs', formData, {
+        headers: {
+            'Content-Type': 'multipart/form-data'
+        }
+    });
+    return data;
+};
+
+// EventSource cannot send the Authorization header, so the server-sent
+// events are read from a fetch response body instead
+const streamJobEvents = async (jobId: string, onProgress: (job: ImportJob) => void): Promise<ImportJob> => {
+    const token = localStorage.getItem('access_token');
+    const response = await fetch(`${api.defaults.baseURL}/import/jobs/${jobId}/events`, {
+        headers: token ? { Authorization: `Bearer ${token}` } : {}
+    });
+    if (!response.ok || !response.body) {
+        throw new Error(`Progress stream failed with status ${response.status}`);
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            throw new Error('Progress stream ended before the import finished');
+        }
+        buffer += value;
+
+        // Events are separated by a blank line; the last part may be incomplete
+        const events = buffer.split('\n\n');
+        buffer = events.pop() ?? '';
+        for (const event of events) {
+            const dataLine = event.split('\n').find((line) => line.startsWith('data: '));
+            if (!dataLine) continue;
+            const job: ImportJob = JSON.parse(dataLine.slice('data: '.length));
+            onProgress(job);
+            if (isFinished(job)) {
+                await reader.cancel();
+                return job;
+            }
+        }
+    }
+};
+
+const pollJob = async (jobId: string, onProgress: (job: ImportJob) => void): Promise<ImportJob> => {
+    while (true) {
+        const { data } = await api.get<ImportJob>(`/import/jobs/${jobId}`);
+        onProgress(data);
+        if (isFinished(data)) return data;
+        await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+    }
+};
+
+// Follow an import job until it finishes, reporting every progress update.
+// Falls back to polling if the event stream cannot be read (e.g. an expired
+// token, which the api client refreshes).
+export const watchImportJob = async (jobId: string, onProgress: (job: ImportJob) => void): Promise<ImportJob> => {
+    try {
+        return await streamJobEvents(jobId, onProgress);
+    } catch {
+        return pollJob(jobId, onProgress);
+    }
+};
+
+export const formatImportProgress = (job: ImportJob): string => {
+    if (job.status === 'queued') return 'Import queued…';
+    const total = job.total_rows_estimate ? ` of ~${job.total_rows_estimate.toLocaleString()}` : '';
+    const eta = job.eta_seconds != null ? ` (about ${Math.ceil(job.eta_seconds)}s left)` : '';
+    return `Imported ${job.rows_inserted.toLocaleString()}${total} rows${eta}`;
+};